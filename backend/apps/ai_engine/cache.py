@@ -0,0 +1,69 @@
+"""
+Response cache for deterministic AI completions.
+
+Low-temperature prompts such as schema-to-SQL generation return the same
+answer for the same input, so their results are stored in the Django cache
+(Redis) keyed by a SHA-256 of the canonical request.
+"""
+
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Completions sampled above this temperature are not worth caching
+MAX_CACHEABLE_TEMPERATURE = 0.5
+
+
+def make_key(key_parts: Dict[str, Any]) -> str:
+    """Build the cache key for a completion request."""
+    payload = orjson.dumps(key_parts, default=str, option=orjson.OPT_SORT_KEYS)
+    return 'llm:' + hashlib.sha256(payload).hexdigest()
+
+
+def cached_completion(key_parts: Dict[str, Any], fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the cached result for ``key_parts`` or compute and store it."""
+    key = make_key(key_parts)
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        logger.warning(f"AI response cache unavailable: {str(e)}")
+        return fn()
+
+    if value is not None:
+        return value
+
+    value = fn()
+    try:
+        cache.set(key, value, timeout=settings.AI_RESPONSE_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to cache AI response: {str(e)}")
+    return value
+
+
+async def acached_completion(
+    key_parts: Dict[str, Any],
+    fn: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Async counterpart of cached_completion."""
+    key = make_key(key_parts)
+    try:
+        value = await cache.aget(key)
+    except Exception as e:
+        logger.warning(f"AI response cache unavailable: {str(e)}")
+        return await fn()
+
+    if value is not None:
+        return value
+
+    value = await fn()
+    try:
+        await cache.aset(key, value, timeout=settings.AI_RESPONSE_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to cache AI response: {str(e)}")
+    return value
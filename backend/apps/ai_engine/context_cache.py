@@ -0,0 +1,72 @@
+"""
+Short-lived cache of RAG retrieval results.
+
+Follow-up turns in a conversation usually ask about the same topic, so the
+documents retrieved for a query are kept in the Django cache for
+AI_RAG_CONTEXT_CACHE_TIMEOUT seconds and reused instead of embedding and
+searching again. Keys embed a per-collection version that is bumped
+whenever documents are added, so stale context is never served.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(collection_name: str) -> str:
+    return f"rag_ctx_ver:{collection_name}"
+
+
+def _key(collection_name: str, query: str, n_results: int, conversation_id: Optional[str]) -> str:
+    payload = orjson.dumps([' '.join(query.lower().split()), n_results, conversation_id])
+    version = cache.get(_version_key(collection_name), 0)
+    return f"rag_ctx:{collection_name}:{version}:{hashlib.sha256(payload).hexdigest()}"
+
+
+def lookup(
+    collection_name: str,
+    query: str,
+    n_results: int,
+    conversation_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Return the cached retrieval result for ``query``, if any."""
+    try:
+        return cache.get(_key(collection_name, query, n_results, conversation_id))
+    except Exception as e:
+        logger.warning(f"RAG context cache unavailable: {str(e)}")
+        return None
+
+
+def store(
+    collection_name: str,
+    query: str,
+    n_results: int,
+    results: Dict[str, Any],
+    conversation_id: Optional[str] = None
+):
+    try:
+        cache.set(
+            _key(collection_name, query, n_results, conversation_id),
+            results,
+            timeout=settings.AI_RAG_CONTEXT_CACHE_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning(f"Failed to cache RAG context: {str(e)}")
+
+
+def invalidate(collection_name: str):
+    """Drop every cached result for ``collection_name``."""
+    key = _version_key(collection_name)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate RAG context cache: {str(e)}")
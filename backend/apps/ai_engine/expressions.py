@@ -0,0 +1,42 @@
+"""
+Query expressions for pgvector searches.
+"""
+
+from django.db import models
+from django.db.models import FloatField, Func, Value
+from django.db.models.functions import Cast
+from pgvector.django import VectorField
+
+EMBEDDING_DIMENSIONS = 384
+# pgvector's upper bound on hnsw.ef_search
+HNSW_MAX_EF_SEARCH = 1000
+
+
+class HalfVectorField(models.Field):
+    """Cast target for pgvector's half-precision ``halfvec`` type."""
+
+    def __init__(self, *args, dimensions=EMBEDDING_DIMENSIONS, **kwargs):
+        self.dimensions = dimensions
+        super().__init__(*args, **kwargs)
+
+    def db_type(self, connection):
+        return f'halfvec({self.dimensions})'
+
+
+class HalfMaxInnerProduct(Func):
+    """
+    Negative inner product of ``field`` and ``vector``, both cast to halfvec.
+
+    The HNSW indexes are built on ``(embedding::halfvec(384))``, so ordering
+    by this expression is served from those half-size indexes.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = ' <#> '
+    output_field = FloatField()
+
+    def __init__(self, field, vector, dimensions=EMBEDDING_DIMENSIONS):
+        half = HalfVectorField(dimensions=dimensions)
+        super().__init__(
+            Cast(field, half),
+            Cast(Value(VectorField().get_prep_value(vector)), half),
+        )
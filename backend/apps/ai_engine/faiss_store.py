@@ -0,0 +1,218 @@
+"""
+FAISS vector store backend.
+
+Per-data-source collections are small (usually under a few thousand
+chunks) and read-heavy, so an in-process HNSW index answers queries in
+well under a millisecond with no database round trip. Each collection is
+persisted as ``<name>.faiss`` plus a ``<name>.json`` sidecar holding the
+documents, metadata and IDs in index order. Ownership lives in the
+collection's VectorStore row, as with the pgvector backend.
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from django.conf import settings
+from django.db import transaction
+
+from . import context_cache
+from .expressions import EMBEDDING_DIMENSIONS
+from .models import VectorStore
+
+logger = logging.getLogger(__name__)
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+# Below this many vectors an exact matmul + top-k beats walking the HNSW graph
+EXACT_SEARCH_BELOW = 1000
+# Collection names become file names, so they may not carry path separators
+COLLECTION_NAME_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+# collection_name -> (mtime, index, documents, vectors); reloaded when
+# another process rewrites the files. ``vectors`` is the contiguous float32
+# matrix of a small collection, or None when queries go through HNSW.
+_loaded: Dict[str, Tuple[float, Any, Dict[str, list], Optional[np.ndarray]]] = {}
+_lock = threading.Lock()
+
+
+def _exact_vectors(index) -> Optional[np.ndarray]:
+    if index.ntotal >= EXACT_SEARCH_BELOW:
+        return None
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def _exact_search(vectors: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-``k`` inner products of ``query`` against every row of ``vectors``."""
+    scores = vectors @ query
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    top = top[np.argsort(-scores[top])]
+    return scores[top], top
+
+
+def _write_atomic(path: Path, write):
+    """
+    Call ``write`` with a unique temporary file name beside ``path``, then
+    rename it over ``path`` so readers never see a partial file and
+    concurrent writers never share a temporary file.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp', delete=False) as tmp:
+        pass
+    try:
+        write(tmp.name)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+class FAISSVectorStore:
+    """
+    Vector store backed by FAISS ``IndexHNSWFlat`` with inner-product metric.
+
+    Mirrors the public API of VectorStoreService; embeddings are unit-norm,
+    so inner product ranks like cosine similarity.
+    """
+
+    def __init__(self, embedding_service=None):
+        from .services import get_embedding_service
+        self.embedding_service = embedding_service or get_embedding_service()
+        self.index_dir = Path(settings.FAISS_INDEX_DIR)
+
+    def create_collection(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+        *,
+        user,
+        name: Optional[str] = None,
+        data_source_id: Optional[str] = None
+    ) -> VectorStore:
+        """
+        Create a new vector collection owned by ``user``, replacing any
+        existing one of the same name.
+        """
+        import faiss
+        from .services import get_embedding_model
+
+        start_time = time.time()
+        index = faiss.IndexHNSWFlat(EMBEDDING_DIMENSIONS, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        self._add(collection_name, index, {'documents': [], 'metadatas': [], 'ids': []}, documents, metadatas, ids)
+
+        with transaction.atomic():
+            VectorStore.objects.filter(collection_name=collection_name).delete()
+            return VectorStore.objects.create(
+                name=name or collection_name,
+                collection_name=collection_name,
+                user=user,
+                data_source_id=data_source_id,
+                embedding_model=get_embedding_model(self.embedding_service),
+                document_count=index.ntotal,
+                status=VectorStore.Status.READY,
+                build_time=time.time() - start_time
+            )
+
+    def query_collection(
+        self,
+        collection_name: str,
+        query_text: str,
+        n_results: int = 5
+    ) -> Dict[str, Any]:
+        """Query a vector collection."""
+        index, stored, vectors = self._load(collection_name)
+        query_embedding = self.embedding_service.encode_query(query_text)
+        if vectors is not None:
+            scores, positions = _exact_search(vectors, query_embedding[0], n_results)
+        else:
+            scores, positions = (row[0] for row in index.search(query_embedding, n_results))
+
+        hits = [(p, s) for p, s in zip(positions, scores) if p != -1]
+        return {
+            'ids': [stored['ids'][p] for p, _ in hits],
+            'documents': [stored['documents'][p] for p, _ in hits],
+            'metadatas': [stored['metadatas'][p] for p, _ in hits],
+            # Cosine distance, for unit vectors
+            'distances': [float(1 - s) for _, s in hits],
+        }
+
+    def add_documents(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None
+    ):
+        """Add documents to existing collection."""
+        import faiss
+
+        # Extend copies so concurrent queries keep searching the old index
+        index, stored, _vectors = self._load(collection_name)
+        index = faiss.clone_index(index)
+        stored = {key: list(values) for key, values in stored.items()}
+        self._add(collection_name, index, stored, documents, metadatas, ids)
+        VectorStore.objects.filter(collection_name=collection_name).update(document_count=index.ntotal)
+
+    def _paths(self, collection_name: str) -> Tuple[Path, Path]:
+        if not COLLECTION_NAME_RE.match(collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name!r}")
+        return (
+            self.index_dir / f"{collection_name}.faiss",
+            self.index_dir / f"{collection_name}.json",
+        )
+
+    def _load(self, collection_name: str) -> Tuple[Any, Dict[str, list], Optional[np.ndarray]]:
+        import faiss
+
+        index_path, docs_path = self._paths(collection_name)
+        mtime = index_path.stat().st_mtime
+        with _lock:
+            cached = _loaded.get(collection_name)
+            if cached is None or cached[0] != mtime:
+                index = faiss.read_index(str(index_path))
+                cached = (
+                    mtime,
+                    index,
+                    orjson.loads(docs_path.read_bytes()),
+                    _exact_vectors(index),
+                )
+                _loaded[collection_name] = cached
+        return cached[1:]
+
+    def _add(
+        self,
+        collection_name: str,
+        index,
+        stored: Dict[str, list],
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]],
+        ids: Optional[List[str]]
+    ):
+        import faiss
+
+        start = len(stored['ids'])
+        embeddings = self.embedding_service.generate_embeddings(documents)
+        index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        stored['documents'].extend(documents)
+        stored['metadatas'].extend(metadatas or [{} for _ in documents])
+        stored['ids'].extend(ids or [f"{collection_name}_{start + i}" for i in range(len(documents))])
+
+        index_path, docs_path = self._paths(collection_name)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(docs_path, lambda name: Path(name).write_bytes(orjson.dumps(stored)))
+        _write_atomic(index_path, lambda name: faiss.write_index(index, name))
+
+        with _lock:
+            _loaded[collection_name] = (index_path.stat().st_mtime, index, stored, _exact_vectors(index))
+        context_cache.invalidate(collection_name)
+        logger.info(f"Stored {len(documents)} documents in FAISS collection {collection_name}")
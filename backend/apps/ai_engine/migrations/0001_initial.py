@@ -0,0 +1,156 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('provider', models.CharField(choices=[('openrouter', 'OpenRouter'), ('openai', 'OpenAI'), ('anthropic', 'Anthropic'), ('huggingface', 'Hugging Face')], max_length=20)),
+                ('model_id', models.CharField(max_length=100)),
+                ('supports_function_calling', models.BooleanField(default=False)),
+                ('supports_vision', models.BooleanField(default=False)),
+                ('supports_code_execution', models.BooleanField(default=False)),
+                ('max_tokens', models.IntegerField(default=4096)),
+                ('context_window', models.IntegerField(default=4096)),
+                ('input_price', models.DecimalField(decimal_places=6, default=0.0, max_digits=10)),
+                ('output_price', models.DecimalField(decimal_places=6, default=0.0, max_digits=10)),
+                ('total_requests', models.BigIntegerField(default=0)),
+                ('total_tokens', models.BigIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'ai_models',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('archived', 'Archived'), ('deleted', 'Deleted')], default='active', max_length=20)),
+                ('data_source_id', models.UUIDField(blank=True, null=True)),
+                ('context_summary', models.TextField(blank=True, null=True)),
+                ('message_count', models.IntegerField(default=0)),
+                ('total_tokens', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_activity', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'ai_conversations',
+                'ordering': ['-last_activity'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmbeddingModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('model_id', models.CharField(max_length=100)),
+                ('dimensions', models.IntegerField()),
+                ('max_sequence_length', models.IntegerField(default=512)),
+                ('avg_embedding_time', models.FloatField(default=0.0)),
+                ('total_embeddings', models.BigIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'embedding_models',
+            },
+        ),
+        migrations.CreateModel(
+            name='VectorStore',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('collection_name', models.CharField(max_length=255, unique=True)),
+                ('data_source_id', models.UUIDField(blank=True, null=True)),
+                ('document_count', models.IntegerField(default=0)),
+                ('chunk_size', models.IntegerField(default=1000)),
+                ('chunk_overlap', models.IntegerField(default=200)),
+                ('status', models.CharField(choices=[('building', 'Building'), ('ready', 'Ready'), ('updating', 'Updating'), ('error', 'Error')], default='building', max_length=20)),
+                ('build_time', models.FloatField(default=0.0)),
+                ('last_query_time', models.FloatField(default=0.0)),
+                ('total_queries', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('embedding_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ai_engine.embeddingmodel')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vector_stores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'vector_stores',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QueryExecution',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('query_type', models.CharField(choices=[('natural_language', 'Natural Language'), ('sql', 'SQL Query'), ('python', 'Python Code'), ('visualization', 'Visualization')], max_length=20)),
+                ('original_query', models.TextField()),
+                ('generated_code', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('execution_time', models.FloatField(default=0.0)),
+                ('rows_affected', models.IntegerField(default=0)),
+                ('result_data', models.JSONField(blank=True, null=True)),
+                ('result_summary', models.TextField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('tokens_used', models.IntegerField(default=0)),
+                ('ai_processing_time', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('ai_model_used', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='ai_engine.aimodel')),
+                ('conversation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='query_executions', to='ai_engine.conversation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='query_executions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'query_executions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Message',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('role', models.CharField(choices=[('user', 'User'), ('assistant', 'Assistant'), ('system', 'System')], max_length=20)),
+                ('message_type', models.CharField(choices=[('text', 'Text'), ('code', 'Code'), ('query', 'Query'), ('visualization', 'Visualization'), ('file', 'File'), ('error', 'Error')], default='text', max_length=20)),
+                ('content', models.TextField()),
+                ('metadata', models.JSONField(default=dict)),
+                ('tokens_used', models.IntegerField(default=0)),
+                ('processing_time', models.FloatField(default=0.0)),
+                ('model_used', models.CharField(blank=True, max_length=100, null=True)),
+                ('code_language', models.CharField(blank=True, max_length=50, null=True)),
+                ('code_output', models.TextField(blank=True, null=True)),
+                ('execution_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='ai_engine.conversation')),
+            ],
+            options={
+                'db_table': 'ai_messages',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user', '-last_activity'], name='ai_conversa_user_id_673136_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user', 'status'], name='ai_conversa_user_id_59068a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'created_at'], name='ai_messages_convers_15163f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queryexecution',
+            index=models.Index(fields=['user', '-created_at'], name='query_execu_user_id_477a68_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queryexecution',
+            index=models.Index(fields=['conversation', '-created_at'], name='query_execu_convers_862c3c_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# GIN indexes only exist on PostgreSQL; other backends (the default SQLite
+# development database) skip these operations.
+GIN_INDEXES = [
+    ('ai_messages_metadata_gin', 'ai_messages', 'metadata jsonb_path_ops'),
+    ('query_executions_result_data_gin', 'query_executions', 'result_data'),
+]
+
+
+def create_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ({column})'
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import pgvector.django
+
+
+# pgvector and its HNSW index only exist on PostgreSQL; other backends
+# (the default SQLite development database) store the column as plain text.
+def create_vector_extension(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+
+def create_hnsw_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "document_chunks_embedding_hnsw" '
+            'ON "document_chunks" USING hnsw (embedding vector_cosine_ops)'
+        )
+
+
+def drop_hnsw_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS "document_chunks_embedding_hnsw"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0003_jsonb_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_vector_extension, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DocumentChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_id', models.CharField(max_length=255)),
+                ('text', models.TextField()),
+                ('embedding', pgvector.django.VectorField(dimensions=384)),
+                ('metadata', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='ai_engine.vectorstore')),
+            ],
+            options={
+                'db_table': 'document_chunks',
+                'unique_together': {('store', 'chunk_id')},
+            },
+        ),
+        migrations.RunPython(create_hnsw_index, drop_hnsw_index),
+    ]
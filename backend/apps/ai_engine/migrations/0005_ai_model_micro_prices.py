@@ -0,0 +1,68 @@
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, Value
+from django.db.models.functions import Cast
+
+MICROS_PER_DOLLAR = 1_000_000
+
+
+def to_micros(apps, schema_editor):
+    AIModel = apps.get_model('ai_engine', 'AIModel')
+    AIModel.objects.update(
+        input_price_micros=Cast(F('input_price') * MICROS_PER_DOLLAR, models.BigIntegerField()),
+        output_price_micros=Cast(F('output_price') * MICROS_PER_DOLLAR, models.BigIntegerField()),
+        total_cost_micros=Cast(F('total_cost') * MICROS_PER_DOLLAR, models.BigIntegerField()),
+    )
+
+
+def from_micros(apps, schema_editor):
+    AIModel = apps.get_model('ai_engine', 'AIModel')
+
+    def dollars(field):
+        return ExpressionWrapper(
+            F(field) / Value(float(MICROS_PER_DOLLAR)),
+            output_field=models.DecimalField(max_digits=16, decimal_places=6)
+        )
+
+    AIModel.objects.update(
+        input_price=dollars('input_price_micros'),
+        output_price=dollars('output_price_micros'),
+        total_cost=dollars('total_cost_micros'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0004_document_chunks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='input_price_micros',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='output_price_micros',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='total_cost_micros',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(to_micros, from_micros),
+        migrations.RemoveField(
+            model_name='aimodel',
+            name='input_price',
+        ),
+        migrations.RemoveField(
+            model_name='aimodel',
+            name='output_price',
+        ),
+        migrations.RemoveField(
+            model_name='aimodel',
+            name='total_cost',
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:28
+
+from django.db import migrations, models
+import pgvector.django
+
+
+def create_hnsw_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "ai_semantic_cache_embedding_hnsw" '
+            'ON "ai_semantic_cache" USING hnsw (embedding vector_cosine_ops)'
+        )
+
+
+def drop_hnsw_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS "ai_semantic_cache_embedding_hnsw"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0005_ai_model_micro_prices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemanticCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_id', models.CharField(max_length=100)),
+                ('context_hash', models.CharField(max_length=64)),
+                ('embedding', pgvector.django.VectorField(dimensions=384)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'ai_semantic_cache',
+                'indexes': [models.Index(fields=['model_id', 'context_hash'], name='ai_semantic_model_i_37af53_idx')],
+            },
+        ),
+        migrations.RunPython(create_hnsw_index, drop_hnsw_index),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Embeddings are L2-normalized at encode time, so the HNSW indexes use
+# inner product instead of cosine. PostgreSQL only, as in 0004/0006.
+HNSW_INDEXES = [
+    ('document_chunks_embedding_hnsw', 'document_chunks'),
+    ('ai_semantic_cache_embedding_hnsw', 'ai_semantic_cache'),
+]
+
+
+def rebuild_indexes(opclass):
+    def rebuild(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for name, table in HNSW_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+            schema_editor.execute(
+                f'CREATE INDEX "{name}" ON "{table}" USING hnsw (embedding {opclass})'
+            )
+    return rebuild
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0006_semantic_cache'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            rebuild_indexes('vector_ip_ops'),
+            rebuild_indexes('vector_cosine_ops'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Index embeddings at half precision: the HNSW graphs are half the size and
+# unit-norm MiniLM vectors lose no meaningful recall. Needs pgvector >= 0.7;
+# PostgreSQL only, as in 0004/0006.
+HNSW_INDEXES = [
+    ('document_chunks_embedding_hnsw', 'document_chunks'),
+    ('ai_semantic_cache_embedding_hnsw', 'ai_semantic_cache'),
+]
+
+
+def rebuild_indexes(expression):
+    def rebuild(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for name, table in HNSW_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+            schema_editor.execute(f'CREATE INDEX "{name}" ON "{table}" USING hnsw ({expression})')
+    return rebuild
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0007_inner_product_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            rebuild_indexes('(embedding::halfvec(384)) halfvec_ip_ops'),
+            rebuild_indexes('embedding vector_ip_ops'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0008_halfvec_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='semanticcacheentry',
+            index=models.Index(fields=['created_at'], name='ai_semantic_created_b6fb87_idx'),
+        ),
+    ]
@@ -2,12 +2,38 @@
 AI Engine models for EETL AI Platform.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from pgvector.django import VectorField
 import uuid
+from decimal import Decimal
 
 User = get_user_model()
 
+# Prices and costs are stored as integer micro-dollars
+MICROS_PER_DOLLAR = 1_000_000
+
+
+def from_micros(micros):
+    """Convert micro-dollars to a Decimal dollar amount for display."""
+    return Decimal(micros) / MICROS_PER_DOLLAR
+
+
+class ConversationManager(models.Manager):
+    """Joins the owning user, which list pages and __str__ always touch."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
+
+class MessageManager(models.Manager):
+    """Joins the conversation and its user to avoid N+1 queries on message lists."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('conversation__user')
+
 
 class Conversation(models.Model):
     """
@@ -35,17 +61,36 @@ class Conversation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_activity = models.DateTimeField(auto_now=True)
     
+    objects = ConversationManager()
+    
     class Meta:
         db_table = 'ai_conversations'
         ordering = ['-last_activity']
+        indexes = [
+            models.Index(fields=['user', '-last_activity']),
+            models.Index(fields=['user', 'status']),
+        ]
     
     def __str__(self):
         return f"Conversation {self.id} - {self.user.email}"
     
-    def increment_message_count(self):
-        """Increment message count."""
-        self.message_count += 1
-        self.save(update_fields=['message_count', 'updated_at'])
+    def add_messages(self, messages):
+        """
+        Insert several messages with one query and bump the counters.
+        """
+        for message in messages:
+            message.conversation = self
+        
+        now = timezone.now()
+        with transaction.atomic():
+            created = Message.objects.bulk_create(messages)
+            Conversation.objects.filter(pk=self.pk).update(
+                message_count=F('message_count') + len(created),
+                total_tokens=F('total_tokens') + sum(m.tokens_used for m in created),
+                updated_at=now,
+                last_activity=now
+            )
+        return created
 
 
 class Message(models.Model):
@@ -92,12 +137,17 @@ class Message(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = MessageManager()
+    
     class Meta:
         db_table = 'ai_messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at']),
+        ]
     
     def __str__(self):
-        return f"{self.role} message in {self.conversation.id}"
+        return f"{self.role} message in {self.conversation_id}"
 
 
 class AIModel(models.Model):
@@ -122,14 +172,14 @@ class AIModel(models.Model):
     max_tokens = models.IntegerField(default=4096)
     context_window = models.IntegerField(default=4096)
     
-    # Pricing (per 1K tokens)
-    input_price = models.DecimalField(max_digits=10, decimal_places=6, default=0.0)
-    output_price = models.DecimalField(max_digits=10, decimal_places=6, default=0.0)
+    # Pricing (micro-dollars per 1K tokens)
+    input_price_micros = models.BigIntegerField(default=0)
+    output_price_micros = models.BigIntegerField(default=0)
     
     # Usage tracking
     total_requests = models.BigIntegerField(default=0)
     total_tokens = models.BigIntegerField(default=0)
-    total_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
+    total_cost_micros = models.BigIntegerField(default=0)
     
     # Status
     is_active = models.BooleanField(default=True)
@@ -146,12 +196,21 @@ class AIModel(models.Model):
     def __str__(self):
         return f"{self.name} ({self.provider})"
     
-    def increment_usage(self, tokens_used, cost=0.0):
-        """Increment usage statistics."""
-        self.total_requests += 1
-        self.total_tokens += tokens_used
-        self.total_cost += cost
-        self.save(update_fields=['total_requests', 'total_tokens', 'total_cost'])
+    @property
+    def input_price(self):
+        return from_micros(self.input_price_micros)
+    
+    @property
+    def output_price(self):
+        return from_micros(self.output_price_micros)
+    
+    @property
+    def total_cost(self):
+        return from_micros(self.total_cost_micros)
+    
+    def cost_micros(self, input_tokens, output_tokens):
+        """Cost of a completion in micro-dollars."""
+        return (input_tokens * self.input_price_micros + output_tokens * self.output_price_micros) // 1000
 
 
 class EmbeddingModel(models.Model):
@@ -222,6 +281,50 @@ class VectorStore(models.Model):
         return f"Vector Store: {self.name}"
 
 
+class DocumentChunk(models.Model):
+    """
+    Model for embedded document chunks stored in a vector store.
+    """
+    store = models.ForeignKey(VectorStore, on_delete=models.CASCADE, related_name='chunks')
+    chunk_id = models.CharField(max_length=255)  # Caller-supplied document id
+    text = models.TextField()
+    embedding = VectorField(dimensions=384)
+    metadata = models.JSONField(default=dict)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'document_chunks'
+        unique_together = ['store', 'chunk_id']
+    
+    def __str__(self):
+        return f"Chunk {self.chunk_id} in {self.store_id}"
+
+
+class SemanticCacheEntry(models.Model):
+    """
+    Model for chat completions cached by the embedding of the user message.
+    """
+    model_id = models.CharField(max_length=100)
+    # SHA-256 of everything except the final user message (system prompt,
+    # history, sampling parameters); only entries with equal context match
+    context_hash = models.CharField(max_length=64)
+    embedding = VectorField(dimensions=384)
+    response = models.JSONField()
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ai_semantic_cache'
+        indexes = [
+            models.Index(fields=['model_id', 'context_hash']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Cached completion {self.pk} ({self.model_id})"
+
+
 class QueryExecution(models.Model):
     """
     Model for tracking query executions and results.
@@ -280,6 +383,10 @@ class QueryExecution(models.Model):
     class Meta:
         db_table = 'query_executions'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['conversation', '-created_at']),
+        ]
     
     def __str__(self):
         return f"Query {self.id} - {self.query_type}"
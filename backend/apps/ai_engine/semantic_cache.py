@@ -0,0 +1,89 @@
+"""
+Semantic response cache for chat completions.
+
+Chat messages are rarely byte-identical when replayed, so instead of an
+exact key the last user message is embedded and looked up by cosine
+distance among completions that share the same context (system prompt,
+history and sampling parameters). Entries live in Postgres via pgvector
+and are served for AI_SEMANTIC_CACHE_TIMEOUT seconds; ``purge_expired``
+deletes older rows from a beat task.
+"""
+
+import functools
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import orjson
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .expressions import HalfMaxInnerProduct
+from .models import SemanticCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _embedding_service():
+    from .services import get_embedding_service
+    try:
+        return get_embedding_service()
+    except Exception as e:
+        logger.warning(f"Semantic cache disabled, embeddings unavailable: {str(e)}")
+        return None
+
+
+def is_enabled() -> bool:
+    return (
+        settings.AI_SEMANTIC_CACHE_ENABLED
+        and connection.vendor == 'postgresql'
+        and _embedding_service() is not None
+    )
+
+
+def context_hash(messages: List[Dict[str, str]], **params) -> str:
+    """Hash everything but the final user message."""
+    payload = orjson.dumps({'messages': messages[:-1], **params}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def embed(text: str):
+    return _embedding_service().generate_single_embedding(text)
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.AI_SEMANTIC_CACHE_TIMEOUT)
+
+
+def lookup(model_id: str, context: str, embedding) -> Optional[Dict[str, Any]]:
+    """Return the closest unexpired cached response within AI_SEMANTIC_CACHE_MAX_DISTANCE."""
+    entry = (
+        SemanticCacheEntry.objects
+        .filter(model_id=model_id, context_hash=context, created_at__gte=_expiry_cutoff())
+        .annotate(neg_inner_product=HalfMaxInnerProduct('embedding', embedding))
+        .order_by('neg_inner_product')
+        .values('response', 'neg_inner_product')
+        .first()
+    )
+    # Embeddings are unit-norm, so 1 - inner product is the cosine distance
+    if entry is not None and 1 + entry['neg_inner_product'] < settings.AI_SEMANTIC_CACHE_MAX_DISTANCE:
+        return entry['response']
+    return None
+
+
+def store(model_id: str, context: str, embedding, response: Dict[str, Any]):
+    SemanticCacheEntry.objects.create(
+        model_id=model_id,
+        context_hash=context,
+        embedding=embedding,
+        response=response
+    )
+
+
+def purge_expired() -> int:
+    """Delete entries older than AI_SEMANTIC_CACHE_TIMEOUT; returns the number removed."""
+    deleted, _ = SemanticCacheEntry.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+    return deleted
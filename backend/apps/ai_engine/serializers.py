@@ -0,0 +1,50 @@
+"""
+Serializers for AI Engine app.
+"""
+
+from rest_framework import serializers
+
+# Upper bound on documents retrieved into a RAG prompt
+MAX_CONTEXT_DOCS = 20
+
+# Upper bound on messages answered by one batch chat request
+MAX_BATCH_MESSAGES = 10
+
+
+class BatchChatSerializer(serializers.Serializer):
+    """
+    Request body for a batch of independent chat messages.
+    """
+    messages = serializers.ListField(
+        child=serializers.CharField(),
+        min_length=1,
+        max_length=MAX_BATCH_MESSAGES
+    )
+
+
+class RAGBuildContextSerializer(serializers.Serializer):
+    """
+    Request body for building a data source's RAG context.
+    """
+    data_source_id = serializers.UUIDField()
+    data_summary = serializers.DictField(required=False, default=dict)
+    sample_data = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        allow_null=True
+    )
+
+
+class RAGQuerySerializer(serializers.Serializer):
+    """
+    Request body for a RAG query against a collection.
+    """
+    query = serializers.CharField()
+    collection_name = serializers.CharField(max_length=255)
+    conversation_history = serializers.ListField(
+        child=serializers.DictField(child=serializers.CharField()),
+        required=False,
+        allow_null=True
+    )
+    n_context_docs = serializers.IntegerField(min_value=1, max_value=MAX_CONTEXT_DOCS, default=3)
+    conversation_id = serializers.UUIDField(required=False, allow_null=True)
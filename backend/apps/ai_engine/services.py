@@ -2,32 +2,157 @@
 AI Engine services for OpenRouter integration and RAG implementation.
 """
 
+import asyncio
 import openai
+import httpx
+from asgiref.sync import sync_to_async
 # import chromadb
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Tuple, Union
 from django.conf import settings
-# from sentence_transformers import SentenceTransformer
-import json
+from django.core.cache import cache
+from django.db import connection, transaction
+from pgvector.django import MaxInnerProduct
+import orjson
 import time
 import logging
+import functools
+import itertools
+import uuid
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # from .models import AIModel, EmbeddingModel, VectorStore, Conversation, Message
+from .models import Conversation, Message, EmbeddingModel, VectorStore, DocumentChunk
+from .faiss_store import EXACT_SEARCH_BELOW, _exact_search
+from .expressions import HNSW_MAX_EF_SEARCH, HalfMaxInnerProduct
+from . import context_cache, semantic_cache, usage_buffer
+from .tokens import fit_messages
+from .cache import cached_completion, acached_completion, MAX_CACHEABLE_TEMPERATURE
 
 logger = logging.getLogger(__name__)
 
 
+def _shrink(obj: Any, max_str: int = 200) -> Any:
+    """Truncate long string values in a JSON-like structure."""
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_str else obj[:max_str] + '...'
+    if isinstance(obj, dict):
+        return {k: _shrink(v, max_str) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_shrink(v, max_str) for v in obj]
+    return obj
+
+
+def _prompt_json(data: Dict[str, Any]) -> str:
+    """Serialize data for a prompt without whitespace the model would pay for."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode())
+    return orjson.dumps(_shrink(data), default=str).decode()
+
+
+def numeric_column_stats(df: pd.DataFrame, limit: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Summary statistics for the numeric columns of ``df``.
+
+    Computed with numpy's NaN-aware reductions on each column array rather
+    than ``DataFrame.describe()``, which builds an intermediate frame, and
+    returned as plain floats ready for ``orjson.dumps``.
+    """
+    stats = {}
+    for col in df.select_dtypes(include=np.number).columns[:limit]:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        count = int(np.count_nonzero(~np.isnan(values)))
+        if not count:
+            stats[str(col)] = {"count": 0}
+            continue
+        stats[str(col)] = {
+            "count": count,
+            "mean": float(np.nanmean(values)),
+            "std": float(np.nanstd(values, ddof=1)) if count > 1 else 0.0,
+            "min": float(np.nanmin(values)),
+            "p50": float(np.nanmedian(values)),
+            "max": float(np.nanmax(values)),
+        }
+    return stats
+
+
+@functools.lru_cache(maxsize=128)
+def _format_schema(schema_json: bytes) -> str:
+    """
+    Render a canonical (key-sorted) schema JSON document as prompt text.
+
+    Keyed on the serialized schema so dashboards issuing many queries
+    against the same data source format it once per process.
+    """
+    return "\n".join(itertools.chain.from_iterable(
+        itertools.chain(
+            (f"Table: {table_name}",),
+            (f"  - {col['name']} ({col['type']}) - {col.get('description', '')}" for col in columns)
+        )
+        for table_name, columns in orjson.loads(schema_json).items()
+    ))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client() -> openai.OpenAI:
+    """
+    Return the process-wide OpenRouter client.
+
+    The client owns an httpx connection pool, so sharing it lets every
+    service instance reuse warm keep-alive connections instead of paying
+    a TCP/TLS handshake per request. With HTTP/2 concurrent completions
+    are multiplexed over the same connection.
+    """
+    return openai.OpenAI(
+        base_url=settings.OPENROUTER_BASE_URL,
+        api_key=settings.OPENROUTER_API_KEY,
+        http_client=httpx.Client(
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+            ),
+            timeout=settings.OPENROUTER_TIMEOUT,
+            http2=settings.OPENROUTER_HTTP2,
+        ),
+    )
+
+
+def _new_async_client() -> openai.AsyncOpenAI:
+    """
+    New async OpenRouter client.
+
+    httpx async connection pools are bound to the event loop that created
+    them, so each AsyncOpenRouterService context opens (and closes) its own.
+    """
+    return openai.AsyncOpenAI(
+        base_url=settings.OPENROUTER_BASE_URL,
+        api_key=settings.OPENROUTER_API_KEY,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+            ),
+            timeout=settings.OPENROUTER_TIMEOUT,
+            http2=settings.OPENROUTER_HTTP2,
+        ),
+    )
+
+
 class OpenRouterService:
     """
     Service for interacting with OpenRouter API using DeepSeek Chat model.
     """
     
+    extra_headers = {
+        "HTTP-Referer": "https://eetl-ai-platform.com",
+        "X-Title": "EETL AI Platform",
+    }
+    
     def __init__(self):
-        self.client = openai.OpenAI(
-            base_url=settings.OPENROUTER_BASE_URL,
-            api_key=settings.OPENROUTER_API_KEY,
-        )
+        self.client = _get_client()
         self.model = settings.OPENROUTER_MODEL
     
     def chat_completion(
@@ -35,13 +160,87 @@ class OpenRouterService:
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: int = 2048,
-        stream: bool = False
+        stream: bool = False,
+        json_mode: bool = False
     ) -> Dict[str, Any]:
         """
         Generate chat completion using DeepSeek Chat model.
+        
+        Non-streaming, low-temperature requests are served from the
+        response cache when an identical request was made before.
+        ``json_mode=True`` asks the model for a single JSON object.
+        """
+        if stream or temperature > MAX_CACHEABLE_TEMPERATURE:
+            return self._create_completion(messages, temperature, max_tokens, stream, json_mode)
+        
+        return cached_completion(
+            self._cache_key_parts(messages, temperature, max_tokens, json_mode),
+            lambda: self._create_completion(messages, temperature, max_tokens, stream, json_mode)
+        )
+    
+    def cached_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        no_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Chat completion served from the semantic cache when a previous user
+        message was close enough in meaning under the same context.
+
+        Pass ``no_cache=True`` for creative calls that should always sample.
         """
+        if no_cache or not messages or messages[-1].get('role') != 'user':
+            return self.chat_completion(messages, temperature, max_tokens)
+        
+        try:
+            lookup = self._semantic_lookup(messages, temperature, max_tokens)
+        except Exception as e:
+            logger.warning(f"Semantic cache unavailable: {str(e)}")
+            return self.chat_completion(messages, temperature, max_tokens)
+        
+        if lookup is None:
+            return self.chat_completion(messages, temperature, max_tokens)
+        context, embedding, cached = lookup
+        if cached is not None:
+            return cached
+        
+        result = self.chat_completion(messages, temperature, max_tokens)
+        try:
+            semantic_cache.store(self.model, context, embedding, result)
+        except Exception as e:
+            logger.warning(f"Failed to store semantic cache entry: {str(e)}")
+        return result
+    
+    def _semantic_lookup(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[Tuple[str, np.ndarray, Optional[Dict[str, Any]]]]:
+        """
+        ``(context hash, query embedding, cached response or None)`` for
+        ``messages``, or None while the semantic cache is disabled.
+        """
+        if not semantic_cache.is_enabled():
+            return None
+        context = semantic_cache.context_hash(messages, temperature=temperature, max_tokens=max_tokens)
+        embedding = semantic_cache.embed(messages[-1]['content'])
+        return context, embedding, semantic_cache.lookup(self.model, context, embedding)
+    
+    def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+        json_mode: bool = False
+    ):
+        """Call the OpenRouter API."""
         try:
             start_time = time.time()
+            messages, max_tokens = fit_messages(messages, max_tokens)
             
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -49,87 +248,177 @@ class OpenRouterService:
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=stream,
-                extra_headers={
-                    "HTTP-Referer": "https://eetl-ai-platform.com",
-                    "X-Title": "EETL AI Platform",
-                }
+                response_format={"type": "json_object"} if json_mode else openai.NOT_GIVEN,
+                extra_headers=self.extra_headers,
+                extra_body=self._extra_body()
             )
             
-            processing_time = time.time() - start_time
-            
             if stream:
                 return response
             
-            result = {
-                'content': response.choices[0].message.content,
-                'tokens_used': response.usage.total_tokens,
-                'processing_time': processing_time,
-                'model': self.model,
-                'finish_reason': response.choices[0].finish_reason
-            }
-            
-            # Update model usage statistics (commented out for now)
-            # try:
-            #     ai_model = AIModel.objects.get(model_id=self.model)
-            #     ai_model.increment_usage(response.usage.total_tokens)
-            # except AIModel.DoesNotExist:
-            #     logger.warning(f"AI model {self.model} not found in database")
-            
-            return result
+            return self._build_result(response, time.time() - start_time)
             
         except Exception as e:
             logger.error(f"OpenRouter API error: {str(e)}")
             raise Exception(f"AI service error: {str(e)}")
     
+    def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> Iterator[str]:
+        """
+        Yield completion text chunks as the model generates them.
+        """
+        response = self._create_completion(messages, temperature, max_tokens, stream=True)
+        try:
+            for chunk in response:
+                content = self._chunk_content(chunk)
+                if content:
+                    yield content
+        except Exception as e:
+            logger.error(f"OpenRouter stream error: {str(e)}")
+            raise Exception(f"AI service error: {str(e)}")
+    
     def generate_sql_query(
         self,
         natural_language_query: str,
         table_schema: Dict[str, Any],
-        sample_data: Optional[Dict[str, Any]] = None
+        sample_data: Optional[Dict[str, Any]] = None,
+        data_source_id: Optional[str] = None,
+        schema_version: str = 'v1',
+        max_tokens: int = 256
     ) -> str:
         """
         Generate SQL query from natural language using AI.
+
+        Pass ``data_source_id`` (and a ``schema_version`` that changes when
+        the schema does) to reuse the formatted schema across requests.
+        """
+        messages = self._sql_query_messages(
+            natural_language_query, table_schema, sample_data, data_source_id, schema_version
+        )
+        response = self.chat_completion(messages, temperature=0.1, max_tokens=max_tokens)
+        return response['content'].strip()
+    
+    def generate_python_code(
+        self,
+        natural_language_query: str,
+        data_info: Dict[str, Any],
+        max_tokens: int = 768
+    ) -> str:
+        """
+        Generate Python code for data analysis.
+        """
+        messages = self._python_code_messages(natural_language_query, data_info)
+        response = self.chat_completion(messages, temperature=0.1, max_tokens=max_tokens)
+        return response['content'].strip()
+    
+    def analyze_data_quality(
+        self,
+        data_summary: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """
-        schema_description = self._format_schema_for_ai(table_schema)
+        Analyze data quality and provide recommendations.
+        """
+        messages = self._data_quality_messages(data_summary)
+        response = self.chat_completion(messages, temperature=0.3, json_mode=True)
+        return self._parse_data_quality(response['content'])
+    
+    def _cache_key_parts(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool = False
+    ) -> Dict[str, Any]:
+        """Identify a completion request for the response cache."""
+        key_parts = {
+            'model': self.model,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'messages': messages,
+        }
+        if json_mode:
+            key_parts['response_format'] = 'json_object'
+        return key_parts
+    
+    def _extra_body(self) -> Optional[Dict[str, Any]]:
+        """OpenRouter-specific request fields."""
+        if not settings.OPENROUTER_PROVIDER_ORDER:
+            return None
+        return {"provider": {"order": settings.OPENROUTER_PROVIDER_ORDER}}
+    
+    def _chunk_content(self, chunk) -> Optional[str]:
+        """Extract the text delta from a streamed chunk."""
+        if not chunk.choices:
+            return None
+        return chunk.choices[0].delta.content
+    
+    def _build_result(self, response, processing_time: float) -> Dict[str, Any]:
+        """Flatten an API response into the dict returned by chat_completion."""
+        result = {
+            'content': response.choices[0].message.content,
+            'tokens_used': response.usage.total_tokens,
+            'processing_time': processing_time,
+            'model': self.model,
+            'finish_reason': response.choices[0].finish_reason
+        }
+        
+        # Usage statistics are buffered and flushed to AIModel in batches
+        usage_buffer.add(self.model, response.usage.prompt_tokens, response.usage.completion_tokens)
+        
+        return result
+    
+    def _sql_query_messages(
+        self,
+        natural_language_query: str,
+        table_schema: Dict[str, Any],
+        sample_data: Optional[Dict[str, Any]] = None,
+        data_source_id: Optional[str] = None,
+        schema_version: str = 'v1'
+    ) -> List[Dict[str, str]]:
+        """Build the prompt for generate_sql_query."""
+        if data_source_id:
+            schema_description = self._cached_schema_text(data_source_id, schema_version, table_schema)
+        else:
+            schema_description = self._format_schema_for_ai(table_schema)
         sample_description = self._format_sample_data(sample_data) if sample_data else ""
         
+        # Stable parts first so repeated queries share a cacheable prompt prefix
         system_prompt = f"""
         You are an expert SQL query generator. Generate accurate SQL queries based on natural language requests.
         
         Table Schema:
         {schema_description}
         
-        {sample_description}
-        
         Rules:
         1. Generate only the SQL query, no explanations
         2. Use proper SQL syntax
         3. Handle edge cases and null values
         4. Use appropriate aggregations and filters
         5. Ensure the query is safe and doesn't modify data
+        
+        {sample_description}
         """
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Generate SQL query for: {natural_language_query}"}
         ]
-        
-        response = self.chat_completion(messages, temperature=0.1)
-        return response['content'].strip()
     
-    def generate_python_code(
+    def _python_code_messages(
         self,
         natural_language_query: str,
         data_info: Dict[str, Any]
-    ) -> str:
-        """
-        Generate Python code for data analysis.
-        """
+    ) -> List[Dict[str, str]]:
+        """Build the prompt for generate_python_code."""
         system_prompt = f"""
         You are an expert Python data analyst. Generate Python code using pandas for data analysis tasks.
         
         Available data information:
-        {json.dumps(data_info, indent=2)}
+        {_prompt_json(data_info)}
         
         Rules:
         1. Use pandas DataFrame operations
@@ -139,21 +428,13 @@ class OpenRouterService:
         5. Return results in a structured format
         """
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Generate Python code for: {natural_language_query}"}
         ]
-        
-        response = self.chat_completion(messages, temperature=0.1)
-        return response['content'].strip()
     
-    def analyze_data_quality(
-        self,
-        data_summary: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Analyze data quality and provide recommendations.
-        """
+    def _data_quality_messages(self, data_summary: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build the prompt for analyze_data_quality."""
         system_prompt = """
         You are a data quality expert. Analyze the provided data summary and identify quality issues.
         Provide specific recommendations for data cleaning and improvement.
@@ -165,90 +446,501 @@ class OpenRouterService:
         - summary: brief text summary
         """
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Analyze this data: {json.dumps(data_summary, indent=2)}"}
+            {"role": "user", "content": f"Analyze this data: {_prompt_json(data_summary)}"}
         ]
-        
-        response = self.chat_completion(messages, temperature=0.3)
-        
+    
+    def _parse_data_quality(self, content: str) -> Dict[str, Any]:
+        """Parse the model's data quality answer, falling back to plain text."""
         try:
-            return json.loads(response['content'])
-        except json.JSONDecodeError:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
             return {
                 "overall_score": 50,
                 "issues": [],
                 "recommendations": [],
-                "summary": response['content']
+                "summary": content
             }
     
+    def _cached_schema_text(self, data_source_id: str, schema_version: str, schema: Dict[str, Any]) -> str:
+        """Formatted schema for a data source, shared across requests via the cache."""
+        key = f"schema_fmt:{data_source_id}:{schema_version}"
+        try:
+            text = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Schema text cache unavailable: {str(e)}")
+            return self._format_schema_for_ai(schema)
+        
+        if text is None:
+            text = self._format_schema_for_ai(schema)
+            try:
+                cache.set(key, text, timeout=settings.AI_SCHEMA_CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache schema text: {str(e)}")
+        return text
+    
     def _format_schema_for_ai(self, schema: Dict[str, Any]) -> str:
         """Format table schema for AI consumption."""
-        formatted = []
-        for table_name, columns in schema.items():
-            formatted.append(f"Table: {table_name}")
-            for col in columns:
-                formatted.append(f"  - {col['name']} ({col['type']}) - {col.get('description', '')}")
-        return "\n".join(formatted)
+        return _format_schema(orjson.dumps(schema, default=str, option=orjson.OPT_SORT_KEYS))
     
     def _format_sample_data(self, sample_data: Dict[str, Any]) -> str:
         """Format sample data for AI consumption."""
         if not sample_data:
             return ""
         
-        formatted = ["Sample Data:"]
-        for table_name, rows in sample_data.items():
-            formatted.append(f"Table: {table_name}")
-            if rows:
-                # Show first few rows
-                for i, row in enumerate(rows[:3]):
-                    formatted.append(f"  Row {i+1}: {row}")
-        return "\n".join(formatted)
+        # Show first few rows of each table
+        return "\n".join(itertools.chain(
+            ("Sample Data:",),
+            itertools.chain.from_iterable(
+                itertools.chain(
+                    (f"Table: {table_name}",),
+                    (f"  Row {i+1}: {row}" for i, row in enumerate((rows or [])[:3]))
+                )
+                for table_name, rows in sample_data.items()
+            )
+        ))
+
+
+class AsyncOpenRouterService(OpenRouterService):
+    """
+    Async variant of OpenRouterService for ASGI views.
+
+    Completions do not block a worker thread, so independent prompts can
+    be fanned out together, e.g.::
+
+        sql, quality = await asyncio.gather(
+            service.generate_sql_query(query, schema),
+            service.analyze_data_quality(summary),
+        )
+
+    The service owns an HTTP connection pool bound to the running event
+    loop, so it is used as an async context manager that closes the pool::
+
+        async with AsyncOpenRouterService() as service:
+            response = await service.chat_completion(messages)
+
+    WSGI views keep using the synchronous OpenRouterService.
+    """
+    
+    def __init__(self):
+        self.model = settings.OPENROUTER_MODEL
+        self.client = None
+    
+    async def __aenter__(self) -> 'AsyncOpenRouterService':
+        self.client = _new_async_client()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        client, self.client = self.client, None
+        await client.close()
+    
+    async def chat_completions(
+        self,
+        message_lists: List[List[Dict[str, str]]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Run independent chat completions concurrently, in input order, with at
+        most OPENROUTER_BATCH_CONCURRENCY in flight. A completion that fails is
+        returned as its exception so the others still come back.
+        """
+        semaphore = asyncio.Semaphore(settings.OPENROUTER_BATCH_CONCURRENCY)
+        
+        async def complete(messages):
+            async with semaphore:
+                return await self.chat_completion(messages, temperature=temperature, max_tokens=max_tokens)
+        
+        return await asyncio.gather(*(complete(messages) for messages in message_lists), return_exceptions=True)
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        stream: bool = False,
+        json_mode: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate chat completion without blocking the event loop.
+        """
+        if stream or temperature > MAX_CACHEABLE_TEMPERATURE:
+            return await self._create_completion(messages, temperature, max_tokens, stream, json_mode)
+        
+        return await acached_completion(
+            self._cache_key_parts(messages, temperature, max_tokens, json_mode),
+            lambda: self._create_completion(messages, temperature, max_tokens, stream, json_mode)
+        )
+    
+    async def cached_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        no_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Async counterpart of OpenRouterService.cached_chat_completion; the
+        embedding and cache queries run in a worker thread.
+        """
+        if no_cache or not messages or messages[-1].get('role') != 'user':
+            return await self.chat_completion(messages, temperature, max_tokens)
+        
+        try:
+            lookup = await sync_to_async(self._semantic_lookup)(messages, temperature, max_tokens)
+        except Exception as e:
+            logger.warning(f"Semantic cache unavailable: {str(e)}")
+            return await self.chat_completion(messages, temperature, max_tokens)
+        
+        if lookup is None:
+            return await self.chat_completion(messages, temperature, max_tokens)
+        context, embedding, cached = lookup
+        if cached is not None:
+            return cached
+        
+        result = await self.chat_completion(messages, temperature, max_tokens)
+        try:
+            await sync_to_async(semantic_cache.store)(self.model, context, embedding, result)
+        except Exception as e:
+            logger.warning(f"Failed to store semantic cache entry: {str(e)}")
+        return result
+    
+    async def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+        json_mode: bool = False
+    ):
+        """Call the OpenRouter API."""
+        try:
+            start_time = time.time()
+            messages, max_tokens = fit_messages(messages, max_tokens)
+            
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=stream,
+                response_format={"type": "json_object"} if json_mode else openai.NOT_GIVEN,
+                extra_headers=self.extra_headers,
+                extra_body=self._extra_body()
+            )
+            
+            if stream:
+                return response
+            
+            return self._build_result(response, time.time() - start_time)
+            
+        except Exception as e:
+            logger.error(f"OpenRouter API error: {str(e)}")
+            raise Exception(f"AI service error: {str(e)}")
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """
+        Yield completion text chunks as the model generates them.
+        """
+        response = await self._create_completion(messages, temperature, max_tokens, stream=True)
+        try:
+            async for chunk in response:
+                content = self._chunk_content(chunk)
+                if content:
+                    yield content
+        except Exception as e:
+            logger.error(f"OpenRouter stream error: {str(e)}")
+            raise Exception(f"AI service error: {str(e)}")
+    
+    async def generate_sql_query(
+        self,
+        natural_language_query: str,
+        table_schema: Dict[str, Any],
+        sample_data: Optional[Dict[str, Any]] = None,
+        data_source_id: Optional[str] = None,
+        schema_version: str = 'v1',
+        max_tokens: int = 256
+    ) -> str:
+        """
+        Generate SQL query from natural language using AI.
+
+        Pass ``data_source_id`` (and a ``schema_version`` that changes when
+        the schema does) to reuse the formatted schema across requests.
+        """
+        messages = self._sql_query_messages(
+            natural_language_query, table_schema, sample_data, data_source_id, schema_version
+        )
+        response = await self.chat_completion(messages, temperature=0.1, max_tokens=max_tokens)
+        return response['content'].strip()
+    
+    async def generate_python_code(
+        self,
+        natural_language_query: str,
+        data_info: Dict[str, Any],
+        max_tokens: int = 768
+    ) -> str:
+        """
+        Generate Python code for data analysis.
+        """
+        messages = self._python_code_messages(natural_language_query, data_info)
+        response = await self.chat_completion(messages, temperature=0.1, max_tokens=max_tokens)
+        return response['content'].strip()
+    
+    async def analyze_data_quality(
+        self,
+        data_summary: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Analyze data quality and provide recommendations.
+        """
+        messages = self._data_quality_messages(data_summary)
+        response = await self.chat_completion(messages, temperature=0.3, json_mode=True)
+        return self._parse_data_quality(response['content'])
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# model_name -> (tokenizer, model); loading takes seconds and ~100 MB, so
+# each model is loaded once per process
+_MODEL_CACHE: Dict[str, Tuple[Any, Any]] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _embedding_model_id(model_name: str) -> str:
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+
+def _load_embedding_model(model_name: str) -> Tuple[Any, Any]:
+    with _MODEL_LOCK:
+        if model_name not in _MODEL_CACHE:
+            # Imported here so the rest of the AI engine works without the
+            # ONNX Runtime dependencies installed
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+
+            model_id = _embedding_model_id(model_name)
+            _MODEL_CACHE[model_name] = (
+                AutoTokenizer.from_pretrained(model_id),
+                ORTModelForFeatureExtraction.from_pretrained(
+                    model_id,
+                    subfolder='onnx',
+                    file_name=settings.EMBEDDING_ONNX_FILE,
+                    provider='CPUExecutionProvider',
+                ),
+            )
+        return _MODEL_CACHE[model_name]
+
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_service(model_name: str = DEFAULT_EMBEDDING_MODEL) -> 'EmbeddingService':
+    """
+    Return the process-wide EmbeddingService for ``model_name``.
+
+    Sharing the service also shares its batcher, so concurrent requests
+    coalesce into the same forward passes.
+    """
+    return EmbeddingService(model_name)
 
 
 class EmbeddingService:
     """
     Service for generating embeddings for RAG implementation.
+
+    Runs the int8-quantized ONNX export of the sentence-transformers model
+    on ONNX Runtime's CPU provider, which dispatches to VNNI int8 kernels
+    where the CPU supports them.
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        # self.model = SentenceTransformer(model_name)
+    # Lists shorter than this go through the coalescing batcher
+    COALESCE_BELOW = 8
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
         self.model_name = model_name
+        self.model_id = _embedding_model_id(model_name)
+        self.tokenizer, self.model = _load_embedding_model(model_name)
+        self.dimensions = self.model.config.hidden_size
+        self._queue = None
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        # Bulk encodes for async callers, off the event loop. The ONNX Runtime
+        # session is also run by the batcher thread and by sync callers; its
+        # run() is thread-safe, so one worker only caps async bulk encodes at
+        # one at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embedding-encode')
     
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings for a list of texts."""
-        # Temporarily disabled - requires sentence-transformers
-        raise NotImplementedError("Embedding service temporarily disabled")
+    def generate_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Generate L2-normalized embeddings for a list of texts."""
+        if 0 < len(texts) < self.COALESCE_BELOW:
+            # Small requests share forward passes with concurrent callers
+            futures = [self._submit(text) for text in texts]
+            return np.stack([future.result() for future in futures])
+        return self._encode_batches(texts, batch_size)
     
     def generate_single_embedding(self, text: str) -> np.ndarray:
-        """Generate embedding for a single text."""
-        # Temporarily disabled - requires sentence-transformers
-        raise NotImplementedError("Embedding service temporarily disabled")
+        """
+        Generate embedding for a single text.
+
+        Concurrent callers are coalesced into one batched forward pass by a
+        background worker, which waits up to EMBEDDING_BATCH_WAIT_MS for
+        other texts to arrive.
+        """
+        return self._submit(text).result()
+    
+    def encode_query(self, text: str) -> np.ndarray:
+        """
+        Embed a search query as a ``(1, dimensions)`` float32 matrix.
+
+        The row is a view into the coalesced batch's output, so it reaches
+        the vector store without any list round trip or copy.
+        """
+        return self._submit(text).result()[np.newaxis, :]
+    
+    async def agenerate_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Async counterpart of generate_embeddings that never blocks the event loop."""
+        if 0 < len(texts) < self.COALESCE_BELOW:
+            embeddings = await asyncio.gather(*(asyncio.wrap_future(self._submit(text)) for text in texts))
+            return np.stack(embeddings)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._encode_batches, texts, batch_size
+        )
+    
+    async def agenerate_single_embedding(self, text: str) -> np.ndarray:
+        """Async counterpart of generate_single_embedding."""
+        return await asyncio.wrap_future(self._submit(text))
+    
+    def _submit(self, text: str) -> Future:
+        self._ensure_batcher()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+    
+    def _encode_batches(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        # Each batch is pooled straight into its slice of one preallocated
+        # float32 matrix, so large corpora are never held twice
+        start_time = time.time()
+        embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            self._encode_batch(texts[start:start + batch_size], embeddings[start:start + batch_size])
+        usage_buffer.add_embeddings(self.model_id, len(texts), time.time() - start_time)
+        return embeddings
+    
+    def _encode_batch(self, texts: List[str], out: np.ndarray):
+        inputs = self.tokenizer(texts, padding=True, truncation=True, return_tensors='np')
+        token_embeddings = self.model(**inputs).last_hidden_state
+        
+        # Mean-pool over real tokens, then L2-normalize; einsum avoids a
+        # masked copy of the (batch, tokens, dim) hidden states
+        mask = inputs['attention_mask'].astype(np.float32)
+        np.einsum('bsd,bs->bd', token_embeddings.astype(np.float32, copy=False), mask, out=out)
+        out /= np.clip(mask.sum(axis=1, keepdims=True), 1e-9, None)
+        out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+    
+    def _ensure_batcher(self):
+        if self._batcher is not None:
+            return
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._queue = queue.Queue()
+                self._batcher = threading.Thread(
+                    target=self._run_batcher,
+                    name='embedding-batcher',
+                    daemon=True
+                )
+                self._batcher.start()
+    
+    def _run_batcher(self):
+        wait = settings.EMBEDDING_BATCH_WAIT_MS / 1000
+        max_items = settings.EMBEDDING_MAX_BATCH_SIZE
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + wait
+            while len(items) < max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                embeddings = self._encode_batches([text for text, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(items, embeddings):
+                future.set_result(embedding)
+
+
+def get_embedding_model(embedding_service) -> EmbeddingModel:
+    """Return the EmbeddingModel row describing ``embedding_service``, creating it on first use."""
+    embedding_model, _ = EmbeddingModel.objects.get_or_create(
+        name=embedding_service.model_name,
+        defaults={
+            'model_id': embedding_service.model_id,
+            'dimensions': embedding_service.dimensions,
+        }
+    )
+    return embedding_model
 
 
 class VectorStoreService:
     """
-    Service for managing vector stores using ChromaDB.
+    Service for managing vector stores.
+
+    Embeddings live in Postgres (pgvector) as DocumentChunk rows next to
+    their VectorStore, so queries need no extra network hop and can be
+    joined against the rest of the schema.
     """
 
-    def __init__(self):
-        # Temporarily disabled - requires ChromaDB
-        # self.client = chromadb.PersistentClient(
-        #     path=settings.CHROMA_PERSIST_DIRECTORY
-        # )
-        # self.embedding_service = EmbeddingService()
-        pass
+    INGEST_BATCH_SIZE = 1000
+
+    def __init__(self, embedding_service: Optional['EmbeddingService'] = None):
+        self.embedding_service = embedding_service or get_embedding_service()
     
     def create_collection(
         self,
         collection_name: str,
         documents: List[str],
         metadatas: List[Dict[str, Any]] = None,
-        ids: List[str] = None
-    ):
-        """Create a new vector collection."""
-        # Temporarily disabled - requires ChromaDB
-        raise NotImplementedError("Vector store service temporarily disabled")
+        ids: List[str] = None,
+        *,
+        user,
+        name: Optional[str] = None,
+        data_source_id: Optional[str] = None
+    ) -> VectorStore:
+        """
+        Create a new vector collection owned by ``user``, replacing any
+        existing one of the same name.
+        """
+        start_time = time.time()
+        embedding_model = get_embedding_model(self.embedding_service)
+        embeddings = self._embed(documents)
+        
+        with transaction.atomic():
+            VectorStore.objects.filter(collection_name=collection_name).delete()
+            store = VectorStore.objects.create(
+                name=name or collection_name,
+                collection_name=collection_name,
+                user=user,
+                data_source_id=data_source_id,
+                embedding_model=embedding_model
+            )
+            self._insert_chunks(store, documents, embeddings, metadatas, ids)
+            store.document_count = store.chunks.count()
+            store.status = VectorStore.Status.READY
+            store.build_time = time.time() - start_time
+            store.save(update_fields=['document_count', 'status', 'build_time', 'updated_at'])
+        
+        context_cache.invalidate(collection_name)
+        return store
     
     def query_collection(
         self,
@@ -257,8 +949,53 @@ class VectorStoreService:
         n_results: int = 5
     ) -> Dict[str, Any]:
         """Query a vector collection."""
-        # Temporarily disabled - requires ChromaDB
-        raise NotImplementedError("Vector store service temporarily disabled")
+        query_embedding = self.embedding_service.encode_query(query_text)
+        if connection.vendor != 'postgresql':
+            return self._scan_collection(collection_name, query_embedding[0], n_results)
+        
+        # The HNSW index spans every store's chunks and the store filter is
+        # applied to the at most hnsw.ef_search candidates it returns, so a
+        # small store can come back short. Small stores are ranked exactly on
+        # the full-precision vectors, which no index covers; large ones go
+        # through the halfvec index with ef_search widened, falling back to
+        # an exact ranking if the filter still leaves too few rows.
+        # Embeddings are unit-norm, so ranking by inner product equals
+        # ranking by cosine without normalizing at query time.
+        store_size = (
+            VectorStore.objects
+            .filter(collection_name=collection_name)
+            .values_list('document_count', flat=True)
+            .first()
+        ) or 0
+        chunks = DocumentChunk.objects.filter(store__collection_name=collection_name)
+        exact = MaxInnerProduct('embedding', query_embedding[0])
+        if store_size < EXACT_SEARCH_BELOW:
+            rows = self._rank_chunks(chunks, exact, n_results)
+        else:
+            ef_search = min(HNSW_MAX_EF_SEARCH, max(settings.PGVECTOR_HNSW_EF_SEARCH, n_results))
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT set_config('hnsw.ef_search', %s, true)", [str(ef_search)])
+                rows = self._rank_chunks(chunks, HalfMaxInnerProduct('embedding', query_embedding[0]), n_results)
+            if len(rows) < min(n_results, store_size):
+                rows = self._rank_chunks(chunks, exact, n_results)
+        
+        return {
+            'ids': [c['chunk_id'] for c in rows],
+            'documents': [c['text'] for c in rows],
+            'metadatas': [c['metadata'] for c in rows],
+            # Cosine distance, for unit vectors
+            'distances': [1 + c['neg_inner_product'] for c in rows],
+        }
+    
+    @staticmethod
+    def _rank_chunks(chunks, neg_inner_product, n_results: int) -> List[Dict[str, Any]]:
+        return list(
+            chunks
+            .annotate(neg_inner_product=neg_inner_product)
+            .order_by('neg_inner_product')
+            .values('chunk_id', 'text', 'metadata', 'neg_inner_product')[:n_results]
+        )
     
     def add_documents(
         self,
@@ -267,9 +1004,86 @@ class VectorStoreService:
         metadatas: List[Dict[str, Any]] = None,
         ids: List[str] = None
     ):
-        """Add documents to existing collection."""
-        # Temporarily disabled - requires ChromaDB
-        raise NotImplementedError("Vector store service temporarily disabled")
+        """
+        Add documents to existing collection.
+
+        Chunks are written with multi-row INSERTs of INGEST_BATCH_SIZE rows
+        rather than one round trip per document; chunk IDs already in the
+        store are skipped. Model instances are built one batch at a time so
+        large ingests never hold every row's objects at once.
+        """
+        store = VectorStore.objects.get(collection_name=collection_name)
+        embeddings = self._embed(documents)
+        
+        with transaction.atomic():
+            self._insert_chunks(store, documents, embeddings, metadatas, ids)
+        
+        store.document_count = store.chunks.count()
+        store.save(update_fields=['document_count', 'updated_at'])
+        context_cache.invalidate(collection_name)
+    
+    def _embed(self, documents: List[str]) -> np.ndarray:
+        embeddings = self.embedding_service.generate_embeddings(documents)
+        if settings.DEBUG:
+            assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-3), \
+                "Vector store embeddings must be unit-norm for inner-product search"
+        return embeddings
+    
+    def _insert_chunks(
+        self,
+        store: VectorStore,
+        documents: List[str],
+        embeddings: np.ndarray,
+        metadatas: Optional[List[Dict[str, Any]]],
+        ids: Optional[List[str]]
+    ):
+        metadatas = metadatas or [{} for _ in documents]
+        ids = ids or [str(uuid.uuid4()) for _ in documents]
+        for start in range(0, len(documents), self.INGEST_BATCH_SIZE):
+            end = start + self.INGEST_BATCH_SIZE
+            DocumentChunk.objects.bulk_create(
+                [
+                    DocumentChunk(
+                        store=store,
+                        chunk_id=chunk_id,
+                        text=text,
+                        embedding=embedding,
+                        metadata=metadata
+                    )
+                    for chunk_id, text, embedding, metadata in zip(
+                        ids[start:end], documents[start:end], embeddings[start:end], metadatas[start:end]
+                    )
+                ],
+                ignore_conflicts=True
+            )
+    
+    def _scan_collection(self, collection_name: str, query_embedding: np.ndarray, n_results: int) -> Dict[str, Any]:
+        """Exact search in NumPy, for databases without pgvector (SQLite in development)."""
+        chunks = list(
+            DocumentChunk.objects
+            .filter(store__collection_name=collection_name)
+            .values_list('chunk_id', 'text', 'metadata', 'embedding')
+        )
+        if not chunks:
+            return {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        
+        scores, top = _exact_search(np.stack([c[3] for c in chunks]).astype(np.float32), query_embedding, n_results)
+        return {
+            'ids': [chunks[i][0] for i in top],
+            'documents': [chunks[i][1] for i in top],
+            'metadatas': [chunks[i][2] for i in top],
+            # Cosine distance, for unit vectors
+            'distances': [float(1 - score) for score in scores],
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def get_vector_store():
+    """Return the process-wide vector store service selected by VECTOR_BACKEND."""
+    if settings.VECTOR_BACKEND == 'faiss':
+        from .faiss_store import FAISSVectorStore
+        return FAISSVectorStore()
+    return VectorStoreService()
 
 
 class RAGService:
@@ -277,31 +1091,137 @@ class RAGService:
     Service for Retrieval-Augmented Generation.
     """
     
+    # Sample rows per document in a data source's context collection
+    CONTEXT_ROWS_PER_CHUNK = 20
+    
     def __init__(self):
         self.openrouter_service = OpenRouterService()
-        # self.vector_service = VectorStoreService()
+    
+    @property
+    def vector_service(self):
+        return get_vector_store()
     
     def query_with_context(
         self,
         query: str,
         collection_name: str,
         conversation_history: List[Dict[str, str]] = None,
-        n_context_docs: int = 3
+        n_context_docs: int = 3,
+        conversation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Answer query using RAG with retrieved context.
         """
-        # Temporarily disabled - requires ChromaDB
-        raise NotImplementedError("RAG service temporarily disabled")
+        context = self.retrieve_context(collection_name, query, n_context_docs, conversation_id)
+        context_text = "\n\n".join(context['documents'])
+        
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You are a helpful AI assistant for an ETL (Extract, Transform, Load) platform. "
+                    "Answer using the data context below; say so when it does not contain the answer.\n\n"
+                    f"Context:\n{context_text}"
+                )
+            },
+            *(conversation_history or []),
+            {"role": "user", "content": query}
+        ]
+        
+        response = self.openrouter_service.chat_completion(messages)
+        response['sources'] = context['ids']
+        return response
+    
+    def retrieve_context(
+        self,
+        collection_name: str,
+        query: str,
+        n_results: int = 3,
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the documents most relevant to ``query``.
+
+        Repeated queries within AI_RAG_CONTEXT_CACHE_TIMEOUT skip the
+        embedding and vector search entirely.
+        """
+        results = context_cache.lookup(collection_name, query, n_results, conversation_id)
+        if results is None:
+            results = self.vector_service.query_collection(collection_name, query, n_results=n_results)
+            context_cache.store(collection_name, query, n_results, results, conversation_id)
+        return results
+    
+    def record_exchange(
+        self,
+        conversation: Conversation,
+        query: str,
+        response: Dict[str, Any]
+    ) -> List[Message]:
+        """
+        Log a user query and the assistant response in one INSERT.
+        """
+        return conversation.add_messages([
+            Message(
+                role=Message.Role.USER,
+                content=query
+            ),
+            Message(
+                role=Message.Role.ASSISTANT,
+                content=response['content'],
+                tokens_used=response['tokens_used'],
+                processing_time=response['processing_time'],
+                model_used=response['model']
+            ),
+        ])
     
     def create_data_context(
         self,
         data_source_id: str,
         data_summary: Dict[str, Any],
-        sample_data: pd.DataFrame = None
+        sample_data: pd.DataFrame = None,
+        *,
+        user
     ) -> str:
         """
         Create vector store collection for a data source.
+
+        The collection holds one document for the dataset overview, one per
+        column in ``data_summary['columns']``, one with numeric_column_stats
+        of the sample and the sample rows in chunks of CONTEXT_ROWS_PER_CHUNK;
+        it replaces any earlier context built for the data source. Returns
+        the collection name.
         """
-        # Temporarily disabled - requires ChromaDB
-        raise NotImplementedError("RAG service temporarily disabled")
+        collection_name = f"data_source_{data_source_id}"
+        overview = {key: value for key, value in data_summary.items() if key != 'columns'}
+        documents = [('overview', 'summary', f"Dataset overview:\n{_prompt_json(overview)}")]
+        documents.extend(
+            (f"column:{i}", 'column', f"Column {column.get('name', i)}:\n{_prompt_json(column)}")
+            for i, column in enumerate(data_summary.get('columns') or [])
+        )
+        if sample_data is not None:
+            stats = numeric_column_stats(sample_data)
+            if stats:
+                documents.append((
+                    'stats',
+                    'statistics',
+                    f"Numeric column statistics over {len(sample_data)} sample rows:\n{_prompt_json(stats)}"
+                ))
+            for start in range(0, len(sample_data), self.CONTEXT_ROWS_PER_CHUNK):
+                rows = sample_data.iloc[start:start + self.CONTEXT_ROWS_PER_CHUNK]
+                documents.append((
+                    f"rows:{start}",
+                    'sample_rows',
+                    f"Sample rows {start + 1}-{start + len(rows)}:\n{rows.to_csv(index=False)}"
+                ))
+        
+        ids, kinds, texts = zip(*documents)
+        self.vector_service.create_collection(
+            collection_name,
+            list(texts),
+            metadatas=[{'kind': kind} for kind in kinds],
+            ids=list(ids),
+            user=user,
+            name=data_summary.get('dataset_name') or collection_name,
+            data_source_id=data_source_id
+        )
+        return collection_name
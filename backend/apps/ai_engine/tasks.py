@@ -0,0 +1,72 @@
+"""
+Celery tasks for AI Engine app.
+
+RAG indexing and retrieval can take seconds (embedding thousands of chunks,
+vector search plus an LLM call), so views dispatch them here instead of
+holding a web worker for the duration.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from . import semantic_cache
+from .models import Conversation
+from .services import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def build_data_context_task(
+    user_id: int,
+    data_source_id: str,
+    data_summary: Dict[str, Any],
+    sample_records: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """Build the vector store collection for a data source, owned by ``user_id``."""
+    user = get_user_model().objects.only('id').get(pk=user_id)
+    sample_data = pd.DataFrame.from_records(sample_records) if sample_records else None
+    collection_name = RAGService().create_data_context(data_source_id, data_summary, sample_data, user=user)
+    logger.info(f"Built data context {collection_name} for data source {data_source_id}")
+    return collection_name
+
+
+@shared_task
+def query_with_context_task(
+    query: str,
+    collection_name: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    n_context_docs: int = 3,
+    conversation_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Answer a query using RAG over an existing collection, logging the
+    exchange to ``conversation_id`` when one is given.
+    """
+    rag_service = RAGService()
+    response = rag_service.query_with_context(
+        query,
+        collection_name,
+        conversation_history=conversation_history,
+        n_context_docs=n_context_docs,
+        conversation_id=conversation_id
+    )
+    if conversation_id:
+        conversation = Conversation.objects.filter(pk=conversation_id).first()
+        if conversation is None:
+            logger.warning(f"Conversation {conversation_id} was deleted before its RAG answer was logged")
+        else:
+            rag_service.record_exchange(conversation, query, response)
+    return response
+
+
+@shared_task(ignore_result=True)
+def purge_semantic_cache():
+    """Delete semantic cache entries past AI_SEMANTIC_CACHE_TIMEOUT."""
+    deleted = semantic_cache.purge_expired()
+    if deleted:
+        logger.info(f"Purged {deleted} expired semantic cache entries")
@@ -0,0 +1,430 @@
+"""
+Tests for AI engine app.
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+import uuid
+import zlib
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+import numpy as np
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.authentication.authentication import issue_tokens
+
+from .expressions import EMBEDDING_DIMENSIONS
+from .faiss_store import FAISSVectorStore
+from . import semantic_cache, usage_buffer
+from .models import AIModel, Conversation, DocumentChunk, EmbeddingModel, Message, SemanticCacheEntry, VectorStore
+from .serializers import MAX_BATCH_MESSAGES
+from .services import AsyncOpenRouterService, OpenRouterService, RAGService, VectorStoreService
+from .tasks import purge_semantic_cache, query_with_context_task
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class KeywordEmbeddings:
+    """Deterministic bag-of-words embeddings, standing in for the ONNX model."""
+
+    model_name = 'keyword-test'
+    model_id = 'test/keyword'
+    dimensions = EMBEDDING_DIMENSIONS
+
+    def _vector(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in re.findall(r'\w+', text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1
+        return vector / np.linalg.norm(vector)
+
+    def generate_embeddings(self, texts):
+        return np.stack([self._vector(text) for text in texts])
+
+    def encode_query(self, text):
+        return self._vector(text)[np.newaxis, :]
+
+
+def make_user(email):
+    return get_user_model().objects.create_user(
+        username=email.split('@')[0], email=email, password='s3cret-Passw0rd'
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VectorStoreServiceTests(TestCase):
+    def setUp(self):
+        self.user = make_user('vectors@example.com')
+        self.service = VectorStoreService(embedding_service=KeywordEmbeddings())
+
+    def test_create_collection_then_query(self):
+        store = self.service.create_collection(
+            'fruit',
+            ['apples are red', 'bananas are yellow', 'grapes are purple'],
+            metadatas=[{'row': 0}, {'row': 1}, {'row': 2}],
+            ids=['a', 'b', 'c'],
+            user=self.user
+        )
+
+        self.assertEqual(store.status, VectorStore.Status.READY)
+        self.assertEqual(store.document_count, 3)
+
+        results = self.service.query_collection('fruit', 'yellow bananas', n_results=2)
+        self.assertEqual(results['ids'][0], 'b')
+        self.assertEqual(results['metadatas'][0], {'row': 1})
+        self.assertEqual(len(results['ids']), 2)
+        self.assertLess(results['distances'][0], results['distances'][1])
+
+    def test_small_store_is_not_starved_by_a_large_one(self):
+        self.service.create_collection(
+            'large', [f"apples are red {i}" for i in range(60)], ids=[f"l{i}" for i in range(60)], user=self.user
+        )
+        self.service.create_collection(
+            'small', ['apples are green', 'apples are sour', 'pears are ripe'], ids=['s0', 's1', 's2'], user=self.user
+        )
+
+        small = self.service.query_collection('small', 'apples', n_results=5)
+        self.assertEqual(sorted(small['ids']), ['s0', 's1', 's2'])
+        self.assertEqual(small['ids'][-1], 's2')
+        large = self.service.query_collection('large', 'apples', n_results=5)
+        self.assertEqual(len(large['ids']), 5)
+        self.assertTrue(all(chunk_id.startswith('l') for chunk_id in large['ids']))
+
+    def test_create_collection_inserts_in_shards(self):
+        self.service.INGEST_BATCH_SIZE = 2
+        documents = [f"document number {i}" for i in range(5)]
+
+        with mock.patch.object(DocumentChunk.objects, 'bulk_create', wraps=DocumentChunk.objects.bulk_create) as bulk_create:
+            store = self.service.create_collection('shards', documents, user=self.user)
+
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 1])
+        self.assertEqual(store.document_count, 5)
+
+    def test_create_collection_replaces_existing_one(self):
+        self.service.create_collection('fruit', ['apples are red'], ids=['a'], user=self.user)
+        self.service.query_collection('fruit', 'apples')
+
+        self.service.create_collection('fruit', ['plums are purple'], ids=['p'], user=self.user)
+
+        self.assertEqual(VectorStore.objects.filter(collection_name='fruit').count(), 1)
+        self.assertEqual(self.service.query_collection('fruit', 'plums')['ids'], ['p'])
+
+    def test_deleted_collection_stops_answering(self):
+        self.service.create_collection('fruit', ['apples are red'], ids=['a'], user=self.user)
+        self.assertEqual(self.service.query_collection('fruit', 'apples')['ids'], ['a'])
+
+        VectorStore.objects.filter(collection_name='fruit').delete()
+
+        self.assertEqual(self.service.query_collection('fruit', 'apples')['ids'], [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FAISSVectorStoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user('faiss@example.com')
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        self.index_dir = index_dir.name
+        with override_settings(FAISS_INDEX_DIR=self.index_dir):
+            self.service = FAISSVectorStore(embedding_service=KeywordEmbeddings())
+
+    def test_create_collection_owns_a_store_row(self):
+        store = self.service.create_collection(
+            'fruit', ['apples are red', 'bananas are yellow'], ids=['a', 'b'], user=self.user, name='Fruit'
+        )
+
+        self.assertEqual(store, VectorStore.objects.get(collection_name='fruit', user=self.user))
+        self.assertEqual((store.name, store.status, store.document_count), ('Fruit', VectorStore.Status.READY, 2))
+        self.assertEqual(self.service.query_collection('fruit', 'yellow bananas', n_results=1)['ids'], ['b'])
+
+        self.service.add_documents('fruit', ['grapes are purple'], ids=['c'])
+        store.refresh_from_db()
+        self.assertEqual(store.document_count, 3)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), ['fruit.faiss', 'fruit.json'])
+
+    def test_collection_name_may_not_escape_the_index_dir(self):
+        for name in ('../escape', 'a/b', 'a.b', ''):
+            with self.assertRaises(ValueError):
+                self.service.create_collection(name, ['apples'], user=self.user)
+        self.assertFalse(VectorStore.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RAGServiceTests(TestCase):
+    def setUp(self):
+        self.user = make_user('rag@example.com')
+        vector_store = VectorStoreService(embedding_service=KeywordEmbeddings())
+        patcher = mock.patch('apps.ai_engine.services.get_vector_store', return_value=vector_store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_data_context_indexes_summary_columns_stats_and_rows(self):
+        data_source_id = str(uuid.uuid4())
+        sample = pd.DataFrame({'species': ['setosa'] * 25, 'petal_length': [1.4] * 25})
+
+        collection_name = RAGService().create_data_context(
+            data_source_id,
+            {
+                'dataset_name': 'iris',
+                'total_rows': 150,
+                'columns': [{'name': 'species', 'type': 'object'}, {'name': 'petal_length', 'type': 'float64'}],
+            },
+            sample,
+            user=self.user
+        )
+
+        store = VectorStore.objects.get(collection_name=collection_name)
+        self.assertEqual(str(store.data_source_id), data_source_id)
+        self.assertEqual(store.name, 'iris')
+        self.assertEqual(
+            sorted(store.chunks.values_list('chunk_id', flat=True)),
+            ['column:0', 'column:1', 'overview', 'rows:0', 'rows:20', 'stats']
+        )
+        stats = store.chunks.get(chunk_id='stats')
+        self.assertEqual(stats.metadata, {'kind': 'statistics'})
+        self.assertIn('"petal_length":{"count":25', stats.text)
+        context = RAGService().retrieve_context(collection_name, 'Column petal_length', n_results=1)
+        self.assertEqual(context['ids'], ['column:1'])
+
+    @mock.patch.object(OpenRouterService, 'chat_completion', return_value={
+        'content': 'Apples are red.', 'tokens_used': 42, 'processing_time': 0.5, 'model': 'test/model'
+    })
+    def test_query_task_logs_the_exchange_to_the_conversation(self, chat_completion):
+        RAGService().vector_service.create_collection('fruit', ['apples are red'], ids=['a'], user=self.user)
+        conversation = Conversation.objects.create(user=self.user)
+
+        response = query_with_context_task('What colour are apples?', 'fruit', conversation_id=str(conversation.pk))
+
+        self.assertEqual(response['sources'], ['a'])
+        self.assertCountEqual(
+            conversation.messages.values_list('role', 'content', 'tokens_used'),
+            [(Message.Role.USER, 'What colour are apples?', 0), (Message.Role.ASSISTANT, 'Apples are red.', 42)]
+        )
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.message_count, conversation.total_tokens), (2, 42))
+
+        query_with_context_task('What colour are apples?', 'fruit')
+        self.assertEqual(Message.objects.count(), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RAGViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.other = make_user('other@example.com')
+        embedding_model = EmbeddingModel.objects.create(name='keyword-test', model_id='test/keyword', dimensions=384)
+        VectorStore.objects.create(
+            name='fruit', collection_name='fruit', user=self.user, embedding_model=embedding_model
+        )
+
+    def request(self, method, path, user, data=None):
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {issue_tokens(user)['access']}"} if user else {}
+        return getattr(self.client, method)(
+            path, data, content_type='application/json', HTTP_HOST='localhost', secure=True, **headers
+        )
+
+    @mock.patch('apps.ai_engine.views.query_with_context_task.delay')
+    def test_rag_query_requires_authentication(self, delay):
+        response = self.request('post', '/api/ai/rag/query/', None, {'query': 'q', 'collection_name': 'fruit'})
+
+        self.assertEqual(response.status_code, 401)
+        delay.assert_not_called()
+
+    @mock.patch('apps.ai_engine.views.query_with_context_task.delay')
+    def test_rag_query_rejects_bad_n_context_docs(self, delay):
+        for value in ('many', 0, 1000):
+            response = self.request('post', '/api/ai/rag/query/', self.user, {
+                'query': 'q', 'collection_name': 'fruit', 'n_context_docs': value
+            })
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('n_context_docs', response.json())
+        delay.assert_not_called()
+
+    @mock.patch('apps.ai_engine.views.query_with_context_task.delay')
+    def test_rag_query_is_scoped_to_collection_owner(self, delay):
+        response = self.request('post', '/api/ai/rag/query/', self.other, {'query': 'q', 'collection_name': 'fruit'})
+
+        self.assertEqual(response.status_code, 404)
+        delay.assert_not_called()
+
+    @mock.patch('apps.ai_engine.views.query_with_context_task.delay')
+    def test_rag_query_rejects_another_users_conversation(self, delay):
+        conversation = Conversation.objects.create(user=self.other)
+
+        response = self.request('post', '/api/ai/rag/query/', self.user, {
+            'query': 'q', 'collection_name': 'fruit', 'conversation_id': str(conversation.pk)
+        })
+
+        self.assertEqual(response.status_code, 404)
+        delay.assert_not_called()
+
+    @mock.patch('apps.ai_engine.views.AsyncResult')
+    @mock.patch('apps.ai_engine.views.query_with_context_task.delay')
+    def test_job_status_is_scoped_to_job_owner(self, delay, async_result):
+        delay.return_value.id = 'job-1'
+        async_result.return_value.state = 'PENDING'
+        async_result.return_value.successful.return_value = False
+        async_result.return_value.failed.return_value = False
+
+        response = self.request('post', '/api/ai/rag/query/', self.user, {
+            'query': 'q', 'collection_name': 'fruit', 'n_context_docs': '5'
+        })
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(delay.call_args.kwargs['n_context_docs'], 5)
+
+        self.assertEqual(self.request('get', '/api/ai/jobs/job-1/', self.other).status_code, 404)
+        response = self.request('get', '/api/ai/jobs/job-1/', self.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['state'], 'PENDING')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BatchChatViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('batch@example.com')
+        patcher = mock.patch('apps.ai_engine.services._new_async_client', return_value=mock.AsyncMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, data, user=None):
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {issue_tokens(user)['access']}"} if user else {}
+        return self.client.post(
+            '/api/ai/chat/batch/', data, content_type='application/json',
+            HTTP_HOST='localhost', secure=True, **headers
+        )
+
+    @mock.patch.object(AsyncOpenRouterService, 'chat_completion')
+    def test_batch_chat_requires_authentication(self, chat_completion):
+        self.assertEqual(self.post({'messages': ['hi']}).status_code, 401)
+        chat_completion.assert_not_called()
+
+    @mock.patch.object(AsyncOpenRouterService, 'chat_completion')
+    def test_batch_chat_rejects_oversize_or_non_string_messages(self, chat_completion):
+        for messages in ([], ['hi'] * (MAX_BATCH_MESSAGES + 1), [{'role': 'user'}], 'hi'):
+            response = self.post({'messages': messages}, self.user)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('messages', response.json())
+        chat_completion.assert_not_called()
+
+    @override_settings(OPENROUTER_BATCH_CONCURRENCY=2)
+    def test_failed_completion_is_reported_without_losing_the_others(self):
+        in_flight = []
+        peak = []
+
+        async def chat_completion(service, messages, **kwargs):
+            in_flight.append(messages)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(messages)
+            if messages[-1]['content'] == 'boom':
+                raise RuntimeError('upstream error')
+            return {'content': messages[-1]['content'].upper(), 'model': 'm', 'tokens_used': 1, 'processing_time': 0.1}
+
+        with mock.patch.object(AsyncOpenRouterService, 'chat_completion', chat_completion):
+            response = self.post({'messages': ['one', 'boom', 'three', 'four']}, self.user)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([r['status'] for r in results], ['success', 'error', 'success', 'success'])
+        self.assertEqual(results[0]['ai_response'], 'ONE')
+        self.assertEqual(results[1], {'message': 'boom', 'status': 'error', 'error': 'upstream error'})
+        self.assertEqual(max(peak), 2)
+
+
+class UsageBufferTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(usage_buffer, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        usage_buffer._buffer.clear()
+        usage_buffer._embedding_buffer.clear()
+        self.ai_model = AIModel.objects.create(
+            name='DeepSeek Chat',
+            provider=AIModel.Provider.OPENROUTER,
+            model_id='deepseek/deepseek-chat',
+            input_price_micros=140,
+            output_price_micros=280
+        )
+
+    def test_flush_records_requests_tokens_and_cost(self):
+        usage_buffer.add('deepseek/deepseek-chat', 1000, 500)
+        usage_buffer.add('deepseek/deepseek-chat', 3000, 1500)
+        usage_buffer.add('unknown/model', 10, 10)
+
+        usage_buffer.flush()
+
+        self.ai_model.refresh_from_db()
+        self.assertEqual(self.ai_model.total_requests, 2)
+        self.assertEqual(self.ai_model.total_tokens, 6000)
+        self.assertEqual(self.ai_model.total_cost_micros, self.ai_model.cost_micros(4000, 2000))
+        self.assertEqual(self.ai_model.total_cost_micros, 1120)
+        self.assertEqual(usage_buffer._buffer, {})
+
+    def test_failed_flush_keeps_the_deltas_for_the_next_one(self):
+        usage_buffer.add('deepseek/deepseek-chat', 1000, 500)
+        usage_buffer.add_embeddings('test/keyword', 4, 0.2)
+
+        with mock.patch.object(usage_buffer.transaction, 'atomic', side_effect=DatabaseError('down')):
+            usage_buffer.flush()
+        usage_buffer.add('deepseek/deepseek-chat', 3000, 1500)
+        usage_buffer.flush()
+
+        self.ai_model.refresh_from_db()
+        self.assertEqual((self.ai_model.total_requests, self.ai_model.total_tokens), (2, 6000))
+        self.assertEqual(self.ai_model.total_cost_micros, 1120)
+        self.assertEqual((usage_buffer._buffer, usage_buffer._embedding_buffer), ({}, {}))
+
+
+@override_settings(AI_SEMANTIC_CACHE_TIMEOUT=3600, AI_SEMANTIC_CACHE_MAX_DISTANCE=0.05)
+class SemanticCacheTests(TestCase):
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.context = semantic_cache.context_hash([{'role': 'user', 'content': 'q'}], temperature=0.0)
+
+    def store(self, text, context=None, age=None):
+        semantic_cache.store('test/model', context or self.context, self.embeddings._vector(text), {'content': text})
+        if age is not None:
+            SemanticCacheEntry.objects.filter(response__content=text).update(created_at=timezone.now() - age)
+
+    def lookup(self, text, context=None):
+        return semantic_cache.lookup('test/model', context or self.context, self.embeddings._vector(text))
+
+    @skipUnless(connection.vendor == 'postgresql', 'semantic cache lookups need pgvector')
+    def test_close_query_hits_and_distant_query_misses(self):
+        self.store('total sales by region')
+
+        self.assertEqual(self.lookup('Total sales by region?'), {'content': 'total sales by region'})
+        self.assertIsNone(self.lookup('average order value per customer'))
+
+    @skipUnless(connection.vendor == 'postgresql', 'semantic cache lookups need pgvector')
+    def test_entry_from_a_different_context_misses(self):
+        self.store('total sales by region', context=semantic_cache.context_hash(
+            [{'role': 'system', 'content': 'other prompt'}, {'role': 'user', 'content': 'q'}], temperature=0.0
+        ))
+
+        self.assertIsNone(self.lookup('total sales by region'))
+
+    @skipUnless(connection.vendor == 'postgresql', 'semantic cache lookups need pgvector')
+    def test_expired_entry_misses(self):
+        self.store('total sales by region', age=timedelta(hours=2))
+
+        self.assertIsNone(self.lookup('total sales by region'))
+
+    def test_purge_deletes_only_expired_entries(self):
+        self.store('total sales by region')
+        self.store('average order value', age=timedelta(hours=2))
+
+        purge_semantic_cache()
+
+        self.assertEqual(
+            list(SemanticCacheEntry.objects.values_list('response__content', flat=True)),
+            ['total sales by region']
+        )
@@ -0,0 +1,79 @@
+"""
+Client-side prompt budgeting.
+
+Prompts are counted with tiktoken before they are sent, so conversations
+that would overflow the model's context window are trimmed locally instead
+of being rejected by OpenRouter after a full round trip.
+"""
+
+import functools
+import logging
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+# Headroom for tokenizer differences between cl100k_base and the served model
+SAFETY_MARGIN_TOKENS = 64
+# Never shrink the completion budget below this
+MIN_COMPLETION_TOKENS = 256
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, prompt budgeting disabled: {str(e)}")
+        return None
+
+
+@functools.lru_cache(maxsize=1024)
+def count_tokens(text: str) -> int:
+    """Count tokens in ``text``; repeated system prompts are served from the cache."""
+    return len(_encoding().encode(text))
+
+
+def fit_messages(
+    messages: List[Dict[str, str]],
+    max_tokens: int
+) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Fit ``messages`` and the completion budget into the context window.
+
+    The oldest non-system messages are dropped first, then ``max_tokens`` is
+    lowered. Raises ValueError if the prompt still cannot fit.
+    """
+    if _encoding() is None:
+        return messages, max_tokens
+
+    context_window = settings.OPENROUTER_CONTEXT_WINDOW
+    counts = [count_tokens(m.get('content') or '') + MESSAGE_OVERHEAD_TOKENS for m in messages]
+    total = sum(counts)
+    budget = context_window - max_tokens - SAFETY_MARGIN_TOKENS
+    if total <= budget:
+        return messages, max_tokens
+
+    # Drop history oldest-first, always keeping system prompts and the latest message
+    keep = [True] * len(messages)
+    for i in range(len(messages) - 1):
+        if total <= budget:
+            break
+        if messages[i].get('role') != 'system':
+            keep[i] = False
+            total -= counts[i]
+
+    available = context_window - total - SAFETY_MARGIN_TOKENS
+    if available < min(max_tokens, MIN_COMPLETION_TOKENS):
+        raise ValueError(
+            f"Prompt of {total} tokens exceeds the {context_window}-token context window"
+        )
+
+    trimmed = [m for m, k in zip(messages, keep) if k]
+    if len(trimmed) < len(messages):
+        logger.info(f"Dropped {len(messages) - len(trimmed)} messages to fit the context window")
+    return trimmed, min(max_tokens, available)
@@ -12,4 +12,9 @@ urlpatterns = [
     path('conversations/', views.conversations, name='conversations'),
     path('conversations/<str:conversation_id>/messages/', views.conversation_messages, name='conversation_messages'),
     path('test-chat/', views.test_ai_chat, name='test_ai_chat'),
+    path('chat/batch/', views.batch_ai_chat, name='batch_ai_chat'),
+    path('chat/stream/', views.stream_ai_chat, name='stream_ai_chat'),
+    path('rag/context/', views.rag_build_context, name='rag_build_context'),
+    path('rag/query/', views.rag_query, name='rag_query'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
 ]
@@ -0,0 +1,142 @@
+"""
+Batched usage accounting for AI and embedding models.
+
+Recording usage with one UPDATE per completion turns every AI request into
+a write against the ``ai_models`` row. Instead, completions and embedding
+passes add their deltas to a process-local buffer which a background thread
+flushes every AI_USAGE_FLUSH_INTERVAL seconds (or sooner, once
+AI_USAGE_FLUSH_MAX_PENDING events are waiting) with a single F()-expression
+UPDATE per model. Completions are priced at flush time with
+``AIModel.cost_micros``, so recording one needs no database access.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import ExpressionWrapper, F, FloatField
+
+logger = logging.getLogger(__name__)
+
+# model_id -> (requests, prompt tokens, completion tokens)
+_buffer: Dict[str, Tuple[int, int, int]] = {}
+# embedding model_id -> (texts embedded, seconds spent)
+_embedding_buffer: Dict[str, Tuple[int, float]] = {}
+_pending = 0
+_lock = threading.Lock()
+_wake = threading.Event()
+_flusher = None
+
+
+def add(model_id: str, prompt_tokens: int, completion_tokens: int):
+    """Record one completion for ``model_id`` in the buffer."""
+    with _lock:
+        requests, total_prompt, total_completion = _buffer.get(model_id, (0, 0, 0))
+        _buffer[model_id] = (requests + 1, total_prompt + prompt_tokens, total_completion + completion_tokens)
+    _recorded()
+
+
+def add_embeddings(model_id: str, count: int, seconds: float):
+    """Record ``count`` texts embedded with ``model_id`` in ``seconds``."""
+    with _lock:
+        total_count, total_seconds = _embedding_buffer.get(model_id, (0, 0.0))
+        _embedding_buffer[model_id] = (total_count + count, total_seconds + seconds)
+    _recorded()
+
+
+def _recorded():
+    global _pending
+    with _lock:
+        _pending += 1
+        full = _pending >= settings.AI_USAGE_FLUSH_MAX_PENDING
+    if full:
+        _wake.set()
+    _ensure_flusher()
+
+
+def flush():
+    """
+    Write all buffered deltas to the database and clear the buffer. If the
+    write fails the deltas go back into the buffer for the next flush.
+    """
+    from .models import AIModel, EmbeddingModel
+
+    global _pending
+    with _lock:
+        if not _buffer and not _embedding_buffer:
+            return
+        pending = dict(_buffer)
+        pending_embeddings = dict(_embedding_buffer)
+        _buffer.clear()
+        _embedding_buffer.clear()
+        _pending = 0
+
+    try:
+        with transaction.atomic():
+            for ai_model in AIModel.objects.filter(model_id__in=pending):
+                requests, prompt_tokens, completion_tokens = pending[ai_model.model_id]
+                AIModel.objects.filter(pk=ai_model.pk).update(
+                    total_requests=F('total_requests') + requests,
+                    total_tokens=F('total_tokens') + prompt_tokens + completion_tokens,
+                    total_cost_micros=F('total_cost_micros') + ai_model.cost_micros(prompt_tokens, completion_tokens),
+                )
+            for model_id, (count, seconds) in pending_embeddings.items():
+                # avg_embedding_time is the mean seconds per text over all
+                # embeddings; both SET clauses read the pre-update row
+                EmbeddingModel.objects.filter(model_id=model_id).update(
+                    avg_embedding_time=ExpressionWrapper(
+                        (F('avg_embedding_time') * F('total_embeddings') + seconds)
+                        / (F('total_embeddings') + count),
+                        output_field=FloatField()
+                    ),
+                    total_embeddings=F('total_embeddings') + count,
+                )
+    except Exception as e:
+        logger.warning(f"Failed to flush AI usage buffer: {str(e)}")
+        _requeue(pending, pending_embeddings)
+
+
+def _requeue(pending, pending_embeddings):
+    """Merge deltas from a failed flush back into the buffers for the next one."""
+    global _pending
+    with _lock:
+        for model_id, (requests, prompt_tokens, completion_tokens) in pending.items():
+            buffered = _buffer.get(model_id, (0, 0, 0))
+            _buffer[model_id] = (
+                buffered[0] + requests,
+                buffered[1] + prompt_tokens,
+                buffered[2] + completion_tokens,
+            )
+        for model_id, (count, seconds) in pending_embeddings.items():
+            total_count, total_seconds = _embedding_buffer.get(model_id, (0, 0.0))
+            _embedding_buffer[model_id] = (total_count + count, total_seconds + seconds)
+        _pending += len(pending) + len(pending_embeddings)
+
+
+def _run_flusher():
+    interval = settings.AI_USAGE_FLUSH_INTERVAL
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        close_old_connections()
+        flush()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_run_flusher,
+                name='ai-usage-flusher',
+                daemon=True
+            )
+            _flusher.start()
+
+
+atexit.register(flush)
@@ -1,16 +1,65 @@
 """
 Views for AI Engine app.
 """
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .services import OpenRouterService
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from asgiref.sync import async_to_sync
+from celery.result import AsyncResult
+from apps.authentication.throttling import AIBatchChatRateThrottle
+from apps.data_ingestion.models import DataSource
+from .models import Conversation, VectorStore
+from .serializers import BatchChatSerializer, RAGBuildContextSerializer, RAGQuerySerializer
+from .services import OpenRouterService, AsyncOpenRouterService
+from .tasks import build_data_context_task, query_with_context_task
+import orjson
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+ASSISTANT_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant for an ETL (Extract, Transform, Load) platform. "
+    "Be concise and helpful."
+)
+
+
+def _sse_event(payload):
+    """Format a payload as a server-sent event."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+def _wants_stream(request):
+    """Whether the client asked for a streamed response with ``?stream=1``."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _stream_chat_response(messages):
+    """
+    Stream an AI completion to the client as server-sent events.
+    
+    Each event carries a ``content`` chunk; a final ``done`` event (or an
+    ``error`` event) closes the stream.
+    """
+    def events():
+        try:
+            for content in OpenRouterService().chat_completion_stream(messages):
+                yield _sse_event({'content': content})
+        except Exception as e:
+            logger.error(f"AI stream error: {str(e)}")
+            yield _sse_event({'error': str(e)})
+            return
+        yield _sse_event({'done': True})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -55,14 +104,11 @@ def test_ai_chat(request):
         # Get message from request
         message = request.data.get('message', 'Hello, can you help me test the AI chat?')
 
-        # Initialize OpenRouter service
-        openrouter_service = OpenRouterService()
-
         # Prepare messages for chat completion
         messages = [
             {
                 "role": "system",
-                "content": "You are a helpful AI assistant for an ETL (Extract, Transform, Load) platform. Be concise and helpful."
+                "content": ASSISTANT_SYSTEM_PROMPT
             },
             {
                 "role": "user",
@@ -70,8 +116,14 @@ def test_ai_chat(request):
             }
         ]
 
+        if _wants_stream(request):
+            return _stream_chat_response(messages)
+
+        # Initialize OpenRouter service
+        openrouter_service = OpenRouterService()
+
         # Get AI response
-        response = openrouter_service.chat_completion(messages)
+        response = openrouter_service.cached_chat_completion(messages)
 
         return Response({
             'status': 'success',
@@ -90,6 +142,85 @@ def test_ai_chat(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+async def _batch_chat_completions(message_lists):
+    async with AsyncOpenRouterService() as service:
+        return await service.chat_completions(message_lists)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([AIBatchChatRateThrottle])
+def batch_ai_chat(request):
+    """Answer several independent messages with concurrent AI completions."""
+    serializer = BatchChatSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    user_messages = serializer.validated_data['messages']
+
+    responses = async_to_sync(_batch_chat_completions)([
+        [
+            {
+                "role": "system",
+                "content": ASSISTANT_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": message
+            }
+        ]
+        for message in user_messages
+    ])
+
+    results = []
+    for message, response in zip(user_messages, responses):
+        if isinstance(response, Exception):
+            logger.error(f"AI batch chat error: {str(response)}")
+            results.append({
+                'message': message,
+                'status': 'error',
+                'error': str(response)
+            })
+            continue
+        results.append({
+            'message': message,
+            'status': 'success',
+            'ai_response': response['content'],
+            'model': response['model'],
+            'tokens_used': response['tokens_used'],
+            'processing_time': response['processing_time']
+        })
+
+    return Response({
+        'status': 'success',
+        'responses': results
+    })
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def stream_ai_chat(request):
+    """Stream an AI chat response token-by-token via server-sent events."""
+    message = request.data.get('message', '')
+
+    if not message:
+        return Response({
+            'status': 'error',
+            'message': 'Message is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    messages = [
+        {
+            "role": "system",
+            "content": ASSISTANT_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": message
+        }
+    ]
+
+    return _stream_chat_response(messages)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def conversation_messages(request, conversation_id):
@@ -108,6 +239,19 @@ def conversation_messages(request, conversation_id):
         # In a real implementation, you'd save this to a database
         message_id = f"msg_{int(time.time())}"
 
+        # Stream the AI reply as server-sent events when asked to
+        if role == 'user' and _wants_stream(request):
+            return _stream_chat_response([
+                {
+                    "role": "system",
+                    "content": ASSISTANT_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ])
+
         # If it's a user message, generate an AI response
         if role == 'user':
             try:
@@ -118,7 +262,7 @@ def conversation_messages(request, conversation_id):
                 messages = [
                     {
                         "role": "system",
-                        "content": "You are a helpful AI assistant for an ETL (Extract, Transform, Load) platform. Be concise and helpful."
+                        "content": ASSISTANT_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -127,7 +271,7 @@ def conversation_messages(request, conversation_id):
                 ]
 
                 # Get AI response
-                ai_response = openrouter_service.chat_completion(messages)
+                ai_response = openrouter_service.cached_chat_completion(messages)
 
                 return Response({
                     'status': 'success',
@@ -183,3 +327,109 @@ def conversation_messages(request, conversation_id):
             'status': 'error',
             'message': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _job_owner_key(job_id):
+    return f"ai_job:{job_id}:owner"
+
+
+def _record_job_owner(job, user):
+    """Remember who started ``job`` so only they can poll it."""
+    try:
+        cache.set(_job_owner_key(job.id), user.pk, timeout=settings.CELERY_RESULT_EXPIRES)
+    except Exception as e:
+        logger.warning(f"Failed to record AI job owner: {str(e)}")
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rag_build_context(request):
+    """Start building the RAG context for a data source; returns a job ID to poll."""
+    serializer = RAGBuildContextSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    if not DataSource.objects.filter(pk=data['data_source_id'], user=request.user).exists():
+        return Response({
+            'status': 'error',
+            'message': 'Data source not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    job = build_data_context_task.delay(
+        request.user.pk,
+        str(data['data_source_id']),
+        data['data_summary'],
+        data.get('sample_data')
+    )
+    _record_job_owner(job, request.user)
+
+    return Response({
+        'status': 'accepted',
+        'job_id': job.id
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rag_query(request):
+    """Start a RAG query against a collection; returns a job ID to poll."""
+    serializer = RAGQuerySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    if not VectorStore.objects.filter(collection_name=data['collection_name'], user=request.user).exists():
+        return Response({
+            'status': 'error',
+            'message': 'Collection not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    conversation_id = data.get('conversation_id')
+    if conversation_id and not Conversation.objects.filter(pk=conversation_id, user=request.user).exists():
+        return Response({
+            'status': 'error',
+            'message': 'Conversation not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    job = query_with_context_task.delay(
+        data['query'],
+        data['collection_name'],
+        conversation_history=data.get('conversation_history'),
+        n_context_docs=data['n_context_docs'],
+        conversation_id=str(conversation_id) if conversation_id else None
+    )
+    _record_job_owner(job, request.user)
+
+    return Response({
+        'status': 'accepted',
+        'job_id': job.id
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    """Report the state of the caller's background AI job and its result once finished."""
+    try:
+        owner_id = cache.get(_job_owner_key(job_id))
+    except Exception as e:
+        logger.warning(f"AI job owner lookup failed: {str(e)}")
+        owner_id = None
+
+    if owner_id != request.user.pk:
+        return Response({
+            'status': 'error',
+            'message': 'Job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    job = AsyncResult(job_id)
+    payload = {
+        'job_id': job_id,
+        'state': job.state
+    }
+
+    if job.successful():
+        payload['result'] = job.result
+    elif job.failed():
+        payload['error'] = str(job.result)
+
+    return Response(payload)
@@ -45,6 +45,13 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at', 'last_login_ip']
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist never shows these; the change form still loads them
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('profile_picture', 'verification_token')
+        return queryset
 
 
 @admin.register(UserSession)
@@ -71,13 +78,13 @@ class APIKeyAdmin(admin.ModelAdmin):
     Admin interface for APIKey model.
     """
     list_display = [
-        'user', 'name', 'is_active', 'usage_count',
+        'user', 'name', 'key_prefix', 'is_active', 'usage_count',
         'rate_limit_per_hour', 'created_at', 'last_used'
     ]
     list_filter = ['is_active', 'created_at', 'last_used']
-    search_fields = ['user__email', 'name']
+    search_fields = ['user__email', 'name', 'key_prefix']
     ordering = ['-created_at']
-    readonly_fields = ['key', 'created_at', 'last_used', 'usage_count']
+    readonly_fields = ['key_prefix', 'created_at', 'last_used', 'usage_count']
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user')
@@ -0,0 +1,177 @@
+"""
+JWT authentication with a cached user lookup, and API key authentication.
+
+Stock ``JWTAuthentication`` loads the user row from the database on every
+authenticated request. Here the user's id, active flag and role are cached
+in Redis for AUTH_USER_CACHE_TIMEOUT seconds after the token signature has
+been verified; the same round trip also checks whether the access token
+was revoked at logout.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions, status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+
+# User fields kept in the auth cache; everything else is loaded on access
+CACHED_USER_FIELDS = ('id', 'is_active', 'role')
+
+# Token claim naming the UserSession row of the login that issued the token;
+# it survives refresh rotation and is copied into every access token
+SESSION_KEY_CLAIM = 'sid'
+
+
+class AuthUnavailable(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Authentication is temporarily unavailable.'
+    default_code = 'auth_unavailable'
+
+
+def _user_key(user_id) -> str:
+    return f"authcache:user:{user_id}"
+
+
+def _revoked_key(jti) -> str:
+    return f"authcache:revoked:{jti}"
+
+
+def invalidate_user(user_id):
+    """Drop the cached user so the next request reloads it from the database."""
+    try:
+        cache.delete(_user_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cached user: {str(e)}")
+
+
+def revoke_token(validated_token):
+    """Reject ``validated_token`` (an access token) until it expires."""
+    jti = validated_token.get(api_settings.JTI_CLAIM)
+    if jti is None:
+        return
+    remaining = int(validated_token.get('exp', 0) - time.time())
+    if remaining <= 0:
+        return
+    try:
+        cache.set(_revoked_key(jti), True, timeout=remaining)
+    except Exception as e:
+        logger.warning(f"Failed to revoke access token: {str(e)}")
+
+
+def issue_tokens(user, session_key: str = None) -> dict:
+    """
+    New refresh/access token pair for ``user``, signing each token once.
+
+    ``RefreshToken.for_user`` signs the refresh token to record it as
+    outstanding, and the response would sign it again; here the encoded
+    token is reused for both. ``session_key`` ties both tokens to the
+    login's UserSession row.
+    """
+    refresh = super(BlacklistMixin, RefreshToken).for_user(user)
+    if session_key:
+        refresh[SESSION_KEY_CLAIM] = session_key
+    encoded = str(refresh)
+    OutstandingToken.objects.create(
+        user=user,
+        jti=refresh[api_settings.JTI_CLAIM],
+        token=encoded,
+        created_at=refresh.current_time,
+        expires_at=datetime_from_epoch(refresh['exp'])
+    )
+    return {
+        'refresh': encoded,
+        'access': str(refresh.access_token),
+    }
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the user from the cache.
+
+    Only ``CACHED_USER_FIELDS`` are cached; the user handed to views is a
+    model instance with every other field deferred, so reading one loads it
+    from the database. Saving a User invalidates its entry; changes made
+    with ``QuerySet.update()`` are seen after at most AUTH_USER_CACHE_TIMEOUT
+    seconds unless the code making them calls ``invalidate_user``.
+
+    Requests are refused while the cache is unreachable, since revoked
+    access tokens are only recorded there.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user_key = _user_key(user_id)
+        revoked_key = _revoked_key(validated_token.get(api_settings.JTI_CLAIM))
+        try:
+            cached = cache.get_many([user_key, revoked_key])
+        except Exception as e:
+            logger.error(f"Auth cache unavailable: {str(e)}")
+            raise AuthUnavailable()
+
+        if cached.get(revoked_key):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        record = cached.get(user_key)
+        if record is None:
+            try:
+                record = self.user_model.objects.values(*CACHED_USER_FIELDS).get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            try:
+                cache.set(user_key, record, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache authenticated user: {str(e)}")
+
+        if not record['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return self._lightweight_user(record)
+
+    def _lightweight_user(self, record):
+        field_names = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in record]
+        return self.user_model.from_db(DEFAULT_DB_ALIAS, field_names, [record[name] for name in field_names])
+
+
+class APIKeyAuthentication(BaseAuthentication):
+    """
+    Authenticate requests carrying an ``X-API-Key`` header.
+
+    Each call is counted against the key's hourly and daily limits; calls
+    over either limit are throttled. ``request.auth`` is the APIKey.
+    """
+
+    header = 'HTTP_X_API_KEY'
+
+    def authenticate(self, request):
+        from .models import APIKey
+
+        raw_key = request.META.get(self.header)
+        if not raw_key:
+            return None
+
+        api_key = APIKey.get_active(raw_key)
+        if api_key is None:
+            raise AuthenticationFailed("Invalid API key", code="invalid_api_key")
+        if not api_key.consume():
+            raise exceptions.Throttled(detail="API key rate limit exceeded")
+        return (api_key.user, api_key)
+
+    def authenticate_header(self, request):
+        return 'X-API-Key'
@@ -0,0 +1,184 @@
+"""
+Redis-buffered usage counters for users and API keys.
+
+Counting API calls with an UPDATE per request puts a database write on the
+authentication hot path. Increments are instead accumulated in Redis hashes
+(one per user or API key) and drained into the database by the
+``flush_usage_counters`` Celery beat task every USAGE_COUNTER_FLUSH_INTERVAL
+seconds, with one UPDATE per table. If Redis is unavailable the increment
+falls back to a direct F()-expression UPDATE.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+USER_DIRTY_KEY = 'ctr:dirty:users'
+API_KEY_DIRTY_KEY = 'ctr:dirty:api_keys'
+
+# Upper bound on hashes drained per flush, so one run stays short
+FLUSH_BATCH_SIZE = 1000
+
+
+def _user_key(user_id) -> str:
+    return f"u:{user_id}:ctr"
+
+
+def _api_key_key(api_key_id) -> str:
+    return f"k:{api_key_id}:ctr"
+
+
+def incr_api_calls(user_id, amount: int = 1):
+    """Count ``amount`` API calls for ``user_id``."""
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.hincrby(_user_key(user_id), 'api', amount)
+        pipe.sadd(USER_DIRTY_KEY, user_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Usage counters unavailable: {str(e)}")
+        _apply_users([(int(user_id), amount, 0.0)])
+
+
+def add_data_processed(user_id, mb_size: float):
+    """Count ``mb_size`` megabytes of processed data for ``user_id``."""
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.hincrbyfloat(_user_key(user_id), 'mb', mb_size)
+        pipe.sadd(USER_DIRTY_KEY, user_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Usage counters unavailable: {str(e)}")
+        _apply_users([(int(user_id), 0, mb_size)])
+
+
+def incr_api_key_usage(api_key_id, amount: int = 1):
+    """Count ``amount`` uses of ``api_key_id`` and record when it was last used."""
+    now = timezone.now().timestamp()
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.hincrby(_api_key_key(api_key_id), 'uses', amount)
+        pipe.hset(_api_key_key(api_key_id), 'last', now)
+        pipe.sadd(API_KEY_DIRTY_KEY, api_key_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Usage counters unavailable: {str(e)}")
+        _apply_api_keys([(int(api_key_id), amount, now)])
+
+
+def flush() -> int:
+    """Drain buffered counters into the database; returns the rows updated."""
+    redis = get_redis_connection('default')
+    users = []
+    api_keys = []
+
+    try:
+        users = [
+            (user_id, int(values.get(b'api', 0)), float(values.get(b'mb', 0.0)))
+            for user_id, values in _drain(redis, USER_DIRTY_KEY, _user_key)
+        ]
+        api_keys = [
+            (api_key_id, int(values.get(b'uses', 0)), float(values[b'last']))
+            for api_key_id, values in _drain(redis, API_KEY_DIRTY_KEY, _api_key_key)
+            if b'last' in values
+        ]
+        with transaction.atomic():
+            _apply_users(users)
+            _apply_api_keys(api_keys)
+    except Exception:
+        # Put the drained deltas back so the next run retries them
+        for user_id, calls, mb_size in users:
+            if calls:
+                incr_api_calls(user_id, calls)
+            if mb_size:
+                add_data_processed(user_id, mb_size)
+        for api_key_id, uses, last_used in api_keys:
+            _requeue_api_key_usage(redis, api_key_id, uses, last_used)
+        raise
+
+    return len(users) + len(api_keys)
+
+
+def _requeue_api_key_usage(redis, api_key_id, uses: int, last_used: float):
+    # A use recorded since the drain already set a later 'last'; keep it
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.hincrby(_api_key_key(api_key_id), 'uses', uses)
+        pipe.hsetnx(_api_key_key(api_key_id), 'last', last_used)
+        pipe.sadd(API_KEY_DIRTY_KEY, api_key_id)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Dropped usage counters for API key {api_key_id}: {str(e)}")
+
+
+def _drain(redis, dirty_key: str, hash_key) -> List[Tuple[int, Dict[bytes, bytes]]]:
+    members = redis.spop(dirty_key, FLUSH_BATCH_SIZE) or []
+    if not members:
+        return []
+
+    # Read and delete each hash atomically; increments landing afterwards
+    # start a fresh hash and mark the member dirty again
+    pipe = redis.pipeline(transaction=True)
+    for member in members:
+        pipe.hgetall(hash_key(int(member)))
+        pipe.delete(hash_key(int(member)))
+    try:
+        results = pipe.execute()
+    except Exception:
+        # The MULTI did not run, so the hashes are intact; mark them dirty again
+        redis.sadd(dirty_key, *members)
+        raise
+    return [
+        (int(member), values)
+        for member, values in zip(members, results[::2])
+        if values
+    ]
+
+
+def _apply_users(users: Iterable[Tuple[int, int, float]]):
+    from .models import User
+
+    users = list(users)
+    if not users:
+        return
+    User.objects.filter(pk__in=[user_id for user_id, _, _ in users]).update(
+        api_calls_count=F('api_calls_count') + Case(
+            *(When(pk=user_id, then=Value(calls)) for user_id, calls, _ in users),
+            default=Value(0),
+            output_field=IntegerField()
+        ),
+        data_processed_mb=F('data_processed_mb') + Case(
+            *(When(pk=user_id, then=Value(mb_size)) for user_id, _, mb_size in users),
+            default=Value(0.0),
+            output_field=FloatField()
+        ),
+    )
+
+
+def _apply_api_keys(api_keys: Iterable[Tuple[int, int, float]]):
+    from .models import APIKey
+
+    api_keys = list(api_keys)
+    if not api_keys:
+        return
+    APIKey.objects.filter(pk__in=[api_key_id for api_key_id, _, _ in api_keys]).update(
+        usage_count=F('usage_count') + Case(
+            *(When(pk=api_key_id, then=Value(uses)) for api_key_id, uses, _ in api_keys),
+            default=Value(0),
+            output_field=IntegerField()
+        ),
+        last_used=Case(
+            *(
+                When(pk=api_key_id, then=Value(datetime.fromtimestamp(last_used, tz=dt_timezone.utc)))
+                for api_key_id, _, last_used in api_keys
+            ),
+            default=F('last_used')
+        ),
+    )
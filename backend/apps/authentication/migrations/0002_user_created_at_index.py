@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at'], name='auth_user_created_bd0e77_idx'),
+        ),
+    ]
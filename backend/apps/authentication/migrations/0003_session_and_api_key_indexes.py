@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(fields=['user', 'is_active', '-created_at'], name='api_keys_user_id_5845f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['user', 'is_active', '-last_activity'], name='user_sessio_user_id_9c4311_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_session_and_api_key_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:40
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_keys(apps, schema_editor):
+    APIKey = apps.get_model('authentication', 'APIKey')
+    for api_key in APIKey.objects.only('id', 'key').iterator():
+        api_key.key_hash = hashlib.sha256(api_key.key.encode()).digest()
+        api_key.key_prefix = api_key.key[:8]
+        api_key.save(update_fields=['key_hash', 'key_prefix'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_usersession_ended_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikey',
+            name='key_hash',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='apikey',
+            name='key_prefix',
+            field=models.CharField(default='', max_length=8),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_existing_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='apikey',
+            name='key_hash',
+            field=models.BinaryField(max_length=32, unique=True),
+        ),
+        migrations.RemoveField(
+            model_name='apikey',
+            name='key',
+        ),
+    ]
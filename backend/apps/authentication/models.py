@@ -2,9 +2,12 @@
 Authentication models for EETL AI Platform.
 """
 
+import hashlib
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.utils import timezone
+
+from . import counters, ratelimit
 
 
 class User(AbstractUser):
@@ -54,23 +57,34 @@ class User(AbstractUser):
         db_table = 'auth_user'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Admin changelist ordering
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.email} ({self.get_role_display()})"
     
+    def get_role_display(self):
+        # Dict lookup instead of Django's scan of the field's flat choices
+        return _ROLE_DISPLAY.get(self.role, self.role)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
     
     def increment_api_calls(self):
-        """Increment API calls counter."""
+        """Increment API calls counter; buffered in Redis until the next flush."""
+        counters.incr_api_calls(self.pk)
         self.api_calls_count += 1
-        self.save(update_fields=['api_calls_count'])
     
     def add_data_processed(self, mb_size):
-        """Add to data processed counter."""
+        """Add to data processed counter; buffered in Redis until the next flush."""
+        counters.add_data_processed(self.pk, mb_size)
         self.data_processed_mb += mb_size
-        self.save(update_fields=['data_processed_mb'])
+
+
+_ROLE_DISPLAY = dict(User.UserRole.choices)
 
 
 class UserSession(models.Model):
@@ -84,10 +98,14 @@ class UserSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    ended_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         db_table = 'user_sessions'
         ordering = ['-last_activity']
+        indexes = [
+            models.Index(fields=['user', 'is_active', '-last_activity']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.ip_address}"
@@ -96,10 +114,15 @@ class UserSession(models.Model):
 class APIKey(models.Model):
     """
     API keys for programmatic access.
+
+    Only the SHA-256 digest of a key is stored; the raw key is shown to the
+    user once when it is created. ``key_prefix`` identifies the key in
+    listings.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='api_keys')
     name = models.CharField(max_length=100)
-    key = models.CharField(max_length=64, unique=True)
+    key_hash = models.BinaryField(max_length=32, unique=True)
+    key_prefix = models.CharField(max_length=8)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_used = models.DateTimeField(blank=True, null=True)
@@ -112,12 +135,36 @@ class APIKey(models.Model):
     class Meta:
         db_table = 'api_keys'
         ordering = ['-created_at']
+        indexes = [
+            # key_hash is unique and already indexed
+            models.Index(fields=['user', 'is_active', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.name}"
     
-    def increment_usage(self):
-        """Increment usage counter and update last used."""
-        self.usage_count += 1
-        self.last_used = timezone.now()
-        self.save(update_fields=['usage_count', 'last_used'])
+    @staticmethod
+    def hash_key(raw_key: str) -> bytes:
+        """Digest stored in ``key_hash`` for ``raw_key``."""
+        return hashlib.sha256(raw_key.encode()).digest()
+
+    @classmethod
+    def get_active(cls, raw_key: str):
+        """
+        Active API key of an active user matching ``raw_key``, or None.
+
+        ``user`` is joined in the same query with only its id, active flag
+        and role loaded.
+        """
+        return cls.objects.filter(
+            key_hash=cls.hash_key(raw_key),
+            is_active=True,
+            user__is_active=True
+        ).select_related('user').only(
+            'id', 'user_id', 'rate_limit_per_hour', 'rate_limit_per_day',
+            'user__id', 'user__is_active', 'user__role'
+        ).first()
+
+    def consume(self) -> bool:
+        """Count one call against this key's limits; False once either is reached."""
+        return ratelimit.check_and_incr(self.pk, self.rate_limit_per_hour, self.rate_limit_per_day)
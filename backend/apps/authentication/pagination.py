@@ -0,0 +1,18 @@
+"""
+Cursor pagination for per-user lists.
+
+Each ordering matches a (user, is_active, ...) index, so every page is an
+index range scan instead of a COUNT plus OFFSET.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class APIKeyCursorPagination(CursorPagination):
+    ordering = '-created_at'
+    page_size = 20
+
+
+class UserSessionCursorPagination(CursorPagination):
+    ordering = '-last_activity'
+    page_size = 10
@@ -0,0 +1,80 @@
+"""
+Per-API-key rate limits and usage accounting in one Redis round trip.
+
+Each key has an hourly and a daily fixed-window counter. A Lua script
+checks both against the key's limits and, if the call is allowed, increments
+both windows along with the buffered ``usage_count``/``last_used`` hash that
+``counters.flush`` drains into the database. Checking a limit and counting
+the call therefore never touches the database.
+"""
+
+import logging
+import time
+
+from django_redis import get_redis_connection
+
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+# KEYS: hour window, day window, usage hash, dirty set.
+# ARGV: hour limit, day limit, now, API key id.
+# Returns {allowed, remaining this hour, remaining today}.
+CHECK_AND_INCR_LUA = """
+local limit_hour = tonumber(ARGV[1])
+local limit_day = tonumber(ARGV[2])
+local hour = tonumber(redis.call('GET', KEYS[1]) or '0')
+local day = tonumber(redis.call('GET', KEYS[2]) or '0')
+if hour >= limit_hour or day >= limit_day then
+    return {0, math.max(0, limit_hour - hour), math.max(0, limit_day - day)}
+end
+hour = redis.call('INCR', KEYS[1])
+if hour == 1 then
+    redis.call('EXPIRE', KEYS[1], 3600)
+end
+day = redis.call('INCR', KEYS[2])
+if day == 1 then
+    redis.call('EXPIRE', KEYS[2], 86400)
+end
+redis.call('HINCRBY', KEYS[3], 'uses', 1)
+redis.call('HSET', KEYS[3], 'last', ARGV[3])
+redis.call('SADD', KEYS[4], ARGV[4])
+return {1, limit_hour - hour, limit_day - day}
+"""
+
+_script = None
+
+
+def _check_and_incr():
+    global _script
+    if _script is None:
+        _script = get_redis_connection('default').register_script(CHECK_AND_INCR_LUA)
+    return _script
+
+
+def check_and_incr(api_key_id, limit_hour: int, limit_day: int) -> bool:
+    """
+    Count one call for ``api_key_id`` if it is within its hourly and daily
+    limits; returns whether the call is allowed. If Redis is unreachable the
+    call is allowed and counted directly in the database.
+    """
+    now = time.time()
+    keys = [
+        f"apikey:{api_key_id}:h:{int(now // HOUR)}",
+        f"apikey:{api_key_id}:d:{int(now // DAY)}",
+        counters._api_key_key(api_key_id),
+        counters.API_KEY_DIRTY_KEY,
+    ]
+    try:
+        allowed, _remaining_hour, _remaining_day = _check_and_incr()(
+            keys=keys,
+            args=[limit_hour, limit_day, now, api_key_id]
+        )
+    except Exception as e:
+        logger.warning(f"API key rate limiter unavailable: {str(e)}")
+        counters.incr_api_key_usage(api_key_id)
+        return True
+    return bool(allowed)
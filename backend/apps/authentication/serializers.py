@@ -38,10 +38,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # Hashed once and saved in the INSERT
+        return User.objects.create_user(password=password, **validated_data)
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -151,35 +149,26 @@ class ChangePasswordSerializer(serializers.Serializer):
     def save(self):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
 
 
 class APIKeySerializer(serializers.ModelSerializer):
     """
     Serializer for API keys.
+
+    ``key`` is only present in the response that creates the key.
     """
     key = serializers.CharField(read_only=True)
     
     class Meta:
         model = APIKey
         fields = [
-            'id', 'name', 'key', 'is_active', 'created_at',
+            'id', 'name', 'key', 'key_prefix', 'is_active', 'created_at',
             'last_used', 'usage_count', 'rate_limit_per_hour',
             'rate_limit_per_day'
         ]
         read_only_fields = [
-            'id', 'key', 'created_at', 'last_used', 'usage_count'
+            'id', 'key', 'key_prefix', 'created_at', 'last_used', 'usage_count'
         ]
 
-
-class UserStatsSerializer(serializers.Serializer):
-    """
-    Serializer for user statistics.
-    """
-    total_api_calls = serializers.IntegerField()
-    total_data_processed_mb = serializers.FloatField()
-    active_sessions = serializers.IntegerField()
-    api_keys_count = serializers.IntegerField()
-    last_login = serializers.DateTimeField()
-    account_age_days = serializers.IntegerField()
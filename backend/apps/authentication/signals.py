@@ -0,0 +1,17 @@
+"""
+Signal handlers for authentication app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    """Make deactivations and role changes visible to the next request."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user(user_id))
@@ -0,0 +1,45 @@
+"""
+Celery tasks for authentication app.
+"""
+
+import logging
+from typing import Optional
+
+from celery import shared_task
+from django.utils.dateparse import parse_datetime
+
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_usage_counters():
+    """Drain Redis-buffered user and API key counters into the database."""
+    updated = counters.flush()
+    if updated:
+        logger.info(f"Flushed usage counters for {updated} rows")
+
+
+@shared_task(ignore_result=True)
+def record_login(user_id: int, ip_address: Optional[str], user_agent: str, session_key: str, logged_in_at: str):
+    """Store last-login bookkeeping and the session record for a login."""
+    from .models import User, UserSession
+
+    User.objects.filter(pk=user_id).update(
+        last_login=parse_datetime(logged_in_at),
+        last_login_ip=ip_address
+    )
+    # Repeat logins on the same session reuse (and reactivate) its row,
+    # attributed to whoever logged in last
+    UserSession.objects.bulk_create(
+        [UserSession(
+            user_id=user_id,
+            session_key=session_key,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )],
+        update_conflicts=True,
+        unique_fields=['session_key'],
+        update_fields=['user', 'ip_address', 'user_agent', 'last_activity', 'is_active', 'ended_at']
+    )
@@ -0,0 +1,219 @@
+"""
+Tests for authentication app.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import _user_key, issue_tokens
+from .models import APIKey, User, UserSession
+from .tasks import record_login
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_user(email, **kwargs):
+    return User.objects.create_user(
+        username=email.split('@')[0],
+        email=email,
+        password='s3cret-Passw0rd',
+        **kwargs
+    )
+
+
+class RecordLoginTests(TestCase):
+    def test_second_user_on_same_session_takes_over_the_row(self):
+        first = make_user('first@example.com')
+        second = make_user('second@example.com')
+
+        record_login(first.pk, '10.0.0.1', 'agent', 'shared-key', timezone.now().isoformat())
+        record_login(second.pk, '10.0.0.2', 'agent', 'shared-key', timezone.now().isoformat())
+
+        session = UserSession.objects.get(session_key='shared-key')
+        self.assertEqual(session.user_id, second.pk)
+        self.assertEqual(session.ip_address, '10.0.0.2')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUTH_RECORD_LOGIN_ASYNC=True)
+class LoginViewTests(TestCase):
+    def test_login_is_recorded_inline_when_broker_is_down(self):
+        user = make_user('broker@example.com')
+
+        with mock.patch('apps.authentication.views.record_login.delay', side_effect=OperationalError('down')):
+            response = self.client.post(
+                '/api/auth/login/',
+                {'email': 'broker@example.com', 'password': 's3cret-Passw0rd'},
+                content_type='application/json',
+                HTTP_HOST='localhost',
+                secure=True
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(UserSession.objects.filter(user=user).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LogoutViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('logout@example.com')
+        self.tokens = issue_tokens(self.user)
+
+    def post_logout(self, data):
+        return self.client.post(
+            '/api/auth/logout/',
+            data,
+            content_type='application/json',
+            HTTP_HOST='localhost',
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}",
+            secure=True
+        )
+
+    def test_invalid_refresh_token_leaves_access_token_usable(self):
+        response = self.post_logout({'refresh_token': 'garbage'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post_logout({}).status_code, 400)
+
+    def test_logout_blacklists_refresh_and_revokes_access_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.post_logout({'refresh_token': self.tokens['refresh']})
+
+        self.assertEqual(response.status_code, 205)
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(BlacklistedToken.objects.filter(token__token=self.tokens['refresh']).exists())
+        self.assertEqual(self.post_logout({'refresh_token': self.tokens['refresh']}).status_code, 401)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUTH_RECORD_LOGIN_ASYNC=False)
+class DeviceSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('devices@example.com')
+
+    def post(self, path, data, access=None):
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {access}"} if access else {}
+        return self.client.post(
+            path, data, content_type='application/json', HTTP_HOST='localhost', secure=True, **headers
+        )
+
+    def login(self):
+        response = self.post('/api/auth/login/', {'email': 'devices@example.com', 'password': 's3cret-Passw0rd'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['tokens']
+
+    def test_each_login_gets_its_own_session_and_logout_ends_only_that_one(self):
+        phone = self.login()
+        laptop = self.login()
+        self.assertEqual(UserSession.objects.filter(user=self.user, is_active=True).count(), 2)
+
+        # The session survives refresh token rotation
+        phone = self.post('/api/auth/token/refresh/', {'refresh': phone['refresh']}).json()
+
+        sessions = self.client.get(
+            '/api/auth/sessions/', HTTP_HOST='localhost', secure=True,
+            HTTP_AUTHORIZATION=f"Bearer {phone['access']}"
+        ).json()['results']
+        self.assertEqual(sorted(session['is_current'] for session in sessions), [False, True])
+
+        response = self.post('/api/auth/logout/', {'refresh_token': phone['refresh']}, phone['access'])
+        self.assertEqual(response.status_code, 205)
+
+        remaining = UserSession.objects.get(user=self.user, is_active=True)
+        laptop_session = next(session for session in sessions if not session['is_current'])
+        self.assertEqual(remaining.pk, laptop_session['id'])
+        self.assertEqual(self.post('/api/auth/logout/', {'refresh_token': laptop['refresh']}, laptop['access']).status_code, 205)
+        self.assertFalse(UserSession.objects.filter(user=self.user, is_active=True).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('cached@example.com')
+        self.access = issue_tokens(self.user)['access']
+
+    def get_profile(self):
+        return self.client.get(
+            '/api/auth/profile/',
+            HTTP_HOST='localhost',
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+            secure=True
+        )
+
+    def test_cache_holds_only_auth_fields(self):
+        self.assertEqual(self.get_profile().status_code, 200)
+
+        self.assertEqual(cache.get(_user_key(self.user.pk)), {
+            'id': self.user.pk,
+            'is_active': True,
+            'role': User.UserRole.PUBLIC,
+        })
+
+    def test_saved_deactivation_applies_to_next_request(self):
+        self.assertEqual(self.get_profile().status_code, 200)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertEqual(self.get_profile().status_code, 401)
+
+    def test_cached_inactive_record_is_rejected(self):
+        cache.set(_user_key(self.user.pk), {'id': self.user.pk, 'is_active': False, 'role': 'public'})
+
+        self.assertEqual(self.get_profile().status_code, 401)
+
+    def test_unreachable_cache_fails_closed(self):
+        with mock.patch('apps.authentication.authentication.cache.get_many', side_effect=ConnectionError):
+            self.assertEqual(self.get_profile().status_code, 503)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class APIKeyAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('apikey@example.com')
+        self.raw_key = 'test-key-0123456789'
+        self.api_key = APIKey.objects.create(
+            user=self.user,
+            name='CI',
+            key_hash=APIKey.hash_key(self.raw_key),
+            key_prefix=self.raw_key[:8]
+        )
+
+    def get_profile(self, raw_key):
+        return self.client.get(
+            '/api/auth/profile/',
+            HTTP_HOST='localhost',
+            HTTP_X_API_KEY=raw_key,
+            secure=True
+        )
+
+    def test_valid_key_authenticates_and_counts_the_call(self):
+        response = self.get_profile(self.raw_key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'apikey@example.com')
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 1)
+
+    def test_unknown_or_inactive_key_is_rejected(self):
+        self.assertEqual(self.get_profile('not-a-key').status_code, 401)
+
+        APIKey.objects.filter(pk=self.api_key.pk).update(is_active=False)
+        self.assertEqual(self.get_profile(self.raw_key).status_code, 401)
+
+    def test_key_of_inactive_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.get_profile(self.raw_key).status_code, 401)
+
+    def test_key_over_its_limits_is_throttled(self):
+        with mock.patch.object(APIKey, 'consume', return_value=False):
+            self.assertEqual(self.get_profile(self.raw_key).status_code, 429)
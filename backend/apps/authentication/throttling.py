@@ -0,0 +1,117 @@
+"""
+Token-bucket throttles for credential endpoints.
+
+Login, registration and password changes each run a password hasher, which
+makes them cheap targets for credential stuffing. These throttles run
+before the view, so a denied request never reaches the hasher or writes a
+session row. Each bucket lives in Redis and is refilled and drawn from
+atomically by a Lua script. Rates come from REST_FRAMEWORK's
+DEFAULT_THROTTLE_RATES: a rate of ``10/min`` allows bursts of 10 that
+refill at 10 per minute.
+"""
+
+import logging
+import time
+
+from django_redis import get_redis_connection
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.ip import client_ip
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: bucket; ARGV: capacity, refill per second, now.
+# Returns {allowed, seconds until the next token}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill))
+return {allowed, tostring((1 - math.min(tokens, 1)) / refill)}
+"""
+
+_script = None
+
+
+def _token_bucket():
+    global _script
+    if _script is None:
+        _script = get_redis_connection('default').register_script(TOKEN_BUCKET_LUA)
+    return _script
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with a Redis token bucket instead of a request log.
+
+    Subclasses set ``scope`` and implement ``get_cache_key``. If Redis is
+    unreachable requests are let through.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacity = self.num_requests
+        refill = self.num_requests / self.duration
+        try:
+            allowed, wait = _token_bucket()(keys=[self.key], args=[capacity, refill, time.time()])
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable: {str(e)}")
+            return True
+
+        self._wait = float(wait)
+        return bool(allowed)
+
+    def wait(self):
+        return self._wait
+
+    def get_ident(self, request):
+        return client_ip(request)
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    """Limit login attempts per client IP and account."""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        email = str(request.data.get('email', '')).strip().lower()
+        return f"tb:{self.scope}:{self.get_ident(request)}:{email}"
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    """Limit registrations per client IP."""
+    scope = 'register'
+
+    def get_cache_key(self, request, view):
+        return f"tb:{self.scope}:{self.get_ident(request)}"
+
+
+class ChangePasswordRateThrottle(TokenBucketThrottle):
+    """Limit password changes per user and client IP."""
+    scope = 'change_password'
+
+    def get_cache_key(self, request, view):
+        return f"tb:{self.scope}:{request.user.pk}:{self.get_ident(request)}"
+
+
+class AIBatchChatRateThrottle(TokenBucketThrottle):
+    """Per-user limit on batch AI chat requests, which fan out to several completions."""
+    scope = 'ai_batch_chat'
+
+    def get_cache_key(self, request, view):
+        return f"tb:{self.scope}:{request.user.pk}"
@@ -23,6 +23,6 @@ urlpatterns = [
     
     # User statistics and sessions
     path('stats/', views.UserStatsView.as_view(), name='user_stats'),
-    path('sessions/', views.user_sessions, name='user_sessions'),
+    path('sessions/', views.UserSessionListView.as_view(), name='user_sessions'),
     path('sessions/<int:session_id>/terminate/', views.terminate_session, name='terminate_session'),
 ]
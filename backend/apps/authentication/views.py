@@ -6,23 +6,38 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken, Token
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth import login, logout
+from django.db import transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+from kombu.exceptions import OperationalError
+import logging
 import secrets
+import uuid
 
+from core.ip import client_ip
+
+from .authentication import SESSION_KEY_CLAIM, issue_tokens, revoke_token
+from .tasks import record_login
+from .throttling import ChangePasswordRateThrottle, LoginRateThrottle, RegisterRateThrottle
 from .models import User, APIKey, UserSession
+from .pagination import APIKeyCursorPagination, UserSessionCursorPagination
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserProfileSerializer,
     ChangePasswordSerializer,
-    APIKeySerializer,
-    UserStatsSerializer
+    APIKeySerializer
 )
 
+logger = logging.getLogger(__name__)
+
 
 class RegisterView(generics.CreateAPIView):
     """
@@ -31,29 +46,38 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterRateThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
-        
         return Response({
             'user': UserProfileSerializer(user).data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            },
+            'tokens': issue_tokens(user),
             'message': 'Registration successful'
         }, status=status.HTTP_201_CREATED)
 
 
+def _session_key(request, token=None):
+    """
+    Key of the UserSession row for this device: the Django session's key,
+    else the session claim of ``token`` (default: the request's access token).
+    """
+    if request.session.session_key:
+        return request.session.session_key
+    token = token if token is not None else request.auth
+    if isinstance(token, Token):
+        return token.get(SESSION_KEY_CLAIM)
+    return None
+
+
 class LoginView(TokenObtainPairView):
     """
     User login endpoint with session tracking.
     """
+    throttle_classes = [LoginRateThrottle]
     
     def post(self, request, *args, **kwargs):
         serializer = UserLoginSerializer(
@@ -63,38 +87,35 @@ class LoginView(TokenObtainPairView):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         
-        # Update last login
+        # Update last login and create the session record, off the
+        # request path when a broker is available
         user.last_login = timezone.now()
-        user.last_login_ip = self.get_client_ip(request)
-        user.save(update_fields=['last_login', 'last_login_ip'])
-        
-        # Create session record
-        UserSession.objects.create(
-            user=user,
-            session_key=request.session.session_key or 'api_access',
-            ip_address=self.get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')
+        user.last_login_ip = client_ip(request)
+        # Token-only clients have no Django session; each login is its own
+        # device, named in the issued tokens
+        session_key = request.session.session_key or f"jwt:{uuid.uuid4().hex}"
+        login_record = (
+            user.pk,
+            user.last_login_ip,
+            request.META.get('HTTP_USER_AGENT', ''),
+            session_key,
+            user.last_login.isoformat()
         )
-        
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        if settings.AUTH_RECORD_LOGIN_ASYNC:
+            try:
+                record_login.delay(*login_record)
+            except OperationalError as e:
+                # Broker unreachable; record the login inline rather than fail it
+                logger.warning(f"Could not queue login record: {str(e)}")
+                record_login(*login_record)
+        else:
+            record_login(*login_record)
         
         return Response({
             'user': UserProfileSerializer(user).data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            },
+            'tokens': issue_tokens(user, session_key=session_key),
             'message': 'Login successful'
         })
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class LogoutView(APIView):
@@ -105,23 +126,30 @@ class LogoutView(APIView):
     
     def post(self, request):
         try:
-            refresh_token = request.data["refresh_token"]
-            token = RefreshToken(refresh_token)
+            token = RefreshToken(request.data["refresh_token"])
+        except (KeyError, TokenError):
+            return Response({
+                'error': 'Invalid token'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        access_token = request.auth
+        with transaction.atomic():
             token.blacklist()
             
-            # Deactivate session
+            # Deactivate this device's session only
             UserSession.objects.filter(
                 user=request.user,
+                session_key=_session_key(request, token),
                 is_active=True
-            ).update(is_active=False)
+            ).update(is_active=False, ended_at=timezone.now())
             
-            return Response({
-                'message': 'Logout successful'
-            }, status=status.HTTP_205_RESET_CONTENT)
-        except Exception as e:
-            return Response({
-                'error': 'Invalid token'
-            }, status=status.HTTP_400_BAD_REQUEST)
+            # Only reject the access token once the logout is durable
+            if isinstance(access_token, Token):
+                transaction.on_commit(lambda: revoke_token(access_token))
+        
+        return Response({
+            'message': 'Logout successful'
+        }, status=status.HTTP_205_RESET_CONTENT)
 
 
 class ProfileView(generics.RetrieveUpdateAPIView):
@@ -132,7 +160,10 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # request.user carries only the cached auth fields; load the
+        # serializer's columns in one query (and write back only those)
+        columns = [name for name in self.serializer_class.Meta.fields if name != 'full_name']
+        return User.objects.only(*columns).get(pk=self.request.user.pk)
 
 
 class ChangePasswordView(APIView):
@@ -140,6 +171,7 @@ class ChangePasswordView(APIView):
     Change user password.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ChangePasswordRateThrottle]
     
     def post(self, request):
         serializer = ChangePasswordSerializer(
@@ -160,14 +192,22 @@ class APIKeyListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = APIKeySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = APIKeyCursorPagination
     
     def get_queryset(self):
-        return APIKey.objects.filter(user=self.request.user)
+        columns = [name for name in self.serializer_class.Meta.fields if name != 'key']
+        return APIKey.objects.filter(user=self.request.user).only(*columns)
     
     def perform_create(self, serializer):
-        # Generate secure API key
+        # Generate secure API key; only its hash is stored
         api_key = secrets.token_urlsafe(32)
-        serializer.save(user=self.request.user, key=api_key)
+        instance = serializer.save(
+            user=self.request.user,
+            key_hash=APIKey.hash_key(api_key),
+            key_prefix=api_key[:8]
+        )
+        # Returned once in the create response
+        instance.key = api_key
 
 
 class APIKeyDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -178,7 +218,8 @@ class APIKeyDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return APIKey.objects.filter(user=self.request.user)
+        columns = [name for name in self.serializer_class.Meta.fields if name != 'key']
+        return APIKey.objects.filter(user=self.request.user).only(*columns)
 
 
 class UserStatsView(APIView):
@@ -188,58 +229,58 @@ class UserStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        user = request.user
-        
-        # Calculate statistics
+        # Counters and both counts in one query
         active_sessions = UserSession.objects.filter(
-            user=user,
+            user=OuterRef('pk'),
             is_active=True,
             last_activity__gte=timezone.now() - timedelta(hours=24)
-        ).count()
+        ).order_by().values('user').annotate(n=Count('id')).values('n')
         
-        api_keys_count = APIKey.objects.filter(
-            user=user,
+        api_keys = APIKey.objects.filter(
+            user=OuterRef('pk'),
             is_active=True
-        ).count()
-        
-        account_age = (timezone.now() - user.created_at).days
+        ).order_by().values('user').annotate(n=Count('id')).values('n')
         
-        stats_data = {
-            'total_api_calls': user.api_calls_count,
-            'total_data_processed_mb': user.data_processed_mb,
-            'active_sessions': active_sessions,
-            'api_keys_count': api_keys_count,
-            'last_login': user.last_login,
-            'account_age_days': account_age
-        }
+        user = User.objects.filter(pk=request.user.pk).values(
+            'api_calls_count', 'data_processed_mb', 'last_login', 'created_at'
+        ).annotate(
+            active_sessions=Coalesce(Subquery(active_sessions, output_field=IntegerField()), 0),
+            api_keys_count=Coalesce(Subquery(api_keys, output_field=IntegerField()), 0)
+        ).get()
         
-        serializer = UserStatsSerializer(stats_data)
-        return Response(serializer.data)
+        return Response({
+            'total_api_calls': user['api_calls_count'],
+            'total_data_processed_mb': user['data_processed_mb'],
+            'active_sessions': user['active_sessions'],
+            'api_keys_count': user['api_keys_count'],
+            'last_login': user['last_login'],
+            'account_age_days': (timezone.now() - user['created_at']).days
+        })
 
 
-@api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
-def user_sessions(request):
+class UserSessionListView(generics.ListAPIView):
     """
-    Get user's active sessions.
+    List user's active sessions.
     """
-    sessions = UserSession.objects.filter(
-        user=request.user,
-        is_active=True
-    ).order_by('-last_activity')[:10]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserSessionCursorPagination
     
-    sessions_data = []
-    for session in sessions:
-        sessions_data.append({
-            'id': session.id,
-            'ip_address': session.ip_address,
-            'user_agent': session.user_agent,
-            'created_at': session.created_at,
-            'last_activity': session.last_activity,
-            'is_current': session.session_key == request.session.session_key
-        })
+    def get_queryset(self):
+        return UserSession.objects.filter(
+            user=self.request.user,
+            is_active=True
+        ).annotate(
+            is_current=ExpressionWrapper(
+                Q(session_key=_session_key(self.request)),
+                output_field=BooleanField()
+            )
+        ).values(
+            'id', 'ip_address', 'user_agent', 'created_at', 'last_activity', 'is_current'
+        )
     
-    return Response(sessions_data)
+    def list(self, request, *args, **kwargs):
+        # Rows are already response-shaped
+        return self.get_paginated_response(self.paginate_queryset(self.get_queryset()))
 
 
 @api_view(['POST'])
@@ -254,7 +295,8 @@ def terminate_session(request, session_id):
             user=request.user
         )
         session.is_active = False
-        session.save()
+        session.ended_at = timezone.now()
+        session.save(update_fields=['is_active', 'ended_at', 'last_activity'])
         
         return Response({
             'message': 'Session terminated successfully'
@@ -5,3 +5,6 @@ class DataIngestionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.data_ingestion'
     verbose_name = 'Data Ingestion'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,158 @@
+"""
+Custom model fields for data ingestion app.
+"""
+
+import base64
+import functools
+import hashlib
+import logging
+import zlib
+
+import orjson
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.conf import settings
+from django.db import models
+from django.db.models import expressions
+from django.db.models.fields.json import KeyTransform
+
+logger = logging.getLogger(__name__)
+
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _str_keys(value):
+    if isinstance(value, dict):
+        return {str(key): _str_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_str_keys(item) for item in value]
+    return value
+
+
+def _dumps(value) -> bytes:
+    try:
+        return orjson.dumps(value, default=str, option=_DUMPS_OPTIONS)
+    except TypeError:
+        # Keys orjson cannot encode (e.g. pandas Timestamps) are stored as strings
+        return orjson.dumps(_str_keys(value), default=str, option=_DUMPS_OPTIONS)
+
+
+class CompressedJSONField(models.BinaryField):
+    """
+    JSON-compatible value stored as zlib-compressed orjson bytes.
+
+    Column profiles and quality reports are written once and read as a
+    whole, never queried into; storing them compressed keeps rows small and
+    decoding in C. Values that orjson cannot encode natively (timestamps,
+    Decimals) are stored as strings.
+    """
+
+    def __init__(self, *args, compression_level=6, **kwargs):
+        self.compression_level = compression_level
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compression_level != 6:
+            kwargs['compression_level'] = self.compression_level
+        if kwargs.get('editable') is True:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return orjson.loads(zlib.decompress(value))
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return orjson.loads(zlib.decompress(bytes(value)))
+        if isinstance(value, str):
+            # As written by value_to_string (fixtures, dumpdata)
+            return orjson.loads(value)
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return zlib.compress(_dumps(value), self.compression_level)
+
+    def value_to_string(self, obj):
+        return _dumps(self.value_from_object(obj)).decode()
+
+
+class ORJSONField(models.JSONField):
+    """
+    JSONField that encodes and decodes stored documents with orjson instead
+    of json. NaN and infinity are stored as null, which jsonb requires.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        # Some backends (SQLite at least) extract non-string key transforms
+        # in their SQL types
+        if isinstance(expression, KeyTransform) and not isinstance(value, str):
+            return value
+        if self.decoder is not None:
+            return super().from_db_value(value, expression, connection)
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if self.encoder is not None or isinstance(value, expressions.Value) or hasattr(value, 'as_sql'):
+            return super().get_db_prep_value(value, connection, prepared=True)
+        return _dumps(value).decode()
+
+
+# Fernet tokens are base64 of a 0x80 version byte and a timestamp
+_FERNET_PREFIX = 'gAAAAA'
+
+
+@functools.lru_cache(maxsize=1)
+def _fernet() -> MultiFernet:
+    # The first key encrypts; every key, then the SECRET_KEY-derived one,
+    # is tried in turn when decrypting
+    keys = list(settings.FIELD_ENCRYPTION_KEYS)
+    keys.append(base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest()))
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+class Ciphertext(str):
+    """A stored value that none of the configured keys could decrypt."""
+
+
+class EncryptedTextField(models.TextField):
+    """
+    Text encrypted at rest with Fernet (AES-128-CBC + HMAC-SHA256).
+
+    Values are encrypted with the first of FIELD_ENCRYPTION_KEYS (or a key
+    derived from SECRET_KEY when none is set) and decrypted with any of
+    them, so a new key can be put in front of the old ones; rows move to it
+    as they are saved. Values written before encryption was enabled are
+    read back as-is and encrypted on their next save.
+
+    A value no key can decrypt is returned as its ``Ciphertext`` and written
+    back unchanged, so saving the row never destroys it.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if not value or not value.startswith(_FERNET_PREFIX):
+            return value
+        try:
+            return _fernet().decrypt(value.encode()).decode()
+        except InvalidToken:
+            logger.error(f"Could not decrypt {self.model.__name__}.{self.name}; check FIELD_ENCRYPTION_KEYS")
+            return Ciphertext(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, Ciphertext):
+            return str(value)
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return _fernet().encrypt(value.encode()).decode()
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['user', '-created_at'], name='data_source_user_id_f9f875_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['user', 'status'], name='data_source_user_id_342047_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['user', 'source_type'], name='data_source_user_id_849242_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datatransformation',
+            index=models.Index(fields=['user', '-created_at'], name='data_transf_user_id_7a3c5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='etloperation',
+            index=models.Index(fields=['user', '-created_at'], name='etl_operati_user_id_911a36_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0002_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasource',
+            name='file_sha256',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['user', 'file_sha256'], name='data_source_user_id_6164de_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:20
+
+import apps.data_ingestion.fields
+from django.db import migrations
+
+# JSON columns moved to compressed storage, by model
+COMPRESSED_FIELDS = {
+    'datacolumn': ['sample_values', 'value_counts'],
+    'dataqualityreport': ['issues', 'recommendations'],
+}
+
+
+def _copy(registry, source_suffix, target_suffix):
+    for model_name, fields in COMPRESSED_FIELDS.items():
+        model = registry.get_model('data_ingestion', model_name)
+        sources = [field + source_suffix for field in fields]
+        targets = [field + target_suffix for field in fields]
+        rows = list(model.objects.only('pk', *sources))
+        for row in rows:
+            for source, target in zip(sources, targets):
+                setattr(row, target, getattr(row, source))
+        model.objects.bulk_update(rows, targets, batch_size=500)
+
+
+def compress(registry, schema_editor):
+    _copy(registry, '', '_compressed')
+
+
+def decompress(registry, schema_editor):
+    _copy(registry, '_compressed', '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0003_datasource_file_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datacolumn',
+            name='sample_values_compressed',
+            field=apps.data_ingestion.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacolumn',
+            name='value_counts_compressed',
+            field=apps.data_ingestion.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataqualityreport',
+            name='issues_compressed',
+            field=apps.data_ingestion.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataqualityreport',
+            name='recommendations_compressed',
+            field=apps.data_ingestion.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress, decompress),
+        migrations.RemoveField(
+            model_name='datacolumn',
+            name='sample_values',
+        ),
+        migrations.RemoveField(
+            model_name='datacolumn',
+            name='value_counts',
+        ),
+        migrations.RemoveField(
+            model_name='dataqualityreport',
+            name='issues',
+        ),
+        migrations.RemoveField(
+            model_name='dataqualityreport',
+            name='recommendations',
+        ),
+        migrations.RenameField(
+            model_name='datacolumn',
+            old_name='sample_values_compressed',
+            new_name='sample_values',
+        ),
+        migrations.RenameField(
+            model_name='datacolumn',
+            old_name='value_counts_compressed',
+            new_name='value_counts',
+        ),
+        migrations.RenameField(
+            model_name='dataqualityreport',
+            old_name='issues_compressed',
+            new_name='issues',
+        ),
+        migrations.RenameField(
+            model_name='dataqualityreport',
+            old_name='recommendations_compressed',
+            new_name='recommendations',
+        ),
+        migrations.AlterField(
+            model_name='dataqualityreport',
+            name='issues',
+            field=apps.data_ingestion.fields.CompressedJSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='dataqualityreport',
+            name='recommendations',
+            field=apps.data_ingestion.fields.CompressedJSONField(default=list),
+        ),
+    ]
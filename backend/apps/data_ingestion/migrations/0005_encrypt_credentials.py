@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:30
+
+import apps.data_ingestion.fields
+from django.db import migrations
+from django.db.models import Q
+
+
+def encrypt_existing(registry, schema_editor):
+    # Plaintext values load unchanged and are encrypted when saved
+    DataSource = registry.get_model('data_ingestion', 'DataSource')
+    rows = list(
+        DataSource.objects.filter(
+            Q(db_password__isnull=False) | Q(api_auth_token__isnull=False)
+        ).only('pk', 'db_password', 'api_auth_token')
+    )
+    DataSource.objects.bulk_update(rows, ['db_password', 'api_auth_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0004_compress_profile_json'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='datasource',
+            name='api_auth_token',
+            field=apps.data_ingestion.fields.EncryptedTextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='datasource',
+            name='db_password',
+            field=apps.data_ingestion.fields.EncryptedTextField(blank=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(encrypt_existing, migrations.RunPython.noop),
+    ]
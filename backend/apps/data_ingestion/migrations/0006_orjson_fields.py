@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:40
+
+import apps.data_ingestion.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0005_encrypt_credentials'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='datasource',
+            name='api_headers',
+            field=apps.data_ingestion.fields.ORJSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='datasource',
+            name='api_params',
+            field=apps.data_ingestion.fields.ORJSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='datatransformation',
+            name='operations',
+            field=apps.data_ingestion.fields.ORJSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='etloperation',
+            name='log_messages',
+            field=apps.data_ingestion.fields.ORJSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='etloperation',
+            name='result_data',
+            field=apps.data_ingestion.fields.ORJSONField(blank=True, null=True),
+        ),
+    ]
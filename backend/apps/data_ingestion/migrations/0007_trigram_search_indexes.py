@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Trigram GIN indexes for substring search on data sources. They index
+# UPPER(column::text) because that is what icontains compares on
+# PostgreSQL; other backends (the default SQLite development database)
+# skip these operations.
+TRIGRAM_INDEXES = [
+    ('data_sources_name_trgm', 'name'),
+    ('data_sources_description_trgm', 'description'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "data_sources" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0006_orjson_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
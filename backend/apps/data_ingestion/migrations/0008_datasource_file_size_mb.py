@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:12
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Round
+
+
+def backfill_file_size_mb(apps, schema_editor):
+    DataSource = apps.get_model('data_ingestion', 'DataSource')
+    DataSource.objects.filter(file_size__gt=0).update(
+        file_size_mb=Round(Cast('file_size', models.FloatField()) / (1024 * 1024), 2)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0007_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasource',
+            name='file_size_mb',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_file_size_mb, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+LEVELS = {'debug', 'info', 'warning', 'error'}
+
+
+def copy_log_messages(apps, schema_editor):
+    ETLOperation = apps.get_model('data_ingestion', 'ETLOperation')
+    ETLLogMessage = apps.get_model('data_ingestion', 'ETLLogMessage')
+    entries = []
+    for operation in ETLOperation.objects.exclude(log_messages=[]).only('id', 'log_messages').iterator():
+        for line in operation.log_messages or []:
+            level = 'info'
+            if isinstance(line, dict):
+                level = str(line.get('level', 'info')).lower()
+                line = line.get('message', line)
+            entries.append(ETLLogMessage(
+                operation_id=operation.id,
+                level=level if level in LEVELS else 'info',
+                message=str(line)
+            ))
+    ETLLogMessage.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0008_datasource_file_size_mb'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ETLLogMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('debug', 'Debug'), ('info', 'Info'), ('warning', 'Warning'), ('error', 'Error')], default='info', max_length=10)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('operation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_entries', to='data_ingestion.etloperation')),
+            ],
+            options={
+                'db_table': 'etl_log_messages',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['operation', 'created_at'], name='etl_log_mes_operati_ce7faf_idx')],
+            },
+        ),
+        migrations.RunPython(copy_log_messages, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='etloperation',
+            name='log_messages',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:26
+
+import apps.data_ingestion.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0009_etl_log_messages'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='datasource',
+            name='id',
+            field=models.UUIDField(default=apps.data_ingestion.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='datatransformation',
+            name='id',
+            field=models.UUIDField(default=apps.data_ingestion.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='etloperation',
+            name='id',
+            field=models.UUIDField(default=apps.data_ingestion.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
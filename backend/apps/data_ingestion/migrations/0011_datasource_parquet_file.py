@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0010_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasource',
+            name='parquet_file',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to=''),
+        ),
+    ]
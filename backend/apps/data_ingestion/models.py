@@ -5,17 +5,58 @@ Data ingestion models for EETL AI Platform.
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
+from decimal import Decimal
+import hashlib
 import uuid
 import os
+import secrets
+import time
+
+from .fields import CompressedJSONField, EncryptedTextField, ORJSONField
 
 User = get_user_model()
 
 
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7): a 48-bit millisecond Unix
+    timestamp followed by random bits. Keys created in sequence land next to
+    each other in the primary key index instead of on random pages.
+    """
+    ts = time.time_ns() // 1_000_000
+    rand = secrets.token_bytes(10)
+    return uuid.UUID(bytes=(
+        ts.to_bytes(6, 'big')
+        + bytes([0x70 | (rand[0] & 0x0F), rand[1], 0x80 | (rand[2] & 0x3F)])
+        + rand[3:]
+    ))
+
+
 def upload_to(instance, filename):
     """Generate upload path for data files."""
-    ext = filename.split('.')[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    return os.path.join('uploads', str(instance.user.id), filename)
+    ext = os.path.splitext(filename)[1].lower()
+    # user_id avoids loading the user row
+    return f"uploads/{instance.user_id}/{secrets.token_hex(16)}{ext}"
+
+
+def file_sha256(uploaded_file, chunk_size=1024 * 1024):
+    """Hex SHA-256 of an uploaded file, read in ``chunk_size`` chunks."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks(chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parquet_cache_name(data_source):
+    """Storage name of a data source's Parquet copy."""
+    return f"cache/{data_source.user_id}/{data_source.pk}.parquet"
+
+
+def mb_from_bytes(size):
+    """Size in megabytes, rounded to two places (0 when unknown)."""
+    if not size:
+        return Decimal(0)
+    return round(Decimal(size) / (1024 * 1024), 2)
 
 
 class DataSource(models.Model):
@@ -36,14 +77,16 @@ class DataSource(models.Model):
         FAILED = 'failed', 'Failed'
         ARCHIVED = 'archived', 'Archived'
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='data_sources')
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     source_type = models.CharField(max_length=20, choices=SourceType.choices)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     
-    # File upload fields
+    # File upload fields. A user's sources with identical content share one
+    # stored file (see dedupe_upload), so a file may only be deleted once no
+    # other row references its name.
     file = models.FileField(
         upload_to=upload_to,
         blank=True,
@@ -51,7 +94,11 @@ class DataSource(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['csv', 'xlsx', 'xls', 'json', 'parquet'])]
     )
     file_size = models.BigIntegerField(blank=True, null=True)  # in bytes
+    file_size_mb = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     file_type = models.CharField(max_length=50, blank=True, null=True)
+    file_sha256 = models.CharField(max_length=64, blank=True, null=True)
+    # Parsed copy of the file, written when it is processed (see parquet_cache_name)
+    parquet_file = models.FileField(blank=True, null=True, editable=False)
     
     # Database connection fields
     db_type = models.CharField(max_length=50, blank=True, null=True)  # postgresql, mysql, sqlite, etc.
@@ -59,17 +106,17 @@ class DataSource(models.Model):
     db_port = models.IntegerField(blank=True, null=True)
     db_name = models.CharField(max_length=255, blank=True, null=True)
     db_username = models.CharField(max_length=255, blank=True, null=True)
-    db_password = models.CharField(max_length=255, blank=True, null=True)  # Should be encrypted
+    db_password = EncryptedTextField(max_length=255, blank=True, null=True)
     db_table = models.CharField(max_length=255, blank=True, null=True)
     db_query = models.TextField(blank=True, null=True)
     
     # API endpoint fields
     api_url = models.URLField(blank=True, null=True)
     api_method = models.CharField(max_length=10, default='GET', blank=True, null=True)
-    api_headers = models.JSONField(blank=True, null=True)
-    api_params = models.JSONField(blank=True, null=True)
+    api_headers = ORJSONField(blank=True, null=True)
+    api_params = ORJSONField(blank=True, null=True)
     api_auth_type = models.CharField(max_length=50, blank=True, null=True)
-    api_auth_token = models.TextField(blank=True, null=True)
+    api_auth_token = EncryptedTextField(blank=True, null=True)
     
     # Processing metadata
     rows_count = models.BigIntegerField(blank=True, null=True)
@@ -90,16 +137,51 @@ class DataSource(models.Model):
     class Meta:
         db_table = 'data_sources'
         ordering = ['-created_at']
+        indexes = [
+            # Listing, recent uploads and the per-user stats
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'status']),
+            models.Index(fields=['user', 'source_type']),
+            # Upload deduplication
+            models.Index(fields=['user', 'file_sha256']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_source_type_display()})"
     
-    @property
-    def file_size_mb(self):
-        """Return file size in MB."""
-        if self.file_size:
-            return round(self.file_size / (1024 * 1024), 2)
-        return 0
+    def get_source_type_display(self):
+        # Dict lookup instead of Django's scan of the field's flat choices
+        return _SOURCE_TYPE_DISPLAY.get(self.source_type, self.source_type)
+    
+    def get_status_display(self):
+        return _SOURCE_STATUS_DISPLAY.get(self.status, self.status)
+    
+    @classmethod
+    def dedupe_upload(cls, user, uploaded_file):
+        """
+        Return ``(file, sha256)`` for saving ``uploaded_file`` as ``user``'s
+        data source. If the user already uploaded identical content, ``file``
+        is the stored name of that copy, so the upload is not written again
+        and both rows point at the same file.
+        """
+        sha256 = file_sha256(uploaded_file)
+        existing = cls.objects.filter(
+            user=user,
+            file_sha256=sha256
+        ).exclude(file='').values_list('file', flat=True).first()
+        return (existing or uploaded_file), sha256
+    
+    def save(self, *args, **kwargs):
+        # file_size_mb is derived from file_size whenever the row is written
+        self.file_size_mb = mb_from_bytes(self.file_size)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'file_size' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'file_size_mb'}
+        super().save(*args, **kwargs)
+
+
+_SOURCE_TYPE_DISPLAY = dict(DataSource.SourceType.choices)
+_SOURCE_STATUS_DISPLAY = dict(DataSource.Status.choices)
 
 
 class DataColumn(models.Model):
@@ -140,8 +222,8 @@ class DataColumn(models.Model):
     
     # Metadata
     description = models.TextField(blank=True, null=True)
-    sample_values = models.JSONField(blank=True, null=True)  # Array of sample values
-    value_counts = models.JSONField(blank=True, null=True)  # Top value frequencies
+    sample_values = CompressedJSONField(blank=True, null=True)  # Array of sample values
+    value_counts = CompressedJSONField(blank=True, null=True)  # Top value frequencies
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -152,7 +234,49 @@ class DataColumn(models.Model):
         ordering = ['name']
     
     def __str__(self):
-        return f"{self.data_source.name}.{self.name} ({self.get_data_type_display()})"
+        # Own fields only, so printing a queryset does not load each source
+        return f"{self.name} ({self.get_data_type_display()}) in {self.data_source_id}"
+    
+    def display_name(self):
+        """``source.column``; loads the data source unless it was selected."""
+        return f"{self.data_source.name}.{self.name}"
+    
+    def get_data_type_display(self):
+        return _DATA_TYPE_DISPLAY.get(self.data_type, self.data_type)
+    
+    @classmethod
+    def list_dicts(cls, data_source_id, fields):
+        """
+        ``fields`` of the data source's columns as dicts, without building
+        a model instance per column.
+        """
+        return cls.objects.filter(data_source_id=data_source_id).values(*fields)
+    
+    # Refreshed when a source's columns are profiled again
+    UPSERT_FIELDS = (
+        'original_name', 'data_type', 'is_nullable', 'null_count',
+        'unique_count', 'min_value', 'max_value', 'mean_value',
+        'std_deviation', 'quality_score', 'has_outliers', 'outlier_count',
+        'sample_values', 'value_counts', 'updated_at',
+    )
+    
+    @classmethod
+    def upsert_many(cls, data_source, rows, batch_size=500):
+        """
+        Insert the data source's columns described by ``rows`` (field
+        dicts), updating columns that already exist by name, in one
+        INSERT ... ON CONFLICT per ``batch_size`` rows.
+        """
+        return cls.objects.bulk_create(
+            [cls(data_source=data_source, **row) for row in rows],
+            update_conflicts=True,
+            unique_fields=['data_source', 'name'],
+            update_fields=cls.UPSERT_FIELDS,
+            batch_size=batch_size
+        )
+
+
+_DATA_TYPE_DISPLAY = dict(DataColumn.DataType.choices)
 
 
 class DataQualityReport(models.Model):
@@ -187,8 +311,8 @@ class DataQualityReport(models.Model):
     low_issues = models.IntegerField(default=0)
     
     # Detailed findings
-    issues = models.JSONField(default=list)  # List of issue objects
-    recommendations = models.JSONField(default=list)  # List of recommendations
+    issues = CompressedJSONField(default=list)  # List of issue objects
+    recommendations = CompressedJSONField(default=list)  # List of recommendations
     
     # Processing info
     generated_at = models.DateTimeField(auto_now_add=True)
@@ -198,7 +322,7 @@ class DataQualityReport(models.Model):
         db_table = 'data_quality_reports'
     
     def __str__(self):
-        return f"Quality Report for {self.data_source.name} (Score: {self.overall_score})"
+        return f"Quality Report for {self.data_source_id} (Score: {self.overall_score})"
 
 
 class DataTransformation(models.Model):
@@ -220,7 +344,7 @@ class DataTransformation(models.Model):
         COMPLETED = 'completed', 'Completed'
         FAILED = 'failed', 'Failed'
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     data_source = models.ForeignKey(
         DataSource,
         on_delete=models.CASCADE,
@@ -241,7 +365,7 @@ class DataTransformation(models.Model):
     )
     
     # Transformation definition
-    operations = models.JSONField(default=list)  # List of transformation operations
+    operations = ORJSONField(default=list)  # List of transformation operations
     sql_query = models.TextField(blank=True, null=True)  # Generated SQL
     python_code = models.TextField(blank=True, null=True)  # Generated Python code
     
@@ -259,9 +383,22 @@ class DataTransformation(models.Model):
     class Meta:
         db_table = 'data_transformations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.get_transformation_type_display()}"
+    
+    def get_transformation_type_display(self):
+        return _TRANSFORMATION_TYPE_DISPLAY.get(self.transformation_type, self.transformation_type)
+    
+    def get_status_display(self):
+        return _TRANSFORMATION_STATUS_DISPLAY.get(self.status, self.status)
+
+
+_TRANSFORMATION_TYPE_DISPLAY = dict(DataTransformation.TransformationType.choices)
+_TRANSFORMATION_STATUS_DISPLAY = dict(DataTransformation.Status.choices)
 
 
 class ETLOperation(models.Model):
@@ -282,7 +419,7 @@ class ETLOperation(models.Model):
         FAILED = 'failed', 'Failed'
         CANCELLED = 'cancelled', 'Cancelled'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='etl_operations')
     operation_type = models.CharField(max_length=30, choices=OperationType.choices)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
@@ -313,10 +450,9 @@ class ETLOperation(models.Model):
     completed_at = models.DateTimeField(blank=True, null=True)
     execution_time = models.FloatField(blank=True, null=True)  # in seconds
 
-    # Results and logs
-    result_data = models.JSONField(blank=True, null=True)
+    # Results (log lines are ETLLogMessage rows)
+    result_data = ORJSONField(blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
-    log_messages = models.JSONField(default=list)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -325,6 +461,51 @@ class ETLOperation(models.Model):
     class Meta:
         db_table = 'etl_operations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_operation_type_display()}) - {self.get_status_display()}"
+
+    def get_operation_type_display(self):
+        return _OPERATION_TYPE_DISPLAY.get(self.operation_type, self.operation_type)
+
+    def get_status_display(self):
+        return _OPERATION_STATUS_DISPLAY.get(self.status, self.status)
+
+    def log(self, message, level='info'):
+        """Append a log line; a single INSERT however long the log is."""
+        return ETLLogMessage.objects.create(operation=self, level=level, message=message)
+
+
+_OPERATION_TYPE_DISPLAY = dict(ETLOperation.OperationType.choices)
+_OPERATION_STATUS_DISPLAY = dict(ETLOperation.Status.choices)
+
+
+class ETLLogMessage(models.Model):
+    """
+    Model for a single log line of an ETL operation.
+    """
+
+    class Level(models.TextChoices):
+        DEBUG = 'debug', 'Debug'
+        INFO = 'info', 'Info'
+        WARNING = 'warning', 'Warning'
+        ERROR = 'error', 'Error'
+
+    operation = models.ForeignKey(ETLOperation, on_delete=models.CASCADE, related_name='log_entries')
+    level = models.CharField(max_length=10, choices=Level.choices, default=Level.INFO)
+    message = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'etl_log_messages'
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['operation', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"[{self.level}] {self.message[:50]}"
@@ -2,43 +2,128 @@
 Serializers for data ingestion app.
 """
 
+import os
+
 from rest_framework import serializers
 from django.core.files.uploadedfile import UploadedFile
 from .models import DataSource, DataColumn, DataQualityReport, DataTransformation, ETLOperation
 
+ALLOWED_EXTENSIONS = frozenset({'csv', 'xlsx', 'xls', 'json', 'parquet'})
+ALLOWED_EXTENSIONS_DISPLAY = ', '.join(sorted(ALLOWED_EXTENSIONS))
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
+# Leading bytes each binary format must start with. pandas sniffs Excel
+# files by content, so either Excel container is accepted for both.
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_PARQUET_MAGIC = b'PAR1'
+FILE_SIGNATURES = {
+    'xlsx': (_ZIP_MAGIC, _OLE2_MAGIC),
+    'xls': (_OLE2_MAGIC, _ZIP_MAGIC),
+    'parquet': (_PARQUET_MAGIC,),
+    'json': (b'{', b'['),
+}
+_BINARY_SIGNATURES = (_ZIP_MAGIC, _OLE2_MAGIC, _PARQUET_MAGIC)
+SNIFF_BYTES = 4096
+# Enough of a CSV for pyarrow to infer its column names and types
+SCHEMA_SNIFF_BLOCK_BYTES = 64 * 1024
+
+
+def _validate_upload(value):
+    """Reject files over MAX_UPLOAD_BYTES or with an unsupported extension."""
+    if value.size > MAX_UPLOAD_BYTES:
+        raise serializers.ValidationError(
+            "File size cannot exceed 100MB."
+        )
+    
+    file_extension = os.path.splitext(value.name)[1][1:].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise serializers.ValidationError(
+            f"File type '{file_extension}' is not supported. "
+            f"Allowed types: {ALLOWED_EXTENSIONS_DISPLAY}"
+        )
+    
+    if not _content_matches(value, file_extension):
+        raise serializers.ValidationError(
+            f"File content does not match its '.{file_extension}' extension."
+        )
+    
+    if file_extension == 'csv':
+        value._cached_schema = _sniff_csv_schema(value)
+
+
+def _content_matches(value, file_extension):
+    """Check the file's leading bytes against its extension's signatures."""
+    value.seek(0)
+    header = value.read(SNIFF_BYTES)
+    value.seek(0)
+    
+    if file_extension == 'csv':
+        # Plain text: anything but a known binary container
+        return not header.startswith(_BINARY_SIGNATURES)
+    if file_extension == 'json':
+        header = header.lstrip(b'\xef\xbb\xbf \t\r\n')
+    return header.startswith(FILE_SIGNATURES[file_extension])
+
+
+def _sniff_csv_schema(value):
+    """
+    Infer a CSV upload's pyarrow schema from its first block, or None if
+    pyarrow cannot parse it (pandas, which retries other encodings, still
+    gets to read the file during processing).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    value.seek(0)
+    try:
+        reader = pa_csv.open_csv(
+            value.file,
+            read_options=pa_csv.ReadOptions(block_size=SCHEMA_SNIFF_BLOCK_BYTES)
+        )
+        return reader.schema
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return None
+    finally:
+        value.seek(0)
+
 
 class DataColumnSerializer(serializers.ModelSerializer):
     """
     Serializer for data columns.
     """
+    sample_values = serializers.JSONField(required=False, allow_null=True)
+    value_counts = serializers.JSONField(required=False, allow_null=True)
     
     class Meta:
         model = DataColumn
-        fields = [
+        fields = (
             'id', 'name', 'original_name', 'data_type', 'is_nullable',
             'is_primary_key', 'is_foreign_key', 'null_count', 'unique_count',
             'min_value', 'max_value', 'mean_value', 'std_deviation',
             'quality_score', 'has_outliers', 'outlier_count',
             'description', 'sample_values', 'value_counts',
             'created_at', 'updated_at'
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at')
 
 
 class DataQualityReportSerializer(serializers.ModelSerializer):
     """
     Serializer for data quality reports.
     """
+    issues = serializers.JSONField(required=False)
+    recommendations = serializers.JSONField(required=False)
     
     class Meta:
         model = DataQualityReport
-        fields = [
+        fields = (
             'overall_score', 'completeness_score', 'consistency_score',
             'accuracy_score', 'validity_score', 'total_issues',
             'critical_issues', 'high_issues', 'medium_issues', 'low_issues',
             'issues', 'recommendations', 'generated_at', 'processing_time'
-        ]
-        read_only_fields = ['generated_at']
+        )
+        read_only_fields = ('generated_at',)
 
 
 class DataTransformationSerializer(serializers.ModelSerializer):
@@ -48,17 +133,17 @@ class DataTransformationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DataTransformation
-        fields = [
+        fields = (
             'id', 'name', 'description', 'transformation_type', 'status',
             'operations', 'sql_query', 'python_code', 'output_rows',
             'output_columns', 'execution_time', 'error_message',
             'created_at', 'updated_at', 'executed_at'
-        ]
-        read_only_fields = [
+        )
+        read_only_fields = (
             'id', 'status', 'output_rows', 'output_columns',
             'execution_time', 'error_message', 'created_at',
             'updated_at', 'executed_at'
-        ]
+        )
 
 
 class DataSourceSerializer(serializers.ModelSerializer):
@@ -72,7 +157,7 @@ class DataSourceSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DataSource
-        fields = [
+        fields = (
             'id', 'name', 'description', 'source_type', 'status',
             'file', 'file_size', 'file_size_mb', 'file_type',
             'db_type', 'db_host', 'db_port', 'db_name', 'db_username',
@@ -81,64 +166,74 @@ class DataSourceSerializer(serializers.ModelSerializer):
             'processing_time', 'error_message', 'created_at', 'updated_at',
             'processed_at', 'is_public', 'auto_refresh', 'refresh_interval',
             'columns', 'quality_report', 'transformations'
-        ]
-        read_only_fields = [
+        )
+        read_only_fields = (
             'id', 'status', 'file_size', 'file_type', 'rows_count',
             'columns_count', 'processing_time', 'error_message',
             'created_at', 'updated_at', 'processed_at'
-        ]
+        )
         extra_kwargs = {
             'db_password': {'write_only': True},
             'api_auth_token': {'write_only': True},
         }
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Load the nested relations up front: the quality report in the same
+        query and columns and transformations in one query each, instead of
+        three queries per data source. Views serializing data sources with this
+        serializer should pass their queryset through here.
+        """
+        return queryset.select_related('quality_report').prefetch_related(
+            'columns', 'transformations'
+        )
+
     def validate_file(self, value):
         """Validate uploaded file."""
         if value:
-            # Check file size (100MB limit)
-            if value.size > 100 * 1024 * 1024:
-                raise serializers.ValidationError(
-                    "File size cannot exceed 100MB."
-                )
-            
-            # Check file extension
-            allowed_extensions = ['csv', 'xlsx', 'xls', 'json', 'parquet']
-            file_extension = value.name.split('.')[-1].lower()
-            if file_extension not in allowed_extensions:
-                raise serializers.ValidationError(
-                    f"File type '{file_extension}' is not supported. "
-                    f"Allowed types: {', '.join(allowed_extensions)}"
-                )
-        
+            _validate_upload(value)
         return value
 
+    # Fields each source type cannot be saved without
+    _REQUIRED_FIELDS = {
+        'file': ('file',),
+        'database': ('db_type', 'db_host', 'db_name', 'db_username'),
+        'api': ('api_url',),
+    }
+
     def validate(self, attrs):
         """Validate data source configuration."""
         source_type = attrs.get('source_type')
-        
-        if source_type == 'file':
-            if not attrs.get('file'):
-                raise serializers.ValidationError(
-                    "File is required for file-type data sources."
-                )
-        
-        elif source_type == 'database':
-            required_fields = ['db_type', 'db_host', 'db_name', 'db_username']
-            for field in required_fields:
-                if not attrs.get(field):
-                    raise serializers.ValidationError(
-                        f"{field} is required for database connections."
-                    )
-        
-        elif source_type == 'api':
-            if not attrs.get('api_url'):
-                raise serializers.ValidationError(
-                    "API URL is required for API data sources."
-                )
+        missing = [
+            field for field in self._REQUIRED_FIELDS.get(source_type, ())
+            if not attrs.get(field)
+        ]
+        if missing:
+            raise serializers.ValidationError({
+                field: f"{field} is required for {source_type} data sources."
+                for field in missing
+            })
         
         return attrs
 
 
+class DataSourceListSerializer(serializers.ModelSerializer):
+    """
+    Summary serializer for listing data sources, without nested relations,
+    connection settings or other large fields.
+    """
+    file_size_mb = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = DataSource
+        fields = (
+            'id', 'name', 'source_type', 'status', 'file_size', 'file_size_mb',
+            'rows_count', 'columns_count', 'created_at', 'updated_at'
+        )
+        read_only_fields = fields
+
+
 class DataSourceCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating data sources.
@@ -146,14 +241,14 @@ class DataSourceCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DataSource
-        fields = [
+        fields = (
             'name', 'description', 'source_type', 'file',
             'db_type', 'db_host', 'db_port', 'db_name',
             'db_username', 'db_password', 'db_table', 'db_query',
             'api_url', 'api_method', 'api_headers', 'api_params',
             'api_auth_type', 'api_auth_token', 'is_public',
             'auto_refresh', 'refresh_interval'
-        ]
+        )
         extra_kwargs = {
             'db_password': {'write_only': True},
             'api_auth_token': {'write_only': True},
@@ -167,9 +262,9 @@ class DataSourceUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DataSource
-        fields = [
+        fields = (
             'name', 'description', 'is_public', 'auto_refresh', 'refresh_interval'
-        ]
+        )
 
 
 class FileUploadSerializer(serializers.Serializer):
@@ -182,21 +277,7 @@ class FileUploadSerializer(serializers.Serializer):
     
     def validate_file(self, value):
         """Validate uploaded file."""
-        # Check file size (100MB limit)
-        if value.size > 100 * 1024 * 1024:
-            raise serializers.ValidationError(
-                "File size cannot exceed 100MB."
-            )
-        
-        # Check file extension
-        allowed_extensions = ['csv', 'xlsx', 'xls', 'json', 'parquet']
-        file_extension = value.name.split('.')[-1].lower()
-        if file_extension not in allowed_extensions:
-            raise serializers.ValidationError(
-                f"File type '{file_extension}' is not supported. "
-                f"Allowed types: {', '.join(allowed_extensions)}"
-            )
-        
+        _validate_upload(value)
         return value
 
 
@@ -277,17 +358,24 @@ class ETLOperationSerializer(serializers.ModelSerializer):
     """
     Serializer for ETL operations.
     """
+    log_messages = serializers.SerializerMethodField()
 
     class Meta:
         model = ETLOperation
-        fields = [
+        fields = (
             'id', 'operation_type', 'status', 'name', 'description',
             'progress', 'data_source', 'transformation', 'started_at',
             'completed_at', 'execution_time', 'result_data',
             'error_message', 'log_messages', 'created_at', 'updated_at'
-        ]
-        read_only_fields = [
+        )
+        read_only_fields = (
             'id', 'status', 'progress', 'started_at', 'completed_at',
             'execution_time', 'result_data', 'error_message',
             'log_messages', 'created_at', 'updated_at'
+        )
+
+    def get_log_messages(self, obj):
+        return [
+            {'timestamp': entry.created_at, 'level': entry.level, 'message': entry.message}
+            for entry in obj.log_entries.all()
         ]
@@ -4,8 +4,10 @@ Services for data ingestion and processing.
 
 import pandas as pd
 import numpy as np
+import functools
 import json
 import logging
+import os
 import time
 from typing import Dict, Any, List, Optional
 from django.conf import settings
@@ -14,11 +16,106 @@ import sqlalchemy
 import requests
 from io import StringIO
 
-from .models import DataSource, DataColumn, DataQualityReport, DataTransformation
+from .models import DataSource, DataColumn, DataQualityReport, DataTransformation, parquet_cache_name
 from apps.ai_engine.services import OpenRouterService
 
 logger = logging.getLogger(__name__)
 
+# Rows per Parquet row group; previews read only the groups they cover
+PARQUET_ROW_GROUP_SIZE = 50_000
+
+
+def _connection_url(connection_params: Dict[str, Any]) -> sqlalchemy.engine.URL:
+    """SQLAlchemy URL for a source database's connection parameters."""
+    db_type = connection_params['db_type']
+    drivers = {'postgresql': 'postgresql', 'mysql': 'mysql+pymysql'}
+    if db_type in drivers:
+        return sqlalchemy.engine.URL.create(
+            drivers[db_type],
+            username=connection_params['db_username'],
+            password=connection_params['db_password'],
+            host=connection_params['db_host'],
+            port=connection_params['db_port'],
+            database=connection_params['db_name']
+        )
+    if db_type == 'sqlite':
+        return sqlalchemy.engine.URL.create('sqlite', database=connection_params['db_name'])
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+
+@functools.lru_cache(maxsize=32)
+def _get_engine(url: sqlalchemy.engine.URL) -> sqlalchemy.engine.Engine:
+    """
+    Engine for ``url``, shared by every preview, analysis and connection
+    test of that database so their connections are pooled instead of
+    reopened for each call. Pooled connections are pinged before use and
+    replaced after 30 minutes.
+    """
+    if url.get_backend_name() == 'sqlite':
+        return sqlalchemy.create_engine(url)
+    return sqlalchemy.create_engine(
+        url,
+        pool_size=5,
+        max_overflow=5,
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+
+
+def _column_kinds(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    DataColumn data type of each column, from one select_dtypes call per
+    kind rather than a pd.api.types check per column.
+    """
+    boolean = set(df.select_dtypes(include='bool').columns)
+    # pandas counts timedeltas as numbers; they are profiled as strings
+    integer = set(df.select_dtypes(include='integer', exclude='timedelta').columns)
+    numeric = set(df.select_dtypes(include='number', exclude='timedelta').columns)
+    datetime = set(df.select_dtypes(include=['datetime', 'datetimetz']).columns)
+
+    kinds = {}
+    for column_name in df.columns:
+        if column_name in boolean:
+            kinds[column_name] = 'boolean'
+        elif column_name in integer:
+            kinds[column_name] = 'integer'
+        elif column_name in numeric:
+            kinds[column_name] = 'float'
+        elif column_name in datetime:
+            kinds[column_name] = 'datetime'
+        else:
+            kinds[column_name] = 'string'
+    return kinds
+
+
+def _outlier_counts(numeric: pd.DataFrame, quartiles: pd.DataFrame) -> pd.Series:
+    """
+    Values per column outside 1.5 IQR of its quartiles (``quartiles`` as
+    from ``numeric.quantile([0.25, 0.75])``), compared as one float matrix
+    against per-column bounds rather than column by column.
+    """
+    values = numeric.to_numpy(dtype=float, na_value=np.nan)
+    q1, q3 = quartiles.to_numpy(dtype=float, na_value=np.nan)
+    iqr = q3 - q1
+    # NaN compares False, so missing values are never outliers
+    with np.errstate(invalid='ignore'):
+        mask = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+    return pd.Series(np.count_nonzero(mask, axis=0), index=numeric.columns)
+
+
+def _missing_counts(df: pd.DataFrame) -> pd.Series:
+    """Missing values per column, without a frame-sized isnull() mask."""
+    return len(df) - df.count()
+
+
+def _duplicate_row_count(df: pd.DataFrame) -> int:
+    """
+    Rows repeating an earlier row, counted over one 64-bit hash per row
+    instead of df.duplicated()'s factorized columns and boolean mask.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return len(row_hashes) - len(np.unique(row_hashes))
+
 
 class DataIngestionService:
     """
@@ -53,15 +150,7 @@ class DataIngestionService:
                     file_type = file_extension
 
             if file_type == 'csv':
-                # Try different encodings and separators
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        df = pd.read_csv(file_path, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise ValueError("Could not decode CSV file with any supported encoding")
+                df = self._read_csv(file_path)
 
             elif file_type in ['xlsx', 'xls']:
                 df = pd.read_excel(file_path)
@@ -81,53 +170,211 @@ class DataIngestionService:
             logger.error(f"Error reading file {file_path}: {str(e)}")
             raise
     
-    def read_database_data(self, connection_params: Dict[str, Any], query: str = None) -> pd.DataFrame:
+    def _read_csv(self, file_path: str) -> pd.DataFrame:
         """
-        Read data from database connection.
+        Parse a CSV file with pyarrow's multi-threaded reader, as UTF-8 or,
+        failing that, Latin-1 (which decodes any byte sequence).
         """
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        # Empty fields are nulls, as pandas reads them
+        convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+        for encoding in ('utf8', 'latin1'):
+            read_options = pa_csv.ReadOptions(encoding=encoding, use_threads=True, block_size=8 << 20)
+            try:
+                table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+            except pa.ArrowInvalid:
+                if encoding == 'latin1':
+                    raise
+                continue
+            # Text that is not valid UTF-8 is read as binary columns
+            if encoding == 'utf8' and any(pa.types.is_binary(field.type) for field in table.schema):
+                continue
+            break
+        # Release the Arrow buffers as columns are converted to NumPy blocks
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    
+    def write_parquet_cache(self, data_source: DataSource, df: pd.DataFrame):
+        """
+        Store ``df`` as the data source's Parquet copy (Snappy-compressed),
+        which previews and analyses read instead of parsing the file again.
+        Frames pyarrow cannot store (mixed-type or non-string column names)
+        are skipped and keep being read from the file.
+        """
+        name = parquet_cache_name(data_source)
+        path = data_source.file.storage.path(name)
         try:
-            # Build connection string
-            db_type = connection_params['db_type']
-            
-            if db_type == 'postgresql':
-                connection_string = (
-                    f"postgresql://{connection_params['db_username']}:"
-                    f"{connection_params['db_password']}@"
-                    f"{connection_params['db_host']}:"
-                    f"{connection_params['db_port']}/"
-                    f"{connection_params['db_name']}"
-                )
-            elif db_type == 'mysql':
-                connection_string = (
-                    f"mysql+pymysql://{connection_params['db_username']}:"
-                    f"{connection_params['db_password']}@"
-                    f"{connection_params['db_host']}:"
-                    f"{connection_params['db_port']}/"
-                    f"{connection_params['db_name']}"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_parquet(
+                path,
+                engine='pyarrow',
+                compression='snappy',
+                index=False,
+                row_group_size=PARQUET_ROW_GROUP_SIZE
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache data source {data_source.pk} as Parquet: {str(e)}")
+            return
+        data_source.parquet_file.name = name
+        data_source.save(update_fields=['parquet_file'])
+    
+    def read_source_file(self, data_source: DataSource, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Read a file data source, from its Parquet copy when there is one
+        (only ``columns``, if given) or else by parsing the uploaded file.
+        """
+        if data_source.parquet_file:
+            import pyarrow.parquet as pq
+
+            return pq.read_table(data_source.parquet_file.path, columns=columns).to_pandas()
+        return self.read_file_data(data_source.file.path, data_source.file_type)
+    
+    def _parquet_preview(self, data_source: DataSource, limit: int, offset: int,
+                         columns: List[str] = None) -> Dict[str, Any]:
+        """
+        Preview rows ``offset`` to ``offset + limit`` of the Parquet copy,
+        reading only the selected columns of the row groups covering them.
+        """
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(data_source.parquet_file.path)
+        metadata = parquet_file.metadata
+        available_columns = [col for col in columns or [] if col in parquet_file.schema_arrow.names]
+
+        row_groups = []
+        first_row = None
+        start = 0
+        for index in range(metadata.num_row_groups):
+            end = start + metadata.row_group(index).num_rows
+            if end > offset and start < offset + limit:
+                row_groups.append(index)
+                if first_row is None:
+                    first_row = start
+            start = end
+
+        table = parquet_file.read_row_groups(row_groups, columns=available_columns or None)
+        if row_groups:
+            table = table.slice(offset - first_row, limit)
+        return self._preview_response(table.to_pandas(), metadata.num_rows, offset, limit)
+    
+    def _stream_preview(self, data_source: DataSource, limit: int, offset: int,
+                        columns: List[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Preview an unprocessed CSV or Parquet upload by streaming record
+        batches until ``offset + limit`` rows are read, so the whole file is
+        never held in memory. Returns None for other formats and for CSVs
+        pyarrow cannot stream (not UTF-8, or types changing after the first
+        block), which are previewed from a full read instead.
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        path = data_source.file.path
+        file_extension = os.path.splitext(path)[1][1:].lower()
+        wanted_rows = offset + limit
+        try:
+            if file_extension == 'parquet':
+                parquet_file = pq.ParquetFile(path)
+                schema = parquet_file.schema_arrow
+                available_columns = [col for col in columns or [] if col in schema.names]
+                batches = parquet_file.iter_batches(batch_size=limit, columns=available_columns or None)
+                total_rows = parquet_file.metadata.num_rows
+            elif file_extension == 'csv':
+                batches = pa_csv.open_csv(
+                    path,
+                    convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
                 )
-            elif db_type == 'sqlite':
-                connection_string = f"sqlite:///{connection_params['db_name']}"
+                schema = batches.schema
+                available_columns = [col for col in columns or [] if col in schema.names]
+                # Counting the rest of the file only when processing has not
+                total_rows = data_source.rows_count
             else:
-                raise ValueError(f"Unsupported database type: {db_type}")
+                return None
+
+            collected = []
+            rows_read = 0
+            for batch in batches:
+                if rows_read < wanted_rows:
+                    collected.append(batch)
+                rows_read += batch.num_rows
+                if rows_read >= wanted_rows and total_rows is not None:
+                    break
+        except pa.ArrowInvalid as e:
+            logger.warning(f"Could not stream preview of data source {data_source.pk}: {str(e)}")
+            return None
+
+        if total_rows is None:
+            total_rows = rows_read
+        if any(pa.types.is_binary(field.type) for field in schema):
+            return None
+        table = pa.Table.from_batches(collected) if collected else schema.empty_table()
+        table = table.slice(offset, limit)
+        if available_columns:
+            table = table.select(available_columns)
+        return self._preview_response(table.to_pandas(), total_rows, offset, limit)
+    
+    def _preview_response(self, df_page: pd.DataFrame, total_rows: int, offset: int, limit: int) -> Dict[str, Any]:
+        return {
+            'data': df_page.fillna('').to_dict('records'),
+            'total_rows': total_rows,
+            'columns': list(df_page.columns),
+            'data_types': df_page.dtypes.astype(str).to_dict(),
+            'offset': offset,
+            'limit': limit
+        }
+    
+    def read_database_data(self, connection_params: Dict[str, Any], query: str = None) -> pd.DataFrame:
+        """
+        Read data from database connection.
+        """
+        try:
+            url = _connection_url(connection_params)
+            engine = _get_engine(url)
+            table_name = connection_params.get('db_table')
+            if not query and not table_name:
+                raise ValueError("Either query or table name must be provided")
             
-            # Create engine and read data
-            engine = sqlalchemy.create_engine(connection_string)
+            df = self._read_sql_arrow(
+                url,
+                query or f"SELECT * FROM {engine.dialect.identifier_preparer.quote(table_name)}"
+            )
+            if df is not None:
+                return df
             
             if query:
                 df = pd.read_sql_query(query, engine)
             else:
-                table_name = connection_params.get('db_table')
-                if not table_name:
-                    raise ValueError("Either query or table name must be provided")
                 df = pd.read_sql_table(table_name, engine)
             
-            engine.dispose()
             return df
         
         except Exception as e:
             logger.error(f"Error reading database data: {str(e)}")
             raise
     
+    def _read_sql_arrow(self, url: sqlalchemy.engine.URL, query: str) -> Optional[pd.DataFrame]:
+        """
+        Run ``query`` with connectorx, which fetches the result as Arrow
+        columns in Rust instead of DB-API rows. Returns None if connectorx
+        is not installed or fails on the query (e.g. an unsupported column
+        type), so the caller reads through SQLAlchemy instead.
+        """
+        try:
+            import connectorx as cx
+        except ImportError:
+            return None
+
+        # connectorx takes plain scheme URLs (postgresql://, mysql://, sqlite://)
+        conn = url.set(drivername=url.get_backend_name()).render_as_string(hide_password=False)
+        try:
+            table = cx.read_sql(conn, query, return_type='arrow')
+        except Exception as e:
+            logger.warning(f"connectorx read failed, falling back to SQLAlchemy: {str(e)}")
+            return None
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    
     def read_api_data(self, api_params: Dict[str, Any]) -> pd.DataFrame:
         """
         Read data from API endpoint.
@@ -192,32 +439,10 @@ class DataIngestionService:
         Test database connection.
         """
         try:
-            # Build connection string
             db_type = connection_params['db_type']
             
-            if db_type == 'postgresql':
-                connection_string = (
-                    f"postgresql://{connection_params['db_username']}:"
-                    f"{connection_params['db_password']}@"
-                    f"{connection_params['db_host']}:"
-                    f"{connection_params['db_port']}/"
-                    f"{connection_params['db_name']}"
-                )
-            elif db_type == 'mysql':
-                connection_string = (
-                    f"mysql+pymysql://{connection_params['db_username']}:"
-                    f"{connection_params['db_password']}@"
-                    f"{connection_params['db_host']}:"
-                    f"{connection_params['db_port']}/"
-                    f"{connection_params['db_name']}"
-                )
-            elif db_type == 'sqlite':
-                connection_string = f"sqlite:///{connection_params['db_name']}"
-            else:
-                raise ValueError(f"Unsupported database type: {db_type}")
-            
             # Test connection
-            engine = sqlalchemy.create_engine(connection_string)
+            engine = _get_engine(_connection_url(connection_params))
             with engine.connect() as conn:
                 # Get database info
                 if db_type == 'postgresql':
@@ -233,8 +458,6 @@ class DataIngestionService:
                 inspector = sqlalchemy.inspect(engine)
                 tables = inspector.get_table_names()
             
-            engine.dispose()
-            
             return {
                 'version': version,
                 'tables': tables[:20],  # Limit to first 20 tables
@@ -293,10 +516,13 @@ class DataIngestionService:
         try:
             # Read data based on source type
             if data_source.source_type == 'file':
-                df = self.read_file_data(
-                    data_source.file.path,
-                    data_source.file_type
-                )
+                if not filters:
+                    if data_source.parquet_file:
+                        return self._parquet_preview(data_source, limit, offset, columns)
+                    preview = self._stream_preview(data_source, limit, offset, columns)
+                    if preview is not None:
+                        return preview
+                df = self.read_source_file(data_source)
             elif data_source.source_type == 'database':
                 connection_params = {
                     'db_type': data_source.db_type,
@@ -368,6 +594,7 @@ class DataIngestionService:
                 data_source.file.path,
                 data_source.file_type
             )
+            self.write_parquet_cache(data_source, df)
             
             # Update data source with basic info
             data_source.rows_count = len(df)
@@ -403,6 +630,7 @@ class DataIngestionService:
             # Read and analyze file
             file_extension = data_source.file.name.split('.')[-1].lower()
             df = self.read_file_data(data_source.file.path, file_extension)
+            self.write_parquet_cache(data_source, df)
 
             # Update data source with basic info
             data_source.rows_count = len(df)
@@ -452,70 +680,65 @@ class DataIngestionService:
     
     def _create_column_records(self, data_source: DataSource, df: pd.DataFrame):
         """
-        Create column records for data source.
+        Create or refresh the column records for data source.
         """
-        for column_name in df.columns:
-            column_data = df[column_name]
-            
-            # Determine data type
-            if pd.api.types.is_numeric_dtype(column_data):
-                if pd.api.types.is_integer_dtype(column_data):
-                    data_type = 'integer'
-                else:
-                    data_type = 'float'
-            elif pd.api.types.is_datetime64_any_dtype(column_data):
-                data_type = 'datetime'
-            elif pd.api.types.is_bool_dtype(column_data):
-                data_type = 'boolean'
-            else:
-                data_type = 'string'
+        data_types = _column_kinds(df)
+        
+        # Each statistic is one vectorized pass over all columns
+        null_counts = df.isnull().sum()
+        unique_counts = df.nunique()
+        
+        numeric_columns = [name for name, data_type in data_types.items() if data_type in ('integer', 'float')]
+        if numeric_columns:
+            numeric = df[numeric_columns]
+            mins = numeric.min()
+            maxs = numeric.max()
+            means = numeric.mean()
+            stds = numeric.std()
             
-            # Calculate statistics
-            null_count = column_data.isnull().sum()
-            unique_count = column_data.nunique()
+            outlier_counts = _outlier_counts(numeric, numeric.quantile([0.25, 0.75]))
+        
+        rows = []
+        for column_name, data_type in data_types.items():
+            column_data = df[column_name]
+            null_count = int(null_counts[column_name])
             
             column_stats = {
-                'null_count': int(null_count),
-                'unique_count': int(unique_count),
+                'null_count': null_count,
+                'unique_count': int(unique_counts[column_name]),
             }
             
             # Add type-specific statistics
-            if data_type in ['integer', 'float']:
-                column_stats.update({
-                    'min_value': str(column_data.min()),
-                    'max_value': str(column_data.max()),
-                    'mean_value': float(column_data.mean()),
-                    'std_deviation': float(column_data.std()),
-                })
-                
-                # Detect outliers
-                q1 = column_data.quantile(0.25)
-                q3 = column_data.quantile(0.75)
-                iqr = q3 - q1
-                outliers = column_data[
-                    (column_data < q1 - 1.5 * iqr) | 
-                    (column_data > q3 + 1.5 * iqr)
-                ]
+            if data_type in ('integer', 'float'):
+                min_value, max_value = mins[column_name], maxs[column_name]
+                # Mixed numeric frames reduce to floats; integer columns keep '5', not '5.0'
+                if data_type == 'integer' and pd.notna(min_value):
+                    min_value, max_value = int(min_value), int(max_value)
+                outlier_count = int(outlier_counts[column_name])
                 column_stats.update({
-                    'has_outliers': len(outliers) > 0,
-                    'outlier_count': len(outliers),
+                    'min_value': str(min_value),
+                    'max_value': str(max_value),
+                    'mean_value': float(means[column_name]),
+                    'std_deviation': float(stds[column_name]),
+                    'has_outliers': outlier_count > 0,
+                    'outlier_count': outlier_count,
                 })
             
             # Sample values and value counts
             sample_values = column_data.dropna().head(10).tolist()
             value_counts = column_data.value_counts().head(10).to_dict()
             
-            # Create column record
-            DataColumn.objects.create(
-                data_source=data_source,
-                name=column_name,
-                original_name=column_name,
-                data_type=data_type,
-                is_nullable=null_count > 0,
-                sample_values=sample_values,
-                value_counts=value_counts,
+            rows.append({
+                'name': column_name,
+                'original_name': column_name,
+                'data_type': data_type,
+                'is_nullable': null_count > 0,
+                'sample_values': sample_values,
+                'value_counts': value_counts,
                 **column_stats
-            )
+            })
+        
+        DataColumn.upsert_many(data_source, rows)
 
     def _generate_ai_analysis(self, df: pd.DataFrame, data_source: DataSource) -> Dict[str, Any]:
         """
@@ -615,38 +838,46 @@ class DataIngestionService:
         Get detailed statistics for each column.
         """
         stats = {}
-
-        for col in df.columns:
+        kinds = _column_kinds(df)
+        counts = df.count()
+        unique_counts = df.nunique()
+
+        numeric_columns = [col for col, kind in kinds.items() if kind in ('integer', 'float')]
+        if numeric_columns:
+            numeric = df[numeric_columns]
+            summary = numeric.agg(['min', 'max', 'mean', 'median', 'std'])
+            quartiles = numeric.quantile([0.25, 0.75])
+            q1 = quartiles.loc[0.25]
+            q3 = quartiles.loc[0.75]
+            outlier_counts = _outlier_counts(numeric, quartiles)
+
+        for col, kind in kinds.items():
             col_data = df[col]
+            null_count = len(df) - counts[col]
             col_stats = {
                 'name': col,
                 'dtype': str(col_data.dtype),
-                'count': int(col_data.count()),
-                'null_count': int(col_data.isnull().sum()),
-                'null_percentage': round((col_data.isnull().sum() / len(df)) * 100, 2),
-                'unique_count': int(col_data.nunique()),
-                'unique_percentage': round((col_data.nunique() / len(df)) * 100, 2)
+                'count': int(counts[col]),
+                'null_count': int(null_count),
+                'null_percentage': round((null_count / len(df)) * 100, 2),
+                'unique_count': int(unique_counts[col]),
+                'unique_percentage': round((unique_counts[col] / len(df)) * 100, 2)
             }
 
-            if pd.api.types.is_numeric_dtype(col_data):
+            if kind in ('integer', 'float'):
+                col_summary = summary[col]
                 col_stats.update({
-                    'min': float(col_data.min()),
-                    'max': float(col_data.max()),
-                    'mean': round(float(col_data.mean()), 4),
-                    'median': float(col_data.median()),
-                    'std': round(float(col_data.std()), 4),
-                    'q25': float(col_data.quantile(0.25)),
-                    'q75': float(col_data.quantile(0.75))
+                    'min': float(col_summary['min']),
+                    'max': float(col_summary['max']),
+                    'mean': round(float(col_summary['mean']), 4),
+                    'median': float(col_summary['median']),
+                    'std': round(float(col_summary['std']), 4),
+                    'q25': float(q1[col]),
+                    'q75': float(q3[col]),
+                    'outlier_count': int(outlier_counts[col])
                 })
 
-                # Detect outliers
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
-                iqr = q3 - q1
-                outliers = col_data[(col_data < q1 - 1.5 * iqr) | (col_data > q3 + 1.5 * iqr)]
-                col_stats['outlier_count'] = len(outliers)
-
-            elif pd.api.types.is_datetime64_any_dtype(col_data):
+            elif kind == 'datetime':
                 col_stats.update({
                     'min_date': str(col_data.min()),
                     'max_date': str(col_data.max()),
@@ -745,7 +976,7 @@ class DataIngestionService:
         issues = []
 
         # Missing values
-        missing_data = df.isnull().sum()
+        missing_data = _missing_counts(df)
         for col, missing_count in missing_data.items():
             if missing_count > 0:
                 percentage = (missing_count / len(df)) * 100
@@ -760,7 +991,7 @@ class DataIngestionService:
                 })
 
         # Duplicate rows
-        duplicate_count = df.duplicated().sum()
+        duplicate_count = _duplicate_row_count(df)
         if duplicate_count > 0:
             issues.append({
                 'type': 'duplicate_rows',
@@ -877,10 +1108,7 @@ class DataAnalysisService:
             ingestion_service = DataIngestionService()
             
             if data_source.source_type == 'file':
-                df = ingestion_service.read_file_data(
-                    data_source.file.path,
-                    data_source.file_type
-                )
+                df = ingestion_service.read_source_file(data_source)
             else:
                 # For non-file sources, get preview data
                 preview = ingestion_service.get_data_preview(
@@ -917,14 +1145,14 @@ class DataAnalysisService:
         try:
             # Calculate quality scores
             total_cells = df.size
-            null_cells = df.isnull().sum().sum()
+            missing_cols = _missing_counts(df)
+            null_cells = missing_cols.sum()
             completeness_score = ((total_cells - null_cells) / total_cells) * 100
             
             # Detect issues
             issues = []
             
             # Missing values
-            missing_cols = df.isnull().sum()
             for col, missing_count in missing_cols.items():
                 if missing_count > 0:
                     percentage = (missing_count / len(df)) * 100
@@ -938,7 +1166,7 @@ class DataAnalysisService:
                     })
             
             # Duplicate rows
-            duplicate_count = df.duplicated().sum()
+            duplicate_count = _duplicate_row_count(df)
             if duplicate_count > 0:
                 issues.append({
                     'type': 'duplicate_rows',
@@ -0,0 +1,50 @@
+"""
+Signal handlers for data ingestion app.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import DataSource
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_delete, sender=DataSource)
+def delete_parquet_cache(sender, instance, **kwargs):
+    """Remove a deleted data source's Parquet copy once the delete commits."""
+    if not instance.parquet_file:
+        return
+    storage, name = instance.parquet_file.storage, instance.parquet_file.name
+
+    def delete():
+        try:
+            storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not delete Parquet cache {name}: {str(e)}")
+
+    transaction.on_commit(delete)
+
+
+@receiver(post_delete, sender=DataSource)
+def delete_unshared_upload(sender, instance, **kwargs):
+    """
+    Remove a deleted data source's uploaded file once the delete commits,
+    unless another data source still shares it (see DataSource.dedupe_upload).
+    """
+    if not instance.file:
+        return
+    storage, name = instance.file.storage, instance.file.name
+
+    def delete():
+        if DataSource.objects.filter(file=name).exists():
+            return
+        try:
+            storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not delete uploaded file {name}: {str(e)}")
+
+    transaction.on_commit(delete)
@@ -0,0 +1,265 @@
+"""
+Tests for data ingestion app.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from cryptography.fernet import Fernet
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from . import fields
+from .models import DataColumn, DataSource
+from .services import DataIngestionService, _column_kinds, _duplicate_row_count, _outlier_counts
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+class EncryptedTextFieldTests(TestCase):
+    def setUp(self):
+        fields._fernet.cache_clear()
+        self.addCleanup(fields._fernet.cache_clear)
+        self.user = get_user_model().objects.create_user(
+            username='owner', email='owner@example.com', password='s3cret-Passw0rd'
+        )
+
+    def create_source(self, password):
+        return DataSource.objects.create(
+            user=self.user,
+            name='warehouse',
+            source_type=DataSource.SourceType.DATABASE,
+            db_password=password
+        )
+
+    def stored_password(self, source):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT db_password FROM {DataSource._meta.db_table} WHERE id = %s", [source.pk.hex])
+            return cursor.fetchone()[0]
+
+    def reload(self, source):
+        fields._fernet.cache_clear()
+        return DataSource.objects.get(pk=source.pk)
+
+    def test_value_is_encrypted_at_rest(self):
+        source = self.create_source('hunter2')
+
+        self.assertTrue(self.stored_password(source).startswith(fields._FERNET_PREFIX))
+        self.assertEqual(self.reload(source).db_password, 'hunter2')
+
+    def test_old_key_still_decrypts_after_rotation(self):
+        with override_settings(FIELD_ENCRYPTION_KEYS=[OLD_KEY]):
+            source = self.create_source('hunter2')
+
+        with override_settings(FIELD_ENCRYPTION_KEYS=[NEW_KEY, OLD_KEY]):
+            source = self.reload(source)
+            self.assertEqual(source.db_password, 'hunter2')
+            source.save()
+
+        with override_settings(FIELD_ENCRYPTION_KEYS=[NEW_KEY]):
+            self.assertEqual(self.reload(source).db_password, 'hunter2')
+
+    def test_undecryptable_value_survives_a_save(self):
+        with override_settings(FIELD_ENCRYPTION_KEYS=[OLD_KEY]):
+            source = self.create_source('hunter2')
+        ciphertext = self.stored_password(source)
+
+        with override_settings(FIELD_ENCRYPTION_KEYS=[NEW_KEY], SECRET_KEY='rotated'):
+            source = self.reload(source)
+            self.assertIsInstance(source.db_password, fields.Ciphertext)
+            source.name = 'renamed'
+            source.save()
+
+        self.assertEqual(self.stored_password(source), ciphertext)
+        with override_settings(FIELD_ENCRYPTION_KEYS=[OLD_KEY]):
+            self.assertEqual(self.reload(source).db_password, 'hunter2')
+
+
+class FileDataSourceTestCase(TestCase):
+    """Uploads land in a temporary MEDIA_ROOT removed after each test."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = get_user_model().objects.create_user(
+            username='uploader', email='uploader@example.com', password='s3cret-Passw0rd'
+        )
+        self.service = DataIngestionService()
+
+    def create_source(self, content, name='sales.csv'):
+        source = DataSource(user=self.user, name=name, source_type=DataSource.SourceType.FILE, file_type='csv')
+        source.file.save(name, ContentFile(content), save=False)
+        source.save()
+        return source
+
+
+class ParquetCacheTests(FileDataSourceTestCase):
+    CSV = (
+        'region,units,price,shipped\n'
+        + ''.join(f'{region},{i},{i * 1.5},{i % 2 == 0}\n' for i, region in enumerate(['north', 'south', '', 'east'] * 30))
+    ).encode()
+
+    def test_preview_from_parquet_copy_matches_preview_from_file(self):
+        source = self.create_source(self.CSV)
+        from_file = self.service.get_data_preview(source, limit=25, offset=90)
+
+        self.service.write_parquet_cache(source, self.service.read_source_file(source))
+        self.assertTrue(source.parquet_file)
+        from_parquet = self.service.get_data_preview(source, limit=25, offset=90)
+
+        for key in ('data', 'total_rows', 'columns', 'data_types', 'offset', 'limit'):
+            self.assertEqual(from_parquet[key], from_file[key], key)
+        self.assertEqual(from_parquet['total_rows'], 120)
+
+    def test_deleting_the_source_removes_its_parquet_copy(self):
+        source = self.create_source(self.CSV)
+        self.service.write_parquet_cache(source, self.service.read_source_file(source))
+        path = source.parquet_file.path
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            source.delete()
+
+        self.assertFalse(os.path.exists(path))
+
+
+class DedupeUploadTests(FileDataSourceTestCase):
+    def upload(self, content):
+        stored_file, sha256 = DataSource.dedupe_upload(self.user, ContentFile(content, name='sales.csv'))
+        return DataSource.objects.create(
+            user=self.user, name='sales', source_type=DataSource.SourceType.FILE, file=stored_file, file_sha256=sha256
+        )
+
+    def test_identical_upload_reuses_the_stored_file_until_both_are_deleted(self):
+        first = self.upload(b'region,units\nnorth,1\n')
+        second = self.upload(b'region,units\nnorth,1\n')
+        other = self.upload(b'region,units\nsouth,2\n')
+
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertNotEqual(other.file.name, first.file.name)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.file.path))), 2)
+
+        path = first.file.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+
+
+class ReadCSVTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.service = DataIngestionService()
+
+    def write(self, content: bytes):
+        path = os.path.join(self.directory, 'data.csv')
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_utf8_csv(self):
+        path = self.write(
+            'city,units,price,shipped\n'
+            'Café Zürich,3,1.5,true\n'
+            'München,,2.25,false\n'
+            ',5,,true\n'.encode('utf-8')
+        )
+
+        df = self.service.read_file_data(path, 'csv')
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df['city'].tolist()[:2], ['Café Zürich', 'München'])
+        self.assertTrue(pd.isna(df['city'][2]))
+        # Kinds match pandas' own CSV inference, nullable integers included
+        self.assertEqual(
+            _column_kinds(df),
+            {'city': 'string', 'units': 'float', 'price': 'float', 'shipped': 'boolean'}
+        )
+        self.assertEqual(_column_kinds(df), _column_kinds(pd.read_csv(path)))
+
+    def test_latin1_csv(self):
+        path = self.write('city,units\nCafé,1\nSão Paulo,2\n'.encode('latin-1'))
+
+        df = self.service.read_file_data(path, 'csv')
+
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df['city'].tolist(), ['Café', 'São Paulo'])
+        self.assertEqual(_column_kinds(df), {'city': 'string', 'units': 'integer'})
+        self.assertEqual(_column_kinds(df), _column_kinds(pd.read_csv(path, encoding='latin-1')))
+
+
+class ColumnProfileTests(TestCase):
+    def test_outlier_counts_match_a_per_column_check(self):
+        numeric = pd.DataFrame({
+            'units': [1, 2, 3, 4, 100, np.nan],
+            'price': [1.0, 1.1, 0.9, 1.0, 1.2, -50.0],
+            'constant': [7, 7, 7, 7, 7, 7],
+        })
+
+        counts = _outlier_counts(numeric, numeric.quantile([0.25, 0.75]))
+
+        for column in numeric.columns:
+            q1, q3 = numeric[column].quantile([0.25, 0.75])
+            iqr = q3 - q1
+            expected = ((numeric[column] < q1 - 1.5 * iqr) | (numeric[column] > q3 + 1.5 * iqr)).sum()
+            self.assertEqual(counts[column], expected, column)
+        self.assertEqual(counts.to_dict(), {'units': 1, 'price': 1, 'constant': 0})
+
+    def test_duplicate_row_count_matches_pandas(self):
+        df = pd.DataFrame({
+            'city': ['north', 'north', 'south', None, None, 'north'],
+            'units': [1, 1, 2, np.nan, np.nan, 2],
+        })
+
+        self.assertEqual(_duplicate_row_count(df), int(df.duplicated().sum()))
+        self.assertEqual(_duplicate_row_count(df), 2)
+        self.assertEqual(_duplicate_row_count(df.iloc[:0]), 0)
+
+    def test_create_column_records(self):
+        user = get_user_model().objects.create_user(
+            username='profiler', email='profiler@example.com', password='s3cret-Passw0rd'
+        )
+        source = DataSource.objects.create(user=user, name='sales', source_type=DataSource.SourceType.FILE)
+        df = pd.DataFrame({
+            'units': [1, 2, 3, 4, 100],
+            'price': [1.5, np.nan, 2.5, 3.5, 4.5],
+            'city': ['north', 'south', 'north', None, 'north'],
+            'shipped': [True, False, True, True, False],
+        })
+
+        DataIngestionService()._create_column_records(source, df)
+
+        columns = {column.name: column for column in DataColumn.objects.filter(data_source=source)}
+        self.assertEqual(
+            {name: column.data_type for name, column in columns.items()},
+            {'units': 'integer', 'price': 'float', 'city': 'string', 'shipped': 'boolean'}
+        )
+        units = columns['units']
+        self.assertEqual((units.min_value, units.max_value), ('1', '100'))
+        self.assertEqual((units.outlier_count, units.has_outliers, units.is_nullable), (1, True, False))
+        self.assertAlmostEqual(units.mean_value, 22.0)
+        price = columns['price']
+        self.assertEqual((price.null_count, price.is_nullable, price.min_value), (1, True, '1.5'))
+        city = columns['city']
+        self.assertEqual((city.null_count, city.unique_count), (1, 2))
+        self.assertEqual(city.value_counts, {'north': 3, 'south': 1})
+        self.assertIsNone(city.mean_value)
+
+        # Reprocessing refreshes the rows in place
+        DataIngestionService()._create_column_records(source, df.head(3))
+        self.assertEqual(DataColumn.objects.filter(data_source=source).count(), 4)
+        self.assertEqual(DataColumn.objects.get(data_source=source, name='units').max_value, '3')
@@ -9,12 +9,14 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Q
 import pandas as pd
 import json
 
 from .models import DataSource, DataColumn, DataQualityReport, DataTransformation, ETLOperation
 from .serializers import (
     DataSourceSerializer,
+    DataSourceListSerializer,
     DataSourceCreateSerializer,
     DataSourceUpdateSerializer,
     FileUploadSerializer,
@@ -30,6 +32,12 @@ from .serializers import (
 from .services import DataIngestionService, DataAnalysisService
 
 
+def _sniffed_columns_count(uploaded_file):
+    """Column count of the schema sniffed while validating a CSV upload."""
+    schema = getattr(uploaded_file, '_cached_schema', None)
+    return len(schema) if schema is not None else None
+
+
 class DataSourceViewSet(ModelViewSet):
     """
     ViewSet for managing data sources.
@@ -39,19 +47,45 @@ class DataSourceViewSet(ModelViewSet):
     def get_queryset(self):
         # For development, return all data sources if user is not authenticated
         if self.request.user.is_authenticated:
-            return DataSource.objects.filter(user=self.request.user).order_by('-created_at')
+            queryset = DataSource.objects.filter(user=self.request.user).order_by('-created_at')
         else:
-            return DataSource.objects.all().order_by('-created_at')
+            queryset = DataSource.objects.all().order_by('-created_at')
+        
+        if self.action == 'list':
+            queryset = queryset.only(*DataSourceListSerializer.Meta.fields)
+            # Substring search, served by the trigram indexes on PostgreSQL
+            search = self.request.query_params.get('search')
+            if search:
+                queryset = queryset.filter(
+                    Q(name__icontains=search) | Q(description__icontains=search)
+                )
+        elif self.action == 'retrieve':
+            queryset = DataSourceSerializer.setup_eager_loading(queryset)
+        elif self.action == 'columns':
+            queryset = queryset.only('id')
+        return queryset
     
     def get_serializer_class(self):
-        if self.action == 'create':
+        if self.action == 'list':
+            return DataSourceListSerializer
+        elif self.action == 'create':
             return DataSourceCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return DataSourceUpdateSerializer
         return DataSourceSerializer
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        uploaded_file = serializer.validated_data.get('file')
+        if uploaded_file:
+            stored_file, sha256 = DataSource.dedupe_upload(self.request.user, uploaded_file)
+            serializer.save(
+                user=self.request.user,
+                file=stored_file,
+                file_sha256=sha256,
+                columns_count=_sniffed_columns_count(uploaded_file)
+            )
+        else:
+            serializer.save(user=self.request.user)
     
     @action(detail=True, methods=['post'])
     def analyze(self, request, pk=None):
@@ -110,9 +144,9 @@ class DataSourceViewSet(ModelViewSet):
         Get column information for a data source.
         """
         data_source = self.get_object()
-        columns = data_source.columns.all()
-        serializer = DataColumnSerializer(columns, many=True)
-        return Response(serializer.data)
+        # Rows are already response-shaped; wide tables have hundreds of columns
+        columns = DataColumn.list_dicts(data_source.pk, DataColumnSerializer.Meta.fields)
+        return Response(list(columns))
     
     @action(detail=True, methods=['get'])
     def quality_report(self, request, pk=None):
@@ -192,14 +226,17 @@ def upload_file(request):
                     }
                 )
 
+            stored_file, sha256 = DataSource.dedupe_upload(user, file_data['file'])
             data_source = DataSource.objects.create(
                 user=user,
                 name=file_data.get('name', file_data['file'].name),
                 description=file_data.get('description', ''),
                 source_type='file',
-                file=file_data['file'],
+                file=stored_file,
+                file_sha256=sha256,
                 file_size=file_data['file'].size,
                 file_type=file_data['file'].content_type,
+                columns_count=_sniffed_columns_count(file_data['file']),
                 status='processing'
             )
 
@@ -5,7 +5,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from apps.ai_engine.services import OpenRouterService
+from apps.ai_engine.services import OpenRouterService, numeric_column_stats
 import logging
 import time
 import json
@@ -161,12 +161,14 @@ def process_query(request):
             try:
                 import pandas as pd
                 df = pd.DataFrame(actual_results)
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+                # Limit to first 3 numeric columns
+                column_stats = {
+                    col: stats for col, stats in numeric_column_stats(df, limit=3).items() if stats['count']
+                }
 
-                if numeric_cols:
+                if column_stats:
                     numeric_insights = "\nNUMERIC COLUMN INSIGHTS:\n"
-                    for col in numeric_cols[:3]:  # Limit to first 3 numeric columns
-                        stats = df[col].describe()
+                    for col, stats in column_stats.items():
                         numeric_insights += f"{col}: min={stats['min']:.2f}, max={stats['max']:.2f}, mean={stats['mean']:.2f}, count={stats['count']}\n"
 
             except Exception as e:
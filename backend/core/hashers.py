@@ -0,0 +1,19 @@
+"""
+Password hashers for EETL AI Platform.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id hasher with work factors taken from settings.
+
+    Tune ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM so one
+    verify takes about 50ms on production hardware; stored hashes with
+    other parameters are rehashed on the user's next successful login.
+    """
+    time_cost = settings.ARGON2_TIME_COST
+    memory_cost = settings.ARGON2_MEMORY_COST
+    parallelism = settings.ARGON2_PARALLELISM
@@ -0,0 +1,45 @@
+"""
+Client IP resolution behind reverse proxies.
+"""
+
+import ipaddress
+
+from django.conf import settings
+
+TRUSTED_PROXIES = [ipaddress.ip_network(network) for network in settings.TRUSTED_PROXIES]
+
+
+def _parse(value):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def _trusted(ip) -> bool:
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request):
+    """
+    Address of the client that sent ``request``.
+
+    X-Forwarded-For is only honoured when the connection comes from a
+    trusted proxy, and is read right to left: the first address that is not
+    itself a trusted proxy is the client. Entries to its left are supplied
+    by the client and ignored.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    remote = _parse(remote_addr or '')
+    if remote is None or not _trusted(remote):
+        return remote_addr
+
+    client = remote
+    for value in reversed(request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')):
+        ip = _parse(value)
+        if ip is None:
+            break
+        client = ip
+        if not _trusted(ip):
+            break
+    return str(client)
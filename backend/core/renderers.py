@@ -0,0 +1,30 @@
+"""
+Fast JSON rendering for API responses.
+"""
+
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson.
+
+    orjson serializes datetimes, UUIDs and numpy arrays natively and returns
+    bytes directly; anything else (Decimal, lazy strings, querysets) falls
+    back to DRF's encoder. UTC datetimes end in ``Z``, as DRF's
+    DateTimeField renders them.
+    """
+
+    _encoder = JSONEncoder()
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self._encoder.default, option=options)
@@ -21,11 +21,20 @@ environ.Env.read_env(os.path.join(BASE_DIR.parent, '.env'))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = env('SECRET_KEY', default='django-insecure-change-me-in-production')
 
+# Fernet keys for credentials stored on data sources, newest first; the first
+# encrypts and all of them decrypt. Derived from SECRET_KEY if unset
+FIELD_ENCRYPTION_KEYS = env.list('FIELD_ENCRYPTION_KEYS', default=[])
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env('DEBUG')
 
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost', '127.0.0.1'])
 
+# Reverse proxies whose X-Forwarded-For entries are trusted (CIDR notation)
+TRUSTED_PROXIES = env.list('TRUSTED_PROXIES', default=[
+    '127.0.0.0/8', '::1/128', '10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16'
+])
+
 # Application definition
 DJANGO_APPS = [
     'django.contrib.admin',
@@ -39,6 +48,7 @@ DJANGO_APPS = [
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_extensions',
     'drf_spectacular',
@@ -87,27 +97,43 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'OPTIONS': {
-            'timeout': 30,
-        },
+# PostgreSQL when DATABASE_URL is set (docker-compose points it at PgBouncer),
+# SQLite for local development otherwise
+if env('DATABASE_URL', default=''):
+    DATABASES = {
+        'default': {
+            **env.db('DATABASE_URL'),
+            # Reuse connections across requests instead of reconnecting each time
+            'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+            'CONN_HEALTH_CHECKS': True,
+            # Required when DATABASE_URL points at PgBouncer in transaction pool mode
+            'DISABLE_SERVER_SIDE_CURSORS': env.bool('DB_USE_PGBOUNCER', default=False),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 30,
+            },
+            'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
 
-# Uncomment below for PostgreSQL in production
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': env('DB_NAME', default='eetl_db'),
-#         'USER': env('DB_USER', default='eetl_user'),
-#         'PASSWORD': env('DB_PASSWORD', default='eetl_password'),
-#         'HOST': env('DB_HOST', default='localhost'),
-#         'PORT': env('DB_PORT', default='5432'),
-#     }
-# }
+# Password hashing: Argon2 (C implementation) first; existing PBKDF2 hashes
+# still verify and are upgraded to Argon2 on the next successful login
+PASSWORD_HASHERS = [
+    'core.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=65536)  # in KiB
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=4)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -151,16 +177,24 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
+        'apps.authentication.authentication.APIKeyAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Token buckets for the credential endpoints (apps.authentication.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'login': env('THROTTLE_RATE_LOGIN', default='10/min'),
+        'register': env('THROTTLE_RATE_REGISTER', default='5/hour'),
+        'change_password': env('THROTTLE_RATE_CHANGE_PASSWORD', default='5/min'),
+        'ai_batch_chat': env('THROTTLE_RATE_AI_BATCH_CHAT', default='10/min'),
+    },
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -174,6 +208,10 @@ SIMPLE_JWT = {
     'ALGORITHM': env('JWT_ALGORITHM', default='HS256'),
     'SIGNING_KEY': env('JWT_SECRET_KEY', default=SECRET_KEY),
 }
+# How long an authenticated user is served from the cache instead of the database
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', default=60)  # in seconds
+# Record logins from a Celery task; disable where no broker is running
+AUTH_RECORD_LOGIN_ASYNC = env.bool('AUTH_RECORD_LOGIN_ASYNC', default=True)
 
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
@@ -193,10 +231,36 @@ CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS', default=[
 OPENROUTER_API_KEY = env('OPENROUTER_API_KEY')
 OPENROUTER_MODEL = env('OPENROUTER_MODEL', default='deepseek/deepseek-chat')
 OPENROUTER_BASE_URL = env('OPENROUTER_BASE_URL', default='https://openrouter.ai/api/v1')
+# Preferred upstream providers, e.g. ones serving the model with speculative decoding
+OPENROUTER_PROVIDER_ORDER = env.list('OPENROUTER_PROVIDER_ORDER', default=[])
+OPENROUTER_CONTEXT_WINDOW = env.int('OPENROUTER_CONTEXT_WINDOW', default=64000)
+OPENROUTER_HTTP2 = env.bool('OPENROUTER_HTTP2', default=True)
+OPENROUTER_TIMEOUT = env.float('OPENROUTER_TIMEOUT', default=60.0)
+OPENROUTER_MAX_CONNECTIONS = env.int('OPENROUTER_MAX_CONNECTIONS', default=40)
+OPENROUTER_MAX_KEEPALIVE_CONNECTIONS = env.int('OPENROUTER_MAX_KEEPALIVE_CONNECTIONS', default=20)
+# Completions one batch request may have in flight at once
+OPENROUTER_BATCH_CONCURRENCY = env.int('OPENROUTER_BATCH_CONCURRENCY', default=4)
+AI_RESPONSE_CACHE_TIMEOUT = env.int('AI_RESPONSE_CACHE_TIMEOUT', default=86400)  # in seconds
+AI_SCHEMA_CACHE_TIMEOUT = env.int('AI_SCHEMA_CACHE_TIMEOUT', default=3600)  # in seconds
+AI_RAG_CONTEXT_CACHE_TIMEOUT = env.int('AI_RAG_CONTEXT_CACHE_TIMEOUT', default=120)  # in seconds
+AI_SEMANTIC_CACHE_ENABLED = env.bool('AI_SEMANTIC_CACHE_ENABLED', default=True)
+AI_SEMANTIC_CACHE_MAX_DISTANCE = env.float('AI_SEMANTIC_CACHE_MAX_DISTANCE', default=0.05)
+AI_SEMANTIC_CACHE_TIMEOUT = env.int('AI_SEMANTIC_CACHE_TIMEOUT', default=86400)  # in seconds
+AI_SEMANTIC_CACHE_PURGE_INTERVAL = env.float('AI_SEMANTIC_CACHE_PURGE_INTERVAL', default=3600.0)  # in seconds
+AI_USAGE_FLUSH_INTERVAL = env.float('AI_USAGE_FLUSH_INTERVAL', default=5.0)  # in seconds
+AI_USAGE_FLUSH_MAX_PENDING = env.int('AI_USAGE_FLUSH_MAX_PENDING', default=500)
 
 # Vector Database Configuration
 CHROMA_PERSIST_DIRECTORY = env('CHROMA_PERSIST_DIRECTORY', default='./chroma_db')
 CHROMA_COLLECTION_NAME = env('CHROMA_COLLECTION_NAME', default='eetl_embeddings')
+# 'pgvector' (Postgres, default) or 'faiss' (in-process indexes on disk)
+VECTOR_BACKEND = env('VECTOR_BACKEND', default='pgvector')
+FAISS_INDEX_DIR = env('FAISS_INDEX_DIR', default='./faiss_indexes')
+# HNSW candidates scanned per pgvector query on large stores (pgvector default 40)
+PGVECTOR_HNSW_EF_SEARCH = env.int('PGVECTOR_HNSW_EF_SEARCH', default=200)
+EMBEDDING_ONNX_FILE = env('EMBEDDING_ONNX_FILE', default='model_qint8_avx512_vnni.onnx')
+EMBEDDING_BATCH_WAIT_MS = env.float('EMBEDDING_BATCH_WAIT_MS', default=5.0)
+EMBEDDING_MAX_BATCH_SIZE = env.int('EMBEDDING_MAX_BATCH_SIZE', default=64)
 
 # File Upload Configuration
 FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
@@ -209,7 +273,23 @@ CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='redis://localhost:
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+CELERY_RESULT_EXPIRES = env.int('CELERY_RESULT_EXPIRES', default=86400)  # in seconds
 CELERY_TIMEZONE = TIME_ZONE
+# Long-running AI tasks: acknowledge after completion and fetch one at a time
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Redis-buffered user/API key counters are drained into the database by beat
+USAGE_COUNTER_FLUSH_INTERVAL = env.float('USAGE_COUNTER_FLUSH_INTERVAL', default=10.0)  # in seconds
+CELERY_BEAT_SCHEDULE = {
+    'flush-usage-counters': {
+        'task': 'apps.authentication.tasks.flush_usage_counters',
+        'schedule': USAGE_COUNTER_FLUSH_INTERVAL,
+    },
+    'purge-semantic-cache': {
+        'task': 'apps.ai_engine.tasks.purge_semantic_cache',
+        'schedule': AI_SEMANTIC_CACHE_PURGE_INTERVAL,
+    },
+}
 
 # Cache Configuration
 CACHES = {
@@ -222,6 +302,9 @@ CACHES = {
     }
 }
 
+# Sessions (used by the admin) are read from Redis and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Logging Configuration
 LOGGING = {
     'version': 1,